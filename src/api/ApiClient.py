@@ -8,14 +8,41 @@ from api.config.config import logger
 class ApiClient:
     """
     A basic API client for making HTTP requests with retry logic.
+
+    The underlying connection pool keeps its connections alive between requests, and at most max_connections requests
+    are in flight at once; the others wait up to pool_timeout seconds for a connection.
     """
 
-    def __init__(self, base_url: str, timeout: int = 15):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 15,
+        connect_timeout: float | None = None,
+        pool_timeout: float | None = None,
+        max_connections: int | None = None,
+        max_retries: int = 3,
+    ):
         self.base_url = base_url
-        self.client = httpx.Client(base_url=base_url, timeout=timeout)
+        self.max_retries = max_retries
+        limits = {}
+        if max_connections is not None:
+            limits["limits"] = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=httpx.Timeout(
+                timeout,
+                connect=timeout if connect_timeout is None else connect_timeout,
+                pool=timeout if pool_timeout is None else pool_timeout,
+            ),
+            **limits,
+        )
 
-    def post(self, endpoint: str, data: dict, max_retries: int = 3, backoff_factor: float = 0.5) -> httpx.Response:
+    def post(
+        self, endpoint: str, data: dict, max_retries: int | None = None, backoff_factor: float = 0.5
+    ) -> httpx.Response:
         url = f"{self.base_url}{endpoint}"
+        if max_retries is None:
+            max_retries = self.max_retries
         retries = 0
         while retries <= max_retries:
             try:
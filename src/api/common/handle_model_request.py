@@ -8,16 +8,16 @@ from model.run_model import run_model
 from utils.utils import TimeFrame
 
 from api.common.check_run_error import check_run_error
-from api.common.handle_verbosity import handle_verbosity
+from api.common.handle_verbosity import handle_verbosity, requested_fields
 from api.config.config import REDZONE_BEHAVIOR_CUSTOMER, RISK_SCORE, logger
 
 # from api.transformations.model_postprocessor import ModelPostProcessor
-from api.transformations.transform_v2_output import transform_v2_output
+from api.transformations.transform_v2_output import V2_OUTPUT_FIELDS, transform_v2_output
 from api.types.enums import IAResponseFields
 
 
-def get_model_results(input_data, timeframe):
-    model_output_str = run_model(input_data, timeframe)
+def get_model_results(input_data, timeframe, output_fields=None):
+    model_output_str = run_model(input_data, timeframe, output_fields)
     output_final_dict = orjson.loads(model_output_str)
     return output_final_dict
 
@@ -48,9 +48,10 @@ def handle_model_request(data, timeframe: TimeFrame, version="v2"):
     if error_response:
         return error_response
 
-    # Run model
+    # Run model, skipping the stages whose outputs the verbosity or the v2 transformation drops
+    output_fields = requested_fields(verbosity) if version != "v2" else V2_OUTPUT_FIELDS
     start_time = datetime.now()
-    output_final_dict = get_model_results(input_data, timeframe)
+    output_final_dict = get_model_results(input_data, timeframe, output_fields)
     end_time = datetime.now()
     elapsed = end_time - start_time
     output_final_dict["executionTime"] = str(elapsed)
@@ -106,8 +107,8 @@ def handle_model_request_v3(data: dict, timeframe: TimeFrame):
     if error_response:
         return error_response
 
-    # Run model with dict input
-    output_final_dict = get_model_results(data, timeframe)
+    # Run model with dict input, skipping the stages whose outputs the v2 transformation drops
+    output_final_dict = get_model_results(data, timeframe, V2_OUTPUT_FIELDS)
 
     # Check for runError
     run_error = check_run_error(output_final_dict, "v2")
@@ -4,6 +4,23 @@ from api.config.config import RISK_SCORE, logger
 from api.types.enums import IAResponseFields
 
 
+def requested_fields(verbosity) -> set[str] | None:
+    """Output fields handle_verbosity returns for the verbosity, None when it returns the full output.
+
+    The risk score is read from additionalInfo before the verbosity is handled, so it is computed either way.
+    """
+    if isinstance(verbosity, str):
+        verbosity = verbosity.lower()
+        if verbosity == "false":
+            return set()
+        elif verbosity == "summary":
+            return {IAResponseFields.summaryInfo.value}
+    elif isinstance(verbosity, list) and all(field in IAResponseFields.__members__ for field in verbosity):
+        return {IAResponseFields[field].value for field in verbosity}
+    # The full output, or an invalid verbosity handle_verbosity rejects
+    return None
+
+
 def handle_verbosity(output_final_dict, verbosity, risk_score):
     logger.info(f"requested verbosity as: {verbosity}")
     if isinstance(verbosity, str):
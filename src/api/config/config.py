@@ -66,6 +66,8 @@ LENDING_GUIDE = "lendingGuide"
 ACCOUNTS = "accounts"
 SCORES = "scores"
 MODEL_VERSION = "modelVersion"
+# Output field of the customer level scores alone, "scores" also explains the account level ones
+CUSTOMER_LEVEL_SCORES = "scores.customerLevel"
 
 
 ACCOUNT_GUID = "accountGuid"
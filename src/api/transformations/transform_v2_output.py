@@ -1,15 +1,39 @@
 import pandas as pd
 from config.settings import OUTPUT_APPLICATION_CHECK, OUTPUT_FEATURES
 
+from api.config.config import CUSTOMER_LEVEL_SCORES
 from api.transformations.features_type_map import features_type_map
 
 
-def find_corresponding_dict(output, field, account_guid):
-    found = next(
-        (obj for obj in output[field] if obj["accountGuid"] == account_guid),
-        None,
-    )
-    return found
+def index_by_account(objs: list[dict]) -> dict:
+    # First dict of each account in the list, indexed once instead of scanning the list for every account
+    index = {}
+    for obj in objs:
+        index.setdefault(obj["accountGuid"], obj)
+    return index
+
+
+# Output fields transform_v2_output reads or passes on, of the scores it only keeps the customer level ones
+V2_OUTPUT_FIELDS = {
+    "summaryInfo",
+    "incomeSources",
+    "loanSources",
+    "overdraftIncidents",
+    "overdraftFeeIncidents",
+    "nsfFeeIncidents",
+    "cashFlow",
+    "majorIncomeSource",
+    "creditTrans",
+    "debitTrans",
+    "additionalInfo",
+    "lendingGuide",
+    CUSTOMER_LEVEL_SCORES,
+    "accounts",
+    "modelVersion",
+    "atpFeatures",
+    "redZoneExplanation",
+    "ApplicationChecker",
+}
 
 
 # Formats/Renames
@@ -139,13 +163,17 @@ def transform_v2_output(output: dict):
     if "accountGuid" in features_customer_level_clean:
         features_customer_level_clean.pop("accountGuid")
 
+    summary_info_by_account = index_by_account(output["summaryInfo"])
+    cashflow_by_account = index_by_account(output["cashFlow"])
+    features_by_account = index_by_account(output["scores"]["features"]["accountLevel"])
+
     # Modify the accounts field
     for account in output["accounts"]:
         account_guid = account["accountGuid"]
 
-        summary_info = find_corresponding_dict(output, "summaryInfo", account_guid)
-        cashflow = find_corresponding_dict(output, "cashFlow", account_guid)
-        account_features = find_corresponding_dict(output["scores"]["features"], "accountLevel", account_guid)
+        summary_info = summary_info_by_account.get(account_guid)
+        cashflow = cashflow_by_account.get(account_guid)
+        account_features = features_by_account.get(account_guid)
         account["incomeSources"] = income_sources_by_account.get(account_guid, [])
         account["loanSources"] = loan_sources_by_account.get(account_guid, [])
         account["overdraftIncidents"] = od_incidents_by_account.get(account_guid, [])
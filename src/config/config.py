@@ -67,6 +67,15 @@ IA_ESTIMATOR_NAME = "xgb"
 
 # Custom Model Endpoint
 CUSTOM_MODEL_BASE_URL = os.environ.get("CUSTOM_MODEL_BASE_URL", default=None)
+CUSTOM_MODEL_TIMEOUT = float(os.environ.get("CUSTOM_MODEL_TIMEOUT", default=15))
+CUSTOM_MODEL_CONNECT_TIMEOUT = float(os.environ.get("CUSTOM_MODEL_CONNECT_TIMEOUT", default=5))
+CUSTOM_MODEL_MAX_RETRIES = int(os.environ.get("CUSTOM_MODEL_MAX_RETRIES", default=3))
+# Requests in flight to the custom model from one worker, the others wait for a pooled connection
+CUSTOM_MODEL_MAX_CONNECTIONS = int(os.environ.get("CUSTOM_MODEL_MAX_CONNECTIONS", default=10))
+
+# Postprocessing stages of one request running at the same time, 1 runs them one after the other in the request
+# thread, deployments opt in to running independent stages in threads by raising it
+POSTPROCESS_MAX_WORKERS = int(os.environ.get("POSTPROCESS_MAX_WORKERS", default=1))
 
 # Save path
 IA_TRAINED_MODEL_DIR = os.path.realpath(os.path.join(ROOT_DIR, "model", "pkl"))
@@ -464,6 +473,8 @@ REDZONE_MODEL_FILE_PATH_CM = os.path.join(REDZONE_TRAINED_MODEL_DIR, REDZONE_MOD
 REDZONE_MODEL_FILE_PATH_V2 = os.path.join(
     os.path.realpath(os.path.join(ROOT_DIR, "model")), "autogluon_models_FPDAA_20250904_010918"
 )
+# The deployed model of an AutoGluon predictor exported to be scored without AutoGluon, inside the predictor directory
+AUTO_GLUON_NATIVE_MODEL_DIR = "native_model"
 CALIBRATOR_DATA_PATH = os.path.realpath(os.path.join(ROOT_DIR, "model", "redzone_calibrator_data.pkl"))
 
 # Repeat Model file Path
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -12,31 +13,30 @@ def apply_agent_labeling(labeled_transactions: pd.DataFrame, transactions_to_cha
     # Create a copy of the dataframe to avoid chained assignment warnings
     result_df = labeled_transactions.copy()
 
-    for _, row in transactions_to_change.iterrows():
-        originalDescription = row["originalDescription"]
-        agent_category = row["agentCategory"]
-        is_entire_cluster = row["isEntireCluster"]
+    # Edits are applied as if walked in order: a later edit overrides an earlier one on every row it touches,
+    # so each row simply takes the category of the last edit that targets it.
+    edits = transactions_to_change.reset_index(drop=True)
+    edits = edits[edits["originalDescription"].notna()]
+    edit_order = pd.Series(edits.index, index=edits["originalDescription"])
+    row_edit = result_df["originalDescription"].map(edit_order.groupby(level=0).max()).to_numpy(dtype=float)
 
-        # Change all strict originalDescriptions
-        mask = result_df["originalDescription"] == originalDescription
-        filtered_indices = result_df[mask].index
+    # Change all cluster label, using the cluster of the first row matching the edit's description
+    if "cluster_label" in result_df.columns:
+        cluster_edits = edits[edits["isEntireCluster"].astype(str).str.lower() == "true"]
+        first_match = result_df.drop_duplicates(subset="originalDescription").set_index("originalDescription")
+        cluster_edits = cluster_edits.assign(
+            cluster_label=cluster_edits["originalDescription"].map(first_match["cluster_label"])
+        ).dropna(subset="cluster_label")
+        cluster_order = pd.Series(cluster_edits.index, index=cluster_edits["cluster_label"])
+        row_cluster_edit = result_df["cluster_label"].map(cluster_order.groupby(level=0).max())
+        row_edit = np.fmax(row_edit, row_cluster_edit.to_numpy(dtype=float))
 
-        if not filtered_indices.empty:
-            result_df.loc[filtered_indices, "category"] = agent_category
-            result_df.loc[filtered_indices, "StackingPrediction"] = agent_category
-            result_df.loc[filtered_indices, "fromModel"] = liveAgentEdit
-
-            # Change all cluster label
-            if str(is_entire_cluster).lower() == "true":
-                top_index = filtered_indices[0]
-                if "cluster_label" in result_df.columns:
-                    cluster_label = result_df.loc[top_index, "cluster_label"]
-                    cluster_mask = result_df["cluster_label"] == cluster_label
-                    cluster_filtered_indices = result_df[cluster_mask].index
-                    if not cluster_filtered_indices.empty:
-                        result_df.loc[cluster_filtered_indices, "category"] = agent_category
-                        result_df.loc[cluster_filtered_indices, "StackingPrediction"] = agent_category
-                        result_df.loc[cluster_filtered_indices, "fromModel"] = liveAgentEdit
+    edited_mask = ~np.isnan(row_edit)
+    if edited_mask.any():
+        agent_categories = edits["agentCategory"].reindex(row_edit[edited_mask].astype(int)).to_numpy()
+        result_df.loc[edited_mask, "category"] = agent_categories
+        result_df.loc[edited_mask, "StackingPrediction"] = agent_categories
+        result_df.loc[edited_mask, "fromModel"] = liveAgentEdit
 
     return result_df
 
@@ -21,9 +21,6 @@ from labeling.preprocessing.preprocess import (
 from labeling.transaction_prep import initialize_transaction_fields
 from labeling.xgboost.analyzers import IA_get_model
 
-# Custom cache for format_ibv_category to handle unhashable types
-_format_ibv_category_cache = {}
-
 
 def format_ibv_category(value):
     """
@@ -34,26 +31,7 @@ def format_ibv_category(value):
     - If a stringified integer, returns config.OTHER.
     - Otherwise, returns the original value.
     """
-    import pandas as pd
-
-    # Create a cache key for hashable types
-    cache_key = None
-    if value is None:
-        cache_key = ("none", None)
-    elif isinstance(value, (str, int, float)):
-        cache_key = (type(value).__name__, value)
-    elif isinstance(value, list):
-        # Create cache key from list contents
-        try:
-            cache_key = ("list", tuple(value))  # Only works if list items are hashable
-        except TypeError:
-            cache_key = ("list", str(value))  # Fallback to string representation
 
-    # Check cache first
-    if cache_key is not None and cache_key in _format_ibv_category_cache:
-        return _format_ibv_category_cache[cache_key]
-
-    # Original logic
     def _join_list_elements(lst):
         string_elements = [item.strip() for item in lst if item is not None and isinstance(item, str)]
         if len(string_elements) > 0:
@@ -61,45 +39,69 @@ def format_ibv_category(value):
         else:
             return ""
 
-    result = None
-
     # 1. Handle actual lists (e.g., ["Transfer", "Loan"])
     if isinstance(value, list):
-        result = _join_list_elements(value)
-    elif pd.isna(value):
-        result = value
+        return _join_list_elements(value)
+    if pd.isna(value):
+        return value
     # 2. Handle string types (stringified integers, stringified lists, standard strings)
-    elif isinstance(value, str):
+    if isinstance(value, str):
         # Try to handle stringified lists (JSON format preferred)
         try:
             parsed_value = json.loads(value)
             if isinstance(parsed_value, list):
-                result = _join_list_elements(parsed_value)
+                return _join_list_elements(parsed_value)
         except json.JSONDecodeError:
             pass  # Not a valid JSON string, fall through to other checks
 
-        if result is None:
-            # Try to handle stringified integers
-            try:
-                int(value)
-                result = config.OTHER
-            except ValueError:
-                result = value  # Return original string
-    elif isinstance(value, (int, float)):
-        result = config.OTHER
+        # Try to handle stringified integers
+        try:
+            int(value)
+            return config.OTHER
+        except ValueError:
+            return value  # Return original string
+    if isinstance(value, (int, float)):
+        return config.OTHER
+    return value
+
+
+def _ibv_category_key(value):
+    """Hashable stand-in for a raw category value, so lists can be deduplicated alongside scalars."""
+    key = ("list", tuple(value)) if isinstance(value, list) else value
+    try:
+        hash(key)
+    except TypeError:
+        # unhashable values other than lists format to themselves, so they are never shared
+        key = ("list", str(value)) if isinstance(value, list) else ("object", id(value))
+    return key
+
+
+def format_ibv_categories(categories: pd.Series) -> pd.Series:
+    """
+    Applies format_ibv_category to a whole column, formatting each distinct raw value only once.
+    Null values are passed through unchanged, as format_ibv_category would.
+    """
+    if categories.empty:
+        return categories.copy()
+    raw_values = categories.to_numpy(dtype=object)
+    if categories.dtype == object:
+        keys = np.empty(len(raw_values), dtype=object)
+        # element-wise, so equal-length tuple keys are not broadcast into a 2-D array
+        for position, value in enumerate(raw_values):
+            keys[position] = _ibv_category_key(value)
     else:
-        result = value
+        keys = raw_values
+    codes, uniques = pd.factorize(keys)
 
-    # Cache the result if we have a valid cache key
-    if cache_key is not None:
-        # Limit cache size to prevent memory issues
-        if len(_format_ibv_category_cache) >= 500:
-            # Remove oldest entries (simple FIFO, not LRU but good enough)
-            oldest_key = next(iter(_format_ibv_category_cache))
-            del _format_ibv_category_cache[oldest_key]
-        _format_ibv_category_cache[cache_key] = result
+    # format one representative raw value per distinct key
+    _, first_positions = np.unique(codes, return_index=True)
+    if len(first_positions) and codes[first_positions[0]] == -1:
+        first_positions = first_positions[1:]
+    formatted = np.empty(len(uniques), dtype=object)
+    formatted[:] = [format_ibv_category(raw_values[position]) for position in first_positions]
 
-    return result
+    result = np.where(codes == -1, raw_values, formatted[codes] if len(formatted) else raw_values)
+    return pd.Series(result.tolist(), index=categories.index, name=categories.name)
 
 
 # def format_ibv_category(value):
@@ -137,7 +139,7 @@ def format_ibv_category(value):
 def predict_transaction(df: pd.DataFrame) -> pd.DataFrame:
     # Copy over IBV's categorization "category" into a new column "IBV_category"
     if config.CATEGORY_COLUMN_NAME in df.columns:
-        df[config.IBV_CATEGORY] = df[config.CATEGORY_COLUMN_NAME].apply(format_ibv_category)
+        df[config.IBV_CATEGORY] = format_ibv_categories(df[config.CATEGORY_COLUMN_NAME])
     else:
         logger.warning(f"Warning: Column '{config.CATEGORY_COLUMN_NAME}' not found in DataFrame.")
         df[config.IBV_CATEGORY] = None
@@ -307,11 +309,8 @@ def predict_transaction(df: pd.DataFrame) -> pd.DataFrame:
             (remainder_df["n_new_transactions"] > 0) & (remainder_df["n_labeled_transactions"] > 0)
         ]
 
-        mixed_transaction_clusters = (
-            mixed_transaction_clusters.groupby([config.IA_CUSTOMER_ID, "cluster_label"]).apply(
-                copy_labels_from_labeled_transactions
-            )
-            # .reset_index(drop=True)
+        mixed_transaction_clusters = copy_labels_from_labeled_transactions(
+            mixed_transaction_clusters, [config.IA_CUSTOMER_ID, "cluster_label"]
         )
 
         # Subset of already labeled transactions
@@ -447,30 +446,37 @@ def predict_transaction(df: pd.DataFrame) -> pd.DataFrame:
     return output
 
 
-def copy_labels_from_labeled_transactions(df_cluster):
+def copy_labels_from_labeled_transactions(df: pd.DataFrame, group_keys: list) -> pd.DataFrame:
     """
     Copy labels from labeled transactions to new transactions in the same cluster.
-    Guard against clusters that do not actually contain historical rows or where those
-    rows are missing a stacking prediction so we avoid mode()/iloc failures.
-    """
 
-    labeled_rows = df_cluster[~df_cluster.new_transaction]
-    if labeled_rows.empty:
-        return df_cluster
-
-    majority_series = labeled_rows.StackingPrediction.dropna()
-    if majority_series.empty:
-        return df_cluster
-
-    majority_label = majority_series.astype(str).mode()
-    if majority_label.empty:
-        return df_cluster
-
-    label = majority_label.iloc[0]
-    new_transaction_mask = df_cluster.new_transaction
-    df_cluster.loc[new_transaction_mask, config.STACKING_PREDICTION] = label
-    df_cluster.loc[new_transaction_mask, "fromModel"] = "copiedFromHistory"
-    return df_cluster
+    The majority label of each cluster's historical rows is computed in one grouped pass (ties resolve to the
+    lexicographically smallest label, as Series.mode does). Clusters without historical rows or without a stacking
+    prediction on those rows are left untouched. Rows come back grouped by ``group_keys`` and indexed by the group
+    keys plus the original index, the same shape groupby().apply used to produce.
+    """
+    df = df.dropna(subset=group_keys)
+
+    labeled_mask = ~df.new_transaction & df[config.STACKING_PREDICTION].notna()
+    labeled_rows = df.loc[labeled_mask, group_keys]
+    labeled_rows[config.STACKING_PREDICTION] = df.loc[labeled_mask, config.STACKING_PREDICTION].astype(str).to_numpy()
+    label_counts = labeled_rows.groupby(group_keys + [config.STACKING_PREDICTION]).size().rename("n").reset_index()
+    majority_labels = label_counts.sort_values(
+        group_keys + ["n", config.STACKING_PREDICTION],
+        ascending=[True] * len(group_keys) + [False, True],
+    ).drop_duplicates(subset=group_keys)
+
+    majority_label = df[group_keys].merge(
+        majority_labels[group_keys + [config.STACKING_PREDICTION]], how="left", on=group_keys
+    )[config.STACKING_PREDICTION]
+    copy_mask = df.new_transaction.to_numpy() & majority_label.notna().to_numpy()
+    if copy_mask.any():
+        df.loc[copy_mask, config.STACKING_PREDICTION] = majority_label.to_numpy()[copy_mask]
+        df.loc[copy_mask, "fromModel"] = "copiedFromHistory"
+
+    df = df.sort_values(group_keys, kind="stable")
+    df.index = pd.MultiIndex.from_arrays([df[key] for key in group_keys] + [df.index])
+    return df
 
 
 def redis_knowledgebase_prediction(df, redis_knowledge_base: RedisKnowledgeBase):
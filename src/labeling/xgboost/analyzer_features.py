@@ -5,6 +5,7 @@ import pandas as pd
 
 from config import config
 from utils.decorators import timer
+from utils.description_signals import DescriptionSignals
 
 strong_loan_patterns = re.compile(r"\bloan\b|\bloans\b|\blend\b|lending\b|\bmortgage\b|carpay|\bmtg\b", re.IGNORECASE)
 semi_loan_patterns = re.compile(r"cash|advance|financ|\bfin\b", re.IGNORECASE)
@@ -21,6 +22,17 @@ bank_transfer_patterns = re.compile(
 )
 semi_transfer_patterns = re.compile(r"\btransfer\b|\bdeposit\b|\bwithdraw\b|\bpayment\b|\bedeposit\b", re.IGNORECASE)
 
+# Signal families of the processed n-grams, searched once per unique n-gram of a customer
+INDICATOR_SIGNAL_FAMILIES = {
+    "strong_loan": (strong_loan_patterns, False),
+    "semi_loan": (semi_loan_patterns, False),
+    "weak_loan": (weak_loan_patterns, False),
+    "strong_payroll": (strong_payroll_patterns, False),
+    "strong_transfer": (strong_transfer_patterns, False),
+    "bank_transfer": (bank_transfer_patterns, False),
+    "semi_transfer": (semi_transfer_patterns, False),
+}
+
 
 class IAFeatures:
     """Income analyzer features."""
@@ -49,30 +61,28 @@ class IAFeatures:
 
     @staticmethod
     @timer
-    def cluster_level_desc_label(df_cluster: pd.DataFrame, target_col: str) -> pd.DataFrame:
+    def cluster_level_desc_label(
+        df_cluster: pd.DataFrame, target_col: str, signals: DescriptionSignals | None = None
+    ) -> pd.DataFrame:
         """Concat all different descriptions in one cluster together."""
 
-        # Vectorized string operations
         processed_n_gram = df_cluster.processed_n_gram
+        if signals is None:
+            signals = DescriptionSignals(processed_n_gram, families=INDICATOR_SIGNAL_FAMILIES)
+        indicators = {family: signals.flags(processed_n_gram, family) for family in INDICATOR_SIGNAL_FAMILIES}
 
-        has_strong_loan_indicators = processed_n_gram.str.contains(strong_loan_patterns).sum() / len(df_cluster) >= 0.5
-        has_semi_loan_indicators = processed_n_gram.str.contains(semi_loan_patterns).sum() / len(df_cluster) >= 0.5
-        has_weak_loan_indicators = processed_n_gram.str.contains(weak_loan_patterns).sum() / len(df_cluster) >= 0.5
+        has_strong_loan_indicators = indicators["strong_loan"].sum() / len(df_cluster) >= 0.5
+        has_semi_loan_indicators = indicators["semi_loan"].sum() / len(df_cluster) >= 0.5
+        has_weak_loan_indicators = indicators["weak_loan"].sum() / len(df_cluster) >= 0.5
 
-        has_strong_payroll_indicators = (
-            processed_n_gram.str.contains(strong_payroll_patterns).sum() / len(df_cluster) >= 0.5
-        )
-        has_strong_transfer_indicators = (
-            processed_n_gram.str.contains(strong_transfer_patterns).sum() / len(df_cluster) >= 0.5
-        )
-        has_bank_transfer_indicators = (
-            processed_n_gram.str.contains(bank_transfer_patterns).sum() / len(df_cluster) >= 0.5
-        )
+        has_strong_payroll_indicators = indicators["strong_payroll"].sum() / len(df_cluster) >= 0.5
+        has_strong_transfer_indicators = indicators["strong_transfer"].sum() / len(df_cluster) >= 0.5
+        has_bank_transfer_indicators = indicators["bank_transfer"].sum() / len(df_cluster) >= 0.5
         has_semi_transfer_indicators = (
-            (processed_n_gram.str.contains(semi_transfer_patterns))
-            & (~processed_n_gram.str.contains(strong_payroll_patterns))
-            & (~processed_n_gram.str.contains(strong_loan_patterns))
-            & (~processed_n_gram.str.contains(semi_loan_patterns))
+            indicators["semi_transfer"]
+            & ~indicators["strong_payroll"]
+            & ~indicators["strong_loan"]
+            & ~indicators["semi_loan"]
         ).sum() / len(df_cluster) >= 0.5
 
         # Check type of who, if it exists
@@ -284,8 +294,9 @@ class IAFeatures:
         df_num_vars["frequency"] = df_num_vars["counts"] / len_txn_hist
 
         # Keep the processed column for count vectorizer
+        signals = DescriptionSignals(df_customer.processed_n_gram, families=INDICATOR_SIGNAL_FAMILIES)
         df_cate_vars = df_customer.groupby("cluster_label").apply(
-            lambda x: IAFeatures.cluster_level_desc_label(x, target)
+            lambda x: IAFeatures.cluster_level_desc_label(x, target, signals)
         )
 
         if isinstance(df_cate_vars.index, pd.core.indexes.multi.MultiIndex):
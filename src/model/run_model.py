@@ -16,13 +16,16 @@ pd.set_option("mode.copy_on_write", True)
 
 
 @timer
-def run_model(input_data: Union[str, dict], timeframe: TimeFrame = TimeFrame.ALL) -> str:
+def run_model(
+    input_data: Union[str, dict], timeframe: TimeFrame = TimeFrame.ALL, output_fields: set[str] | None = None
+) -> str:
     """
     Run model with input data (supports both string and dict for backward compatibility).
 
     Args:
         input_data: Either a JSON string (V1/V2) or a dictionary (V3)
         timeframe: TimeFrame for analysis
+        output_fields: IAResponse fields to compute, None for the full output
 
     Returns:
         JSON string with analysis results
@@ -50,7 +53,9 @@ def run_model(input_data: Union[str, dict], timeframe: TimeFrame = TimeFrame.ALL
 
         start_time = datetime.now()
 
-        out = analyze_transactions(result, transactions_df, balance_df, application_info, IBV_auth_data)
+        out = analyze_transactions(
+            result, transactions_df, balance_df, application_info, IBV_auth_data, output_fields=output_fields
+        )
 
         end_time = datetime.now()
         elapsed = end_time - start_time
@@ -1,9 +1,11 @@
 import numpy as np
+import orjson
 import pandas as pd
 import simplejson
+from api.config import config as apiConfig
 from config import config
 from labeling.clustering import NER_Clustering
-from utils.utils import merge_duplicate_clusters
+from utils.utils import merge_duplicate_clusters, output_requested
 
 from postprocess.additional_info.additional_info import append_additional_info
 from postprocess.application_checker import application_checker
@@ -15,7 +17,12 @@ from postprocess.lending_guide.lending_guide import (
 
 
 def analyze_transactions(
-    labeled_transactions, transactions_df, balance_df, application_info=None, IBV_auth_data=None
+    labeled_transactions,
+    transactions_df,
+    balance_df,
+    application_info=None,
+    IBV_auth_data=None,
+    output_fields: set[str] | None = None,
 ) -> str:
     """
     Analyzes bank transactions and provides IA output
@@ -26,6 +33,8 @@ def analyze_transactions(
         - balance_df (DataFrame): account metadata associated w/ transactions
         - application_info (dict): application data provided by lender, default to None if not given
         - IBV_auth_data (dict): IBV data provided by IBV provider, default to None if not given
+        - output_fields (set): IAResponse fields the caller asks for, the stages only needed by other fields are
+          skipped, default to None for the full output
 
     Returns:
         - output_final: IAResponse as str
@@ -41,9 +50,15 @@ def analyze_transactions(
     balance_df_1 = balance_df.copy()
     transactions_df_1 = transactions_df.copy()
 
+    # The customer level scores are the account level scores of the customer level run, or of the account level
+    # run when there is a single account
+    customer_output_fields = output_fields
+    if output_fields is not None and apiConfig.CUSTOMER_LEVEL_SCORES in output_fields:
+        customer_output_fields = output_fields | {apiConfig.SCORES}
+
     # Source Level Features
     output_json_multi = feature_extraction(
-        labeled_transactions, formatted_as_of_date, balance_df, transactions_df, True
+        labeled_transactions, formatted_as_of_date, balance_df, transactions_df, True, customer_output_fields
     )
     output_json = feature_extraction(
         labeled_transactions_1,
@@ -51,6 +66,7 @@ def analyze_transactions(
         balance_df_1,
         transactions_df_1,
         False,
+        output_fields if output_json_multi is not None else customer_output_fields,
     )
 
     ## Application Checker result with comparing application data and IBV data
@@ -73,8 +89,10 @@ def analyze_transactions(
             output_json["scores"][key]["customerLevel"] = value["accountLevel"]
         output_json["scores"]["features"]["customerLevel"] = output_json["scores"]["features"]["accountLevel"]
 
-    output_json = append_customer_level_lending_guide(output_json)
-    output_json = append_account_level_lending_guides(output_json)
+    if output_requested(output_fields, "lendingGuide"):
+        output_json = append_customer_level_lending_guide(output_json)
+    if output_requested(output_fields, "accounts"):
+        output_json = append_account_level_lending_guides(output_json)
 
     ## I would propose to break the feature extraction into 2 parts:
     ## 1. Source level feature aggregation for all the existing features for red zone
@@ -83,7 +101,12 @@ def analyze_transactions(
     ## This way, not only we can add other features to the existing red zone models, but also things in source level feature aggregation
     ## DO NOT NEED TO BE RUN TWICE except for the atp feautres as all other customer level features are a simple sum/count/aggregation of
     ## account level features.
-    if application_info is not None and IBV_auth_data is not None:
+    # The application check result is not one of the verbosity fields, only the full and the v2 output have it
+    if (
+        application_info is not None
+        and IBV_auth_data is not None
+        and output_requested(output_fields, "ApplicationChecker")
+    ):
         application_check_result = application_checker(application_info, IBV_auth_data, output_json)
     else:
         application_check_result = {}
@@ -91,12 +114,23 @@ def analyze_transactions(
     output_json["modelVersion"] = config.MODEL_VERSION
     output_json = output_json | application_check_result
 
-    output_final = simplejson.dumps(output_json, ignore_nan=True, default=numpy_converter)
+    output_final = dump_output(output_json)
     return output_final
 
 
+def dump_output(output_json: dict) -> str:
+    """Encodes the IA output, NaN and inf become null, numpy values and dates are passed to numpy_converter"""
+    try:
+        return orjson.dumps(
+            output_json, default=numpy_converter, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        ).decode()
+    except orjson.JSONEncodeError:
+        # orjson only encodes valid UTF-8, simplejson escapes the lone surrogates of descriptions cut in an emoji
+        return simplejson.dumps(output_json, ignore_nan=True, default=numpy_converter)
+
+
 def numpy_converter(obj):
-    """Custom converter for numpy types to native JSON types"""
+    """Custom converter for numpy types and dates to native JSON types"""
     if isinstance(obj, np.integer):
         return int(obj)
     elif isinstance(obj, np.floating):
@@ -4,7 +4,7 @@ from utils.utils import df_to_json
 
 from postprocess.applicationCheck.auth_feature_check import auth_feature_check
 from postprocess.applicationCheck.income_check import income_feature_check
-from postprocess.scores.xgboost_scoring import xgboost_prediction
+from postprocess.scores.xgboost_scoring import feature_matrix, load_xgboost_model, xgboost_prediction
 
 
 def application_checker(application_info, IBV_auth_data, analyze_transactions_output):
@@ -87,7 +87,10 @@ def application_checker(application_info, IBV_auth_data, analyze_transactions_ou
     # No need to handle the case where redzone_features is empty,
     # as we'll just keep using model_features
 
-    formatted_model_features = data_type_adjustment(feature_renaming(model_features))
+    formatted_model_features = feature_matrix(
+        data_type_adjustment(feature_renaming(model_features)),
+        [list(load_xgboost_model(config.WITHDRAWN_MODEL_PATH).get_booster().feature_names)],
+    )
     (
         withdrawn_pred,
         withdrawn_model,
@@ -1,14 +1,17 @@
 import pandas as pd
 
 from postprocess.cashflow.atp.get_peak_features import get_all_peak_features
+from postprocess.cashflow.daily_balances import DailyBalances
 from utils.decorators import timer
 
 
 @timer
-def ATP_features(transactions: pd.DataFrame) -> pd.DataFrame:
+def ATP_features(transactions: pd.DataFrame, daily_balances: DailyBalances | None = None) -> pd.DataFrame:
+    if daily_balances is None:
+        daily_balances = DailyBalances(transactions)
     all_atp_features = (
         transactions.groupby("accountGuid")
-        .apply(get_all_peak_features)
+        .apply(lambda account: get_all_peak_features(account, daily_balances.time_series(account.name)))
         .reset_index()
     )
     return all_atp_features
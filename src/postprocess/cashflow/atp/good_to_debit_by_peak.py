@@ -15,48 +15,44 @@ def good_to_debit_by_peak(
     peak_distance: int,
 ) -> tuple[pd.DataFrame, NDArray[np.float64], dict[str, NDArray[np.float64]]]:
     peaks, peak_properties = find_peaks(time_series.net, prominence=prominence, distance=peak_distance)
-    peak_prominences = peak_properties["prominences"]
-
-    # Create a copy of time_series to avoid SettingWithCopyWarning
-    time_series_df = time_series.copy()
-    
-    # Initialize enough_balance column properly using loc
-    time_series_df.loc[:, "enough_balance"] = False
-
-    net_values = time_series_df.net.values
-
-    # Vectorized check for balance sufficiency
-    for i, peak in enumerate(peaks):
-        peak_prominence = peak_prominences[i]
-        if i == len(peaks) - 1:
-            next_peak = len(time_series_df)
-        else:
-            next_peak = peaks[i + 1]
-
-        # Vectorized operation to calculate the conditions across the range from peak to next_peak
-        net_differences = net_values[peak] - net_values[peak:next_peak]
-
-        # Calculate the condition in a vectorized manner
-        conditions_met = (peak_prominence - net_differences) > amount_due
-        time_series_df.loc[time_series_df.index[peak:next_peak], "enough_balance"] = conditions_met
-
-    # Use loc for column assignment
-    time_series_df.loc[:, "temp_interval_group"] = (~time_series_df.enough_balance).cumsum()
-    
-    # Reassign to original variable name
-    time_series = time_series_df
-    interval_length = (
-        time_series[time_series.enough_balance]
-        .groupby("temp_interval_group")
-        .agg(time_len=("enough_balance", "sum"))
-        .reset_index()
+    enough_balance, interval_group, time_len, good_to_debit = good_to_debit_intervals(
+        time_series.net.values, peaks, peak_properties["prominences"], amount_due, minimum_days
     )
-    time_series = (
-        time_series.reset_index()
-        .merge(interval_length, how="left", on="temp_interval_group")
-        .fillna(0)
-        .infer_objects(copy=False)
-        .set_index("date")
+    time_series = time_series.assign(
+        enough_balance=enough_balance,
+        temp_interval_group=interval_group,
+        time_len=time_len,
+        good_to_debit=good_to_debit,
     )
-    time_series["good_to_debit"] = time_series.enough_balance & (time_series.time_len >= minimum_days)
     return time_series, peaks, peak_properties
+
+
+def good_to_debit_intervals(
+    net: NDArray[np.float64],
+    peaks: NDArray[np.int64],
+    peak_prominences: NDArray[np.float64],
+    amount_due: int,
+    minimum_days: int,
+) -> tuple[NDArray[np.bool_], NDArray[np.int64], NDArray, NDArray[np.bool_]]:
+    """Days with enough balance after each peak and the intervals they make, over the whole series at once.
+
+    Returns:
+        tuple: Whether each day has enough balance, its interval group (a day without enough balance opening the
+            group of the days after it), the number of days with enough balance of its group and whether it is good to
+            debit (with enough balance in a group of at least minimum_days).
+    """
+
+    enough_balance = np.zeros(len(net), dtype=bool)
+    if len(peaks) > 0:
+        # Every day from a peak up to the next one is compared with that peak
+        peak_of_day = np.repeat(np.arange(len(peaks)), np.diff(np.r_[peaks, len(net)]))
+        net_differences = net[peaks][peak_of_day] - net[peaks[0] :]
+        enough_balance[peaks[0] :] = (peak_prominences[peak_of_day] - net_differences) > amount_due
+
+    interval_group = np.cumsum(~enough_balance)
+    interval_lengths = np.bincount(interval_group[enough_balance], minlength=len(net) + 1)
+    time_len = interval_lengths[interval_group]
+    if (time_len == 0).any():
+        # Lengths are floats as soon as a group has no day with enough balance (missing length filled with 0)
+        time_len = time_len.astype(float)
+    return enough_balance, interval_group, time_len, enough_balance & (time_len >= minimum_days)
@@ -3,21 +3,24 @@ import pandas as pd
 from api.config import config as apiConfig
 from config import config, settings
 from utils.decorators import timer
+from utils.description_signals import DescriptionSignals
+
+from postprocess.summary_info.account_windows import AccountWindows
 
 
 class Cashflow:
     @staticmethod
     @timer
-    def cashflow(result: pd.DataFrame, balance_df: pd.DataFrame) -> pd.DataFrame:
+    def cashflow(result: pd.DataFrame, balance_df: pd.DataFrame, windows: AccountWindows | None = None) -> pd.DataFrame:
         """Check total credits/debits."""
 
-        all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
+        if windows is None:
+            windows = AccountWindows(balance_df)
+
+        all_account_ids = windows.all_account_ids
         credits_ = result[result.type == "CREDIT"]
         debits = result[result.type == "DEBIT"]
-        end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
-        result = result.merge(end_date, how="left", on="accountGuid")
-        result["start_date"] = result.groupby(config.IA_ACCOUNT_ID).date.transform("min")
-        result["time_period"] = (pd.to_datetime(result["end_date"]) - pd.to_datetime(result["start_date"])).dt.days
+        time_period = windows.time_period(result).reset_index(drop=True)
         total_credits = credits_.groupby(config.IA_ACCOUNT_ID).agg(totalCredits=("amount", "sum"))
         total_debits = debits.groupby(config.IA_ACCOUNT_ID).agg(totalDebits=("amount", "sum"))
         total_credit_debit = (
@@ -27,15 +30,15 @@ class Cashflow:
         )
 
         # This has a potential issue for calculation, where total_credit_debit is one row per account while
-        # result.time_period is one row per unique accountGuid in transactions.
+        # time_period is one row per transaction.
         total_credit_debit[apiConfig.NET_CASH_FLOW] = (
             total_credit_debit.totalCredits - total_credit_debit.totalDebits
-        ) / np.maximum(1, result.time_period / 30)
+        ) / np.maximum(1, time_period / 30)
         total_credit_debit[apiConfig.NET_CASH_FLOW] = np.nan_to_num(
             total_credit_debit[apiConfig.NET_CASH_FLOW], nan=0.0
         )  # Replace NaN with 0.0
 
-        total_credit_debit[apiConfig.SPENDING] = total_credit_debit.totalDebits / np.maximum(1, result.time_period / 30)
+        total_credit_debit[apiConfig.SPENDING] = total_credit_debit.totalDebits / np.maximum(1, time_period / 30)
         total_credit_debit[apiConfig.SPENDING] = np.nan_to_num(
             total_credit_debit[apiConfig.SPENDING], nan=0.0
         )  # Replace NaN with 0.0
@@ -44,137 +47,82 @@ class Cashflow:
 
     @staticmethod
     @timer
-    def net_cashflow(result: pd.DataFrame, balance_df: pd.DataFrame) -> pd.DataFrame:
+    def net_cashflow(
+        result: pd.DataFrame, balance_df: pd.DataFrame, windows: AccountWindows | None = None
+    ) -> pd.DataFrame:
         """Net cash flow in summary info."""
 
-        all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
-        end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
-        result = result.merge(end_date, how="left", on="accountGuid")
-        result["start_date"] = result.groupby(config.IA_ACCOUNT_ID).date.transform("min")
-        result["time_period"] = (pd.to_datetime(result["end_date"]) - pd.to_datetime(result["start_date"])).dt.days
-        result["interval"] = (pd.to_datetime(result["end_date"]) - pd.to_datetime(result["date"])).dt.days
-        result["in_three_month"] = result.interval <= 90
-        result["in_six_month"] = result.interval <= 180
-        credits_ = result[result.type == "CREDIT"]
-        debits = result[result.type == "DEBIT"]
-
-        total_credits_all = (
-            credits_.groupby(config.IA_ACCOUNT_ID)
-            .agg(
-                totalCredits=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        total_debits_all = debits.groupby(config.IA_ACCOUNT_ID).agg(totalDebits=("amount", "sum")).reset_index()
-        total_credit_debit_all = total_credits_all.merge(total_debits_all, on=config.IA_ACCOUNT_ID, how="left")
-        total_credit_debit_all["cashflowAllTime"] = (
-            total_credit_debit_all.totalCredits - total_credit_debit_all.totalDebits
-        ) / np.maximum(1, result.time_period / 30)
-
-        total_credits_three_month = (
-            credits_[credits_.in_three_month]
-            .groupby(config.IA_ACCOUNT_ID)
-            .agg(
-                totalCredits=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        total_debits_three_month = (
-            debits[debits.in_three_month].groupby(config.IA_ACCOUNT_ID).agg(totalDebits=("amount", "sum")).reset_index()
-        )
-        total_credit_debit_three_month = total_credits_three_month.merge(
-            total_debits_three_month, on=config.IA_ACCOUNT_ID, how="left"
-        )
-        # Calculate the initial cashflow for all rows
-        total_credit_debit_three_month["cashflowThreeMonth"] = (
-            total_credit_debit_three_month.totalCredits - total_credit_debit_three_month.totalDebits
-        )
-
-        # For rows with time_period > 30, recalculate using a mask approach
-        mask = total_credit_debit_three_month["time_period"] > 30
-        if mask.any():
-            # Get the filtered data without chained indexing
-            filtered_df = total_credit_debit_three_month.loc[mask]
-
-            # Calculate the numerator
-            numerator = filtered_df.totalCredits - filtered_df.totalDebits
-
-            # Calculate the denominator with minimum
-            denominator = np.minimum(filtered_df.time_period, 90)
-
-            # Calculate the adjusted value
-            adjusted_values = (numerator / denominator) * 30
-
-            # Apply back to the original DataFrame with .loc
-            total_credit_debit_three_month.loc[mask, "cashflowThreeMonth"] = adjusted_values
-
-        total_credits_six_month = (
-            credits_[credits_.in_six_month]
-            .groupby(config.IA_ACCOUNT_ID)
-            .agg(
-                totalCredits=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        total_debits_six_month = (
-            debits[debits.in_six_month].groupby(config.IA_ACCOUNT_ID).agg(totalDebits=("amount", "sum")).reset_index()
-        )
-        total_credit_debit_six_month = total_credits_six_month.merge(
-            total_debits_six_month, on=config.IA_ACCOUNT_ID, how="left"
+        if windows is None:
+            windows = AccountWindows(balance_df)
+
+        all_account_ids = windows.all_account_ids
+        time_period = windows.time_period(result).reset_index(drop=True)
+        is_credit, is_debit = (result.type == "CREDIT").to_numpy(), (result.type == "DEBIT").to_numpy()
+        flows = pd.DataFrame(
+            {
+                config.IA_ACCOUNT_ID: result[config.IA_ACCOUNT_ID].to_numpy(),
+                "date": result["date"].to_numpy(),
+                "credit": result["amount"].where(is_credit).to_numpy(),
+                "debit": result["amount"].where(is_debit).to_numpy(),
+                "is_credit": is_credit.astype(np.int64),
+                "is_debit": is_debit.astype(np.int64),
+                "time_period": time_period.to_numpy(),
+            }
         )
-        # Calculate the initial cashflow for all rows
-        total_credit_debit_six_month["cashflowSixMonth"] = (
-            total_credit_debit_six_month.totalCredits - total_credit_debit_six_month.totalDebits
+        flows_by_window = windows.aggregate(
+            flows,
+            totalCredits=("credit", "sum"),
+            credits=("is_credit", "sum"),
+            totalDebits=("debit", "sum"),
+            debits=("is_debit", "sum"),
+            time_period=("time_period", "first"),
         )
 
-        # For rows with time_period > 30, recalculate using a mask approach
-        mask = total_credit_debit_six_month["time_period"] > 30
-        if mask.any():
-            # Get the filtered data without chained indexing
-            filtered_df = total_credit_debit_six_month.loc[mask]
-
-            # Calculate the numerator
-            numerator = filtered_df.totalCredits - filtered_df.totalDebits
-
-            # Calculate the denominator with minimum
-            denominator = np.minimum(filtered_df.time_period, 180)
-
-            # Calculate the adjusted value
-            adjusted_values = (numerator / denominator) * 30
-
-            # Apply back to the original DataFrame with .loc
-            total_credit_debit_six_month.loc[mask, "cashflowSixMonth"] = adjusted_values
-
-        total_credit_debit = (
-            all_account_ids.merge(
-                total_credit_debit_all[[config.IA_ACCOUNT_ID, "cashflowAllTime"]],
-                how="left",
-                on=config.IA_ACCOUNT_ID,
-            )
-            .merge(
-                total_credit_debit_three_month[[config.IA_ACCOUNT_ID, "cashflowThreeMonth"]],
-                how="left",
-                on=config.IA_ACCOUNT_ID,
-            )
-            .merge(
-                total_credit_debit_six_month[[config.IA_ACCOUNT_ID, "cashflowSixMonth"]],
-                how="left",
-                on=config.IA_ACCOUNT_ID,
+        total_credit_debit = all_account_ids
+        for window, cashflow, max_period in [
+            ("all_time", "cashflowAllTime", None),
+            ("three_month", "cashflowThreeMonth", 90),
+            ("six_month", "cashflowSixMonth", 180),
+        ]:
+            # Accounts with credits in the window, their debits are missing when they have none
+            window_flows = flows_by_window[window]
+            window_flows = window_flows[window_flows.credits > 0].reset_index(drop=True)
+            if result["amount"].dtype.kind in "iu":
+                # Masking the amounts by type made them floats, the totals are integers like the amounts
+                window_flows[["totalCredits", "totalDebits"]] = window_flows[["totalCredits", "totalDebits"]].astype(
+                    result["amount"].dtype
+                )
+            window_flows["totalDebits"] = window_flows.totalDebits.where(window_flows.debits > 0)
+            if max_period is None:
+                # Like cashflow, the per account flows are divided by the time periods of the first transactions
+                window_flows[cashflow] = (window_flows.totalCredits - window_flows.totalDebits) / np.maximum(
+                    1, time_period / 30
+                )
+            else:
+                # Calculate the initial cashflow for all rows
+                window_flows[cashflow] = window_flows.totalCredits - window_flows.totalDebits
+
+                # For rows with time_period > 30, recalculate over at most the days of the window
+                mask = window_flows["time_period"] > 30
+                if mask.any():
+                    filtered_df = window_flows.loc[mask]
+                    numerator = filtered_df.totalCredits - filtered_df.totalDebits
+                    denominator = np.minimum(filtered_df.time_period, max_period)
+                    window_flows.loc[mask, cashflow] = (numerator / denominator) * 30
+
+            total_credit_debit = total_credit_debit.merge(
+                window_flows[[config.IA_ACCOUNT_ID, cashflow]], how="left", on=config.IA_ACCOUNT_ID
             )
-            .fillna(0)
-        )
 
-        return total_credit_debit
+        return total_credit_debit.fillna(0)
 
     # For NDD campaign, returns the total inflow excluding loans for the past 30 days.
 
     @staticmethod
     @timer
-    def inflow_excluding_loans(balance_df: pd.DataFrame, credit_trans: pd.DataFrame) -> pd.DataFrame:
-        refund_list = [r"\bfee\b", r"\breturn\b", r"\brefund\b", r"\breversal\b", r"\brebate\b"]
+    def inflow_excluding_loans(
+        balance_df: pd.DataFrame, credit_trans: pd.DataFrame, signals: DescriptionSignals | None = None
+    ) -> pd.DataFrame:
         all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
         end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
         credits_cashflow = credit_trans.merge(end_date, how="left", on=config.IA_ACCOUNT_ID)
@@ -185,27 +133,15 @@ class Cashflow:
         # Find credit transactions within last 30 days, which is not a loan
         recent_inflow = credits_cashflow[credits_cashflow.date_diff <= 30]
         recent_inflow_excluding_loans = recent_inflow[recent_inflow.transCategory != 6]
+        if signals is None:
+            signals = DescriptionSignals(recent_inflow_excluding_loans.description)
         recent_inflow_excluding_loans = recent_inflow_excluding_loans[
-            ~recent_inflow_excluding_loans.description.str.lower().str.contains(r"|".join(refund_list), na=False)
+            ~signals.flags(recent_inflow_excluding_loans.description, "refund")
         ]
 
         if not settings.TREAT_BALANCE_TRANSFER_AS_INFLOW:
-            balance_transfer_list = [
-                r"\bto\b.*\bchecking\b",
-                r"\bfrom.*\bchecking\b",
-                r"\bfrom.*\bchk\b",
-                r"\bshare\b",
-                r"\bround up\b",
-                r"\bsave as you go\b",
-                r"\bfrom.*\bsav",
-                r"\bbank",
-                r"\bcredit.*line.*transfer\b",
-                r"\breverse.*monthly.*service.*charge\b",
-            ]
             recent_inflow_excluding_loans = recent_inflow_excluding_loans[
-                ~recent_inflow_excluding_loans.description.str.lower().str.contains(
-                    r"|".join(balance_transfer_list), na=False
-                )
+                ~signals.flags(recent_inflow_excluding_loans.description, "balance_transfer")
             ]
 
         # Agg total amount for each ID
@@ -0,0 +1,80 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from config import config
+
+
+class DailyBalances:
+    """Daily credits, debits and net transactions of every account of a request, grouped once.
+
+    The ATP time series runs the credits minus the debits forward from 0 over the days with transactions, the average
+    balances run the net transactions back from the current balance, each keeping the daily sums it always used.
+    """
+
+    def __init__(self, transactions: pd.DataFrame):
+        amount = transactions[config.IA_AMOUNT]
+        credit = (transactions[config.IA_TYPE] == "CREDIT").to_numpy()
+        debit = (transactions[config.IA_TYPE] == "DEBIT").to_numpy()
+        daily = (
+            pd.DataFrame(
+                {
+                    config.IA_ACCOUNT_ID: transactions[config.IA_ACCOUNT_ID].to_numpy(),
+                    config.IA_DATE: pd.to_datetime(transactions[config.IA_DATE]).to_numpy(),
+                    "credits": amount.where(credit).to_numpy(),
+                    "debits": amount.where(debit).to_numpy(),
+                    # Anything but a debit adds to the balance
+                    "transactions": amount.where(~debit, -amount).to_numpy(),
+                }
+            )
+            .groupby([config.IA_ACCOUNT_ID, config.IA_DATE])
+            .sum()
+        )
+
+        accounts = daily.index.get_level_values(0)
+        starts = np.flatnonzero(np.r_[True, accounts[1:] != accounts[:-1]]) if len(daily) else np.array([], int)
+        ends = np.r_[starts[1:], len(daily)].astype(int)
+        self._accounts = dict(zip(accounts[starts], zip(starts, ends)))
+        self._dates = daily.index.get_level_values(1).to_numpy()
+        self._credits = daily["credits"].to_numpy()
+        self._debits = daily["debits"].to_numpy()
+        self._transactions = daily["transactions"].to_numpy()
+
+    def __contains__(self, account) -> bool:
+        return account in self._accounts
+
+    def time_series(self, account) -> pd.DataFrame:
+        """Daily running credits minus debits of an account, padded with a 0 day before and a reflected day after."""
+
+        start, end = self._accounts[account]
+        dates = pd.DatetimeIndex(self._dates[start:end])
+        days = pd.date_range(dates[0].floor("D"), dates[-1].floor("D"), freq="D")
+        credits_ = pd.Series(self._credits[start:end], index=dates).reindex(days, fill_value=0)
+        debits = pd.Series(self._debits[start:end], index=dates).reindex(days, fill_value=0)
+        net = np.cumsum((credits_ - debits).to_numpy(dtype=float))
+
+        # Pad one day before beginning (0 padding to show the first day of inflow)
+        net = np.r_[0.0, net]
+        # Pad one day after the end (reflection padding bc no information)
+        net = np.r_[net, net[-2]]
+        index = pd.date_range(days[0] - pd.Timedelta(days=1), days[-1] + pd.Timedelta(days=1), freq="D", name="date")
+        return pd.DataFrame({"net": net}, index=index)
+
+    def balances(self, account, cur_bal, cur_date: date) -> pd.DataFrame:
+        """Start of day balances of an account from its current balance back to its first transaction, latest first,
+        with the 30 day month before cur_date of each day (1 to 6, missing before that)."""
+
+        start, end = self._accounts[account]
+        dates = pd.DatetimeIndex(self._dates[start:end])
+        start_date = min(dates[0].date(), cur_date)
+        days = pd.date_range(start=start_date, end=cur_date)
+        # Assumption: if there is no transaction record, the daily cashflow is 0.
+        transactions = pd.Series(self._transactions[start:end], index=dates).reindex(days).fillna(0)[::-1]
+
+        days_before = (pd.Timestamp(cur_date) - days[::-1]).days.to_numpy()
+        return pd.DataFrame(
+            {
+                "balance": (-transactions.cumsum() + float(cur_bal)).to_numpy(),
+                "month": np.where(days_before < 180, days_before // 30 + 1, np.nan),
+            }
+        )
@@ -1,22 +1,147 @@
 import pandas as pd
 from config import config, settings
 from utils.decorators import timer
-from utils.utils import df_to_json, remove_account_guid
+from utils.description_signals import DescriptionSignals
+from utils.utils import df_to_json, output_requested, remove_account_guid
 
 from postprocess.cashflow.atp.atp_features import ATP_features
 from postprocess.cashflow.cashflow import Cashflow
+from postprocess.cashflow.daily_balances import DailyBalances
 from postprocess.overdrafts.overdraft_detection import overdraft_detection
 from postprocess.scores.alerts_and_insights import alerts_and_insights
-from postprocess.sources.benefit_source import BenefitSource
-from postprocess.sources.gig_source import GigSource
+from postprocess.sources.categorize_sources import categorize_sources
 from postprocess.sources.helpers.rank_income import rank_income_sources
 from postprocess.sources.income_source import IncomeSource
 from postprocess.sources.loan_source import LoanSource
-from postprocess.sources.transfer_source import TransferSource
+from postprocess.stage_graph import Stage, run_stages
+from postprocess.summary_info.account_windows import AccountWindows
 from postprocess.summary_info.average_balances import AverageBalances
 from postprocess.summary_info.bank_card import BankCard
 
 
+def rename_account_guid(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.rename(columns={"accountGUID": config.IA_ACCOUNT_ID})
+
+
+# Stages of the features of every account, each reading the request inputs (result, as_of_date, balance_df,
+# transactions_df) and the outputs of the stages before it. Stages sharing no data run concurrently.
+FEATURE_STAGES = {
+    # Keyword signals of every description, shared by the sources, cashflow, overdrafts and reasons
+    "signals": Stage(
+        lambda result, transactions_df: DescriptionSignals(
+            result[config.IA_ORIGINAL_DESCRIPTION], result["description"], transactions_df["description"]
+        ),
+        ("result", "transactions_df"),
+    ),
+    # Daily balances of every account, shared by the ATP features and the average balances
+    "daily_balances": Stage(DailyBalances, ("transactions_df",)),
+    # Account end dates with their all time / 3 month / 6 month windows, shared by the by month metrics
+    "windows": Stage(AccountWindows, ("balance_df",)),
+    # Run ATP features (not directly related to label identification)
+    "atp_features": Stage(
+        lambda transactions_df, daily_balances: ATP_features(transactions_df.copy(), daily_balances),
+        ("transactions_df", "daily_balances"),
+    ),
+    # High level features
+    # -------------------
+    # Aggregate income and loan sources
+    "sources": Stage(
+        categorize_sources,
+        ("result", "as_of_date", "signals"),
+        (
+            "payroll_source_dict",
+            "transfer_source_dict",
+            "benefit_source_dict",
+            "gig_source_dict",
+            "income_source_trans",
+            "loan_source_dict",
+            "loan_source_trans",
+        ),
+    ),
+    "ranked_income_sources": Stage(
+        rank_income_sources,
+        ("payroll_source_dict", "transfer_source_dict", "benefit_source_dict", "gig_source_dict", "balance_df"),
+        ("income_df_sorted", "dominant_income_type"),
+    ),
+    # Bank card detection
+    "bank_card_info": Stage(
+        lambda result, balance_df: BankCard().match_card(result, balance_df), ("result", "balance_df")
+    ),
+    # Income source count
+    "income_source_cnt": Stage(
+        lambda income_df_sorted, balance_df, windows: IncomeSource.income_by_month(
+            income_df_sorted, balance_df, windows
+        ).rename(
+            columns={
+                "accountGUID": config.IA_ACCOUNT_ID,
+                "all_time": "incomeSourceAllTime",
+                "three_month": "incomeSourceThreeMonth",
+                "six_month": "incomeSourceSixMonth",
+            }
+        ),
+        ("income_df_sorted", "balance_df", "windows"),
+    ),
+    # Income history all time, 3 month, 6 month
+    "income_history_output": Stage(
+        lambda income_source_trans, balance_df, windows: rename_account_guid(
+            IncomeSource.income_history(income_source_trans, balance_df, windows)
+        ),
+        ("income_source_trans", "balance_df", "windows"),
+    ),
+    # Monthly income of only counting recurring income
+    "monthly_income_recurring": Stage(IncomeSource.recurring_monthly_income, ("income_df_sorted", "balance_df")),
+    "active_income_recurring": Stage(
+        lambda income_df_sorted, balance_df: IncomeSource.recurring_monthly_income(
+            income_df_sorted, balance_df, payroll_only=False
+        ),
+        ("income_df_sorted", "balance_df"),
+    ),
+    # Monthly income by all time, 3 month, 6 month
+    "monthly_income": Stage(
+        lambda income_source_trans, balance_df, windows: rename_account_guid(
+            IncomeSource.averageMonthlyIncome_by_month(income_source_trans, balance_df, windows)
+        ),
+        ("income_source_trans", "balance_df", "windows"),
+    ),
+    "cash_flow_data": Stage(
+        lambda result, balance_df, windows: rename_account_guid(Cashflow.cashflow(result, balance_df, windows)),
+        ("result", "balance_df", "windows"),
+    ),
+    "net_cash_flow_data": Stage(
+        lambda result, balance_df, windows: rename_account_guid(Cashflow.net_cashflow(result, balance_df, windows)),
+        ("result", "balance_df", "windows"),
+    ),
+    # Inflow within 30 days excluding loans
+    "inflow_excluding_loans": Stage(Cashflow.inflow_excluding_loans, ("balance_df", "income_source_trans", "signals")),
+    # Monthly loan payment by all time, 3 month, 6 month
+    "avg_monthly_loan_payment": Stage(
+        lambda loan_source_trans, balance_df, windows: rename_account_guid(
+            LoanSource.averageMonthlyLoanPmt_by_month(loan_source_trans, balance_df, windows)
+        ),
+        ("loan_source_trans", "balance_df", "windows"),
+    ),
+    # Number of loan sources by all time, 3 month, 6 month
+    "loan_source_cnt": Stage(
+        lambda loan_source_trans, balance_df, windows: rename_account_guid(
+            LoanSource.loan_by_month(loan_source_trans, balance_df, windows)
+        ),
+        ("loan_source_trans", "balance_df", "windows"),
+    ),
+    # Overdrafts
+    "overdrafts": Stage(
+        overdraft_detection,
+        ("transactions_df", "balance_df", "signals", "windows"),
+        ("on_cnt", "incidents", "odf_incidents", "nsf_incidents"),
+    ),
+    "avg_balance": Stage(
+        lambda balance_df, transactions_df, daily_balances: AverageBalances().avg_balances_all_accounts(
+            balance_df, transactions_df, daily_balances
+        ),
+        ("balance_df", "transactions_df", "daily_balances"),
+    ),
+}
+
+
 @timer
 def feature_extraction(
     result: pd.DataFrame,
@@ -24,6 +149,7 @@ def feature_extraction(
     balance_df: pd.DataFrame,
     transactions_df: pd.DataFrame,  # TODO: is this actually needed?
     multi: bool,
+    output_fields: set[str] | None = None,
 ) -> dict[str, list[dict]]:
     balance_df["currentBalance"] = balance_df["currentBalance"].apply(float)
     if multi:
@@ -39,94 +165,41 @@ def feature_extraction(
         # change result and transactions df
         result[config.IA_ACCOUNT_ID] = fake_cust_id
         transactions_df[config.IA_ACCOUNT_ID] = fake_cust_id
-    # Run ATP features (not directly related to label identification)
-    atp_features = ATP_features(transactions_df.copy())
-
-    # High level features
-    # -------------------
-    # Aggregate income sources
-    sourceID = 0
-
-    payroll_source_dict, income_source_trans, sourceID = IncomeSource.categorize_income_source(
-        result, as_of_date=formatted_as_of_date, sourceID=sourceID
-    )
-    transfer_source_dict, income_source_trans, sourceID = TransferSource.categorize_income_source(
-        result,
-        income_source_trans,
-        as_of_date=formatted_as_of_date,
-        sourceID=sourceID,
-    )
-    benefit_source_dict, income_source_trans, sourceID = BenefitSource.categorize_income_source(
-        result,
-        income_source_trans,
-        as_of_date=formatted_as_of_date,
-        sourceID=sourceID,
+    # Features of every account, the merges below keep the order of the sequential run
+    stage_values, _ = run_stages(
+        FEATURE_STAGES,
+        {
+            "result": result,
+            "as_of_date": formatted_as_of_date,
+            "balance_df": balance_df,
+            "transactions_df": transactions_df,
+        },
+        max_workers=config.POSTPROCESS_MAX_WORKERS,
     )
-    gig_source_dict, income_source_trans, sourceID = GigSource.categorize_income_source(
-        result,
-        income_source_trans,
-        as_of_date=formatted_as_of_date,
-        sourceID=sourceID,
-    )
-
-    # Aggregate loan sources
-    sourceID = 0
-    loan_source_dict, loan_source_trans = LoanSource.categorize_loan_source(result, sourceID=sourceID)
-
-    income_df_sorted, dominant_income_type = rank_income_sources(
-        payroll_source_dict,
-        transfer_source_dict,
-        benefit_source_dict,
-        gig_source_dict,
-        balance_df,
-    )
-
-    # Bank card detection
-    bank_card_info = BankCard().match_card(result, balance_df)
+    signals = stage_values["signals"]
+    atp_features = stage_values["atp_features"]
+    income_source_trans = stage_values["income_source_trans"]
+    loan_source_dict = stage_values["loan_source_dict"]
+    loan_source_trans = stage_values["loan_source_trans"]
+    income_df_sorted = stage_values["income_df_sorted"]
+    dominant_income_type = stage_values["dominant_income_type"]
+    bank_card_info = stage_values["bank_card_info"]
+    income_source_cnt = stage_values["income_source_cnt"]
+    income_history_output = stage_values["income_history_output"]
+    monthly_income_recurring = stage_values["monthly_income_recurring"]
+    active_income_recurring = stage_values["active_income_recurring"]
+    monthly_income = stage_values["monthly_income"]
+    cash_flow_data = stage_values["cash_flow_data"]
+    net_cash_flow_data = stage_values["net_cash_flow_data"]
+    inflow_excluding_loans = stage_values["inflow_excluding_loans"]
+    avg_monthly_loan_payment = stage_values["avg_monthly_loan_payment"]
+    loan_source_cnt = stage_values["loan_source_cnt"]
+    on_cnt = stage_values["on_cnt"]
+    incidents = stage_values["incidents"]
+    odf_incidents = stage_values["odf_incidents"]
+    nsf_incidents = stage_values["nsf_incidents"]
+    avg_balance = stage_values["avg_balance"]
 
-    # Income source count
-
-    income_source_cnt = IncomeSource.income_by_month(income_df_sorted, balance_df).rename(
-        columns={
-            "accountGUID": config.IA_ACCOUNT_ID,
-            "all_time": "incomeSourceAllTime",
-            "three_month": "incomeSourceThreeMonth",
-            "six_month": "incomeSourceSixMonth",
-        }
-    )
-
-    # Income history all time, 3 month, 6 month
-    income_history_output = IncomeSource.income_history(income_source_trans, balance_df).rename(
-        columns={"accountGUID": config.IA_ACCOUNT_ID}
-    )
-
-    # Monthly income of only counting recurring income
-    monthly_income_recurring = IncomeSource.recurring_monthly_income(income_df_sorted, balance_df)
-    active_income_recurring = IncomeSource.recurring_monthly_income(income_df_sorted, balance_df, payroll_only=False)
-
-    # Monthly income by all time, 3 month, 6 month
-    monthly_income = IncomeSource.averageMonthlyIncome_by_month(income_source_trans, balance_df).rename(
-        columns={"accountGUID": config.IA_ACCOUNT_ID}
-    )
-
-    cash_flow_data = Cashflow.cashflow(result, balance_df).rename(columns={"accountGUID": config.IA_ACCOUNT_ID})
-    net_cash_flow_data = Cashflow.net_cashflow(result, balance_df).rename(columns={"accountGUID": config.IA_ACCOUNT_ID})
-    # Inflow within 30 days excluding loans
-    inflow_excluding_loans = Cashflow.inflow_excluding_loans(balance_df, income_source_trans)
-
-    # Monthly loan payment by all time, 3 month, 6 month
-    avg_monthly_loan_payment = LoanSource.averageMonthlyLoanPmt_by_month(loan_source_trans, balance_df).rename(
-        columns={"accountGUID": config.IA_ACCOUNT_ID}
-    )
-
-    # Number of loan sources by all time, 3 month, 6 month
-    loan_source_cnt = LoanSource.loan_by_month(loan_source_trans, balance_df).rename(
-        columns={"accountGUID": config.IA_ACCOUNT_ID}
-    )
-
-    # Overdrafts
-    on_cnt, incidents, odf_incidents, nsf_incidents = overdraft_detection(transactions_df, balance_df)
-    avg_balance = AverageBalances().avg_balances_all_accounts(balance_df, transactions_df)
     summary_info = (
         bank_card_info.merge(income_source_cnt, how="left", on=config.IA_ACCOUNT_ID)
         .merge(monthly_income, on=config.IA_ACCOUNT_ID, how="left")
@@ -161,50 +234,17 @@ def feature_extraction(
         atp_features,
         result,
         as_of_date=formatted_as_of_date,
+        signals=signals,
+        output_fields=output_fields,
     )
 
     if multi:
         remove_account_guid(scores)
-    # Add loan source to credit
-    income_source_trans.loc[
-        (loan_source_trans[config.IA_TYPE] == "CREDIT") & (loan_source_trans.sourceID != "None"),
-        ["sourceID", "transCategory"],
-    ] = loan_source_trans.loc[
-        (loan_source_trans[config.IA_TYPE] == "CREDIT") & (loan_source_trans.sourceID != "None"),
-        ["sourceID", "transCategory"],
-    ]
-    income_source_trans = income_source_trans.rename(
-        columns={"cluster_label": "clusterLabel", "transGUID": "transGuid"}
-    )
-
-    credits = income_source_trans.drop(columns="subcategory").copy()
-    loan_source_trans = loan_source_trans.rename(columns={"cluster_label": "clusterLabel", "transGUID": "transGuid"})
-    debits = loan_source_trans[loan_source_trans[config.IA_TYPE] == "DEBIT"].copy()
-
-    # Add ibvCategory to credits and debits
-    credits[config.IBV_CATEGORY] = result[config.IBV_CATEGORY]
-    credits[config.STACKING_PREDICTION] = result[config.STACKING_PREDICTION]
-    debits[config.IBV_CATEGORY] = result[config.IBV_CATEGORY]
-    debits[config.STACKING_PREDICTION] = result[config.STACKING_PREDICTION]
-    if "id" in result.columns:
-        credits["id"] = result["id"]
-        debits["id"] = result["id"]
-        credits = credits.drop(columns=["transGuid"])
-        debits = debits.drop(columns=["transGuid"])
-
-    # Lowercase WHO, WHAT, HOW column names, just the names not the values
-    credits = credits.rename(columns={config.WHO_COL: config.WHO_COL.lower()})
-    debits = debits.rename(columns={config.WHO_COL: config.WHO_COL.lower()})
-    credits = credits.rename(columns={config.WHAT_COL: config.WHAT_COL.lower()})
-    debits = debits.rename(columns={config.WHAT_COL: config.WHAT_COL.lower()})
-    credits = credits.rename(columns={config.HOW_COL: config.HOW_COL.lower()})
-    debits = debits.rename(columns={config.HOW_COL: config.HOW_COL.lower()})
-
-    # Change sourceID from "None" to "Other" as DMA team suggested (Whether
-    # this change should be done on the backend is debateable and this change
-    # might result in reverting the model version)
-    credits.loc[credits.sourceID == "None", "sourceID"] = "Other"
-    debits.loc[debits.sourceID == "None", "sourceID"] = "Other"
+    # Transaction lists are only part of the account level output
+    output_credits = not multi and output_requested(output_fields, "creditTrans")
+    output_debits = not multi and output_requested(output_fields, "debitTrans")
+    if output_credits or output_debits:
+        credits, debits = transaction_lists(result, income_source_trans, loan_source_trans)
 
     if not multi:
         # add red zone and alerts and insights to summaryInfo
@@ -222,10 +262,12 @@ def feature_extraction(
             "nsfFeeIncidents": df_to_json(nsf_incidents),
             "cashFlow": df_to_json(cash_flow_data.drop(columns=["large_inflow", "low_inflow"])),
             "majorIncomeSource": df_to_json(dominant_income_type),
-            "creditTrans": df_to_json(credits),
-            "debitTrans": df_to_json(debits),
-            "scores": scores,
         }
+        if output_credits:
+            output_json["creditTrans"] = df_to_json(credits)
+        if output_debits:
+            output_json["debitTrans"] = df_to_json(debits)
+        output_json["scores"] = scores
     else:
         redzone_json = df_to_json(redzone)
         remove_account_guid(redzone_json)
@@ -243,14 +285,60 @@ def feature_extraction(
             "redZoneBehavior": redzone_json,
             "alertsAndInsights": alerts_insights_json,
             "majorIncomeSource": df_to_json(dominant_income_type),
-            "creditTrans": df_to_json(credits),
-            "debitTrans": df_to_json(debits),
             "scores": scores,
         }
 
-    if settings.settings_dict["OUTPUT_ATP_FEATURES"]:
+    if settings.settings_dict["OUTPUT_ATP_FEATURES"] and output_requested(output_fields, "atpFeatures"):
         output_json["atpFeatures"] = df_to_json(atp_features)
-    if settings.settings_dict["OUTPUT_REDZONE_EXPLANATION"]:
+    if settings.settings_dict["OUTPUT_REDZONE_EXPLANATION"] and output_requested(output_fields, "redZoneExplanation"):
         output_json["redZoneExplanation"] = df_to_json(red_zone_explaination)
 
     return output_json
+
+
+def transaction_lists(
+    result: pd.DataFrame, income_source_trans: pd.DataFrame, loan_source_trans: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Credit and debit transactions of the output with their sources and categories"""
+    # Add loan source to credit
+    income_source_trans.loc[
+        (loan_source_trans[config.IA_TYPE] == "CREDIT") & (loan_source_trans.sourceID != "None"),
+        ["sourceID", "transCategory"],
+    ] = loan_source_trans.loc[
+        (loan_source_trans[config.IA_TYPE] == "CREDIT") & (loan_source_trans.sourceID != "None"),
+        ["sourceID", "transCategory"],
+    ]
+    income_source_trans = income_source_trans.rename(
+        columns={"cluster_label": "clusterLabel", "transGUID": "transGuid"}
+    )
+
+    credits = income_source_trans.drop(columns="subcategory").copy()
+    loan_source_trans = loan_source_trans.rename(columns={"cluster_label": "clusterLabel", "transGUID": "transGuid"})
+    debits = loan_source_trans[loan_source_trans[config.IA_TYPE] == "DEBIT"].copy()
+
+    # Add ibvCategory to credits and debits
+    credits[config.IBV_CATEGORY] = result[config.IBV_CATEGORY]
+    credits[config.STACKING_PREDICTION] = result[config.STACKING_PREDICTION]
+    debits[config.IBV_CATEGORY] = result[config.IBV_CATEGORY]
+    debits[config.STACKING_PREDICTION] = result[config.STACKING_PREDICTION]
+    if "id" in result.columns:
+        credits["id"] = result["id"]
+        debits["id"] = result["id"]
+        credits = credits.drop(columns=["transGuid"])
+        debits = debits.drop(columns=["transGuid"])
+
+    # Lowercase WHO, WHAT, HOW column names, just the names not the values
+    credits = credits.rename(columns={config.WHO_COL: config.WHO_COL.lower()})
+    debits = debits.rename(columns={config.WHO_COL: config.WHO_COL.lower()})
+    credits = credits.rename(columns={config.WHAT_COL: config.WHAT_COL.lower()})
+    debits = debits.rename(columns={config.WHAT_COL: config.WHAT_COL.lower()})
+    credits = credits.rename(columns={config.HOW_COL: config.HOW_COL.lower()})
+    debits = debits.rename(columns={config.HOW_COL: config.HOW_COL.lower()})
+
+    # Change sourceID from "None" to "Other" as DMA team suggested (Whether
+    # this change should be done on the backend is debateable and this change
+    # might result in reverting the model version)
+    credits.loc[credits.sourceID == "None", "sourceID"] = "Other"
+    debits.loc[debits.sourceID == "None", "sourceID"] = "Other"
+
+    return credits, debits
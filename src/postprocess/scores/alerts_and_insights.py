@@ -1,11 +1,14 @@
 import pandas as pd
 from config import config, settings
 from utils.decorators import timer
-from utils.utils import df_to_json
+from utils.description_signals import DescriptionSignals
+from utils.utils import df_to_json, output_requested
 
-from postprocess.scores.auto_gluon_scoring import Calibrator, auto_gluon_prediction
+from postprocess.scores.auto_gluon_scoring import auto_gluon_prediction, load_auto_gluon_model, load_calibrator
 from postprocess.scores.redzone_explain import binary_shap_explain
 from postprocess.scores.xgboost_scoring import (
+    feature_matrix,
+    load_xgboost_model,
     make_scores,
     parse_model_reasons,
     xgb_features,
@@ -23,6 +26,8 @@ def alerts_and_insights(
     atp_df: pd.DataFrame,
     transactions_df: pd.DataFrame = None,
     as_of_date: pd.Timestamp | None = None,
+    signals: DescriptionSignals | None = None,
+    output_fields: set[str] | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     # load IA output table
     all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
@@ -142,6 +147,18 @@ def alerts_and_insights(
     )
     account_list = model_input[config.IA_ACCOUNT_ID].tolist()
 
+    # One feature matrix with the features of every model, each of them is scored from it
+    model_input = feature_matrix(
+        model_input,
+        [
+            list(load_xgboost_model(config.REDZONE_MODEL_FILE_PATH).get_booster().feature_names),
+            list(load_auto_gluon_model(config.REDZONE_MODEL_FILE_PATH_V2).features()),
+            list(load_xgboost_model(config.REPEAT_MODEL_FILE_PATH).get_booster().feature_names),
+            list(load_xgboost_model(config.TOTALLOANPAIDOFF_MODEL_FILE_PATH).get_booster().feature_names),
+            list(load_xgboost_model(config.ISBAD_MODEL_FILE_PATH).get_booster().feature_names),
+        ],
+    )
+
     # run red zone model and predict score
     red_zone_df_pred, redzone_xgb_model, redzone_features = xgboost_prediction(
         model_input,
@@ -155,11 +172,18 @@ def alerts_and_insights(
         config.REDZONE_MODEL_FILE_PATH_V2,
         account_list,
         score_name="riskScore",
-        calibrator=Calibrator(config.CALIBRATOR_DATA_PATH),
+        calibrator=load_calibrator(config.CALIBRATOR_DATA_PATH),
     )
 
-    # Provide explanation for red zone model (basically top3 contributing features)
-    red_zone_explanation = binary_shap_explain(redzone_features, redzone_xgb_model, list(all_account_ids.accountGuid))
+    # Provide explanation for red zone model (basically top3 contributing features), it ends up in the assessment
+    # reasons and the scores, the other models' explanations only in the scores
+    explain_scores = output_requested(output_fields, "scores")
+    if explain_scores or output_requested(output_fields, "summaryInfo", "additionalInfo"):
+        red_zone_explanation = binary_shap_explain(
+            redzone_features, redzone_xgb_model, list(all_account_ids.accountGuid)
+        )
+    else:
+        red_zone_explanation = pd.DataFrame(columns=["accountGuid", "feature", "impact", "explanation"])
 
     # run repeat model
     repeat_df_pred, repeat_xgb_model, repeat_features = xgboost_prediction(
@@ -169,7 +193,9 @@ def alerts_and_insights(
         predicting_positive=True,
         score_name="repeatScore",
     )
-    repeat_explanation = binary_shap_explain(repeat_features, repeat_xgb_model, list(all_account_ids.accountGuid))
+    repeat_explanation = pd.DataFrame()
+    if explain_scores:
+        repeat_explanation = binary_shap_explain(repeat_features, repeat_xgb_model, list(all_account_ids.accountGuid))
 
     # run totalloanpaidoff model
     totalloanpaidoff_df_pred, totalloanpaidoff_xgb_model, totalloanpaidoff_features = xgboost_prediction(
@@ -179,17 +205,21 @@ def alerts_and_insights(
         predicting_positive=True,
         score_name="totalLoanPaidOffScore",
     )
-    totalloanpaidoff_explanation = binary_shap_explain(
-        totalloanpaidoff_features,
-        totalloanpaidoff_xgb_model,
-        list(all_account_ids.accountGuid),
-    )
+    totalloanpaidoff_explanation = pd.DataFrame()
+    if explain_scores:
+        totalloanpaidoff_explanation = binary_shap_explain(
+            totalloanpaidoff_features,
+            totalloanpaidoff_xgb_model,
+            list(all_account_ids.accountGuid),
+        )
 
     # run isBad model
     isbad_df_pred, isbad_xgb_model, isbad_features = xgboost_prediction(
         model_input, config.ISBAD_MODEL_FILE_PATH, account_list, score_name="isBadScore"
     )
-    isbad_explanation = binary_shap_explain(isbad_features, isbad_xgb_model, list(all_account_ids.accountGuid))
+    isbad_explanation = pd.DataFrame()
+    if explain_scores:
+        isbad_explanation = binary_shap_explain(isbad_features, isbad_xgb_model, list(all_account_ids.accountGuid))
 
     # red_zone_explanation.loc[:, "impact"] = red_zone_explanation.impact.replace(
     #     "positive", "positive (contribute to be in the redzone)"
@@ -237,6 +267,7 @@ def alerts_and_insights(
         income_df_sorted=income_df_sorted,
         transactions_df=transactions_df,
         as_of_date=as_of_date,
+        signals=signals,
     )
     behaviorial_data = behaviorial_data.merge(
         assessment_reason[["accountGuid", "assessmentReasonsGood", "assessmentReasonsBad"]],
@@ -1,10 +1,12 @@
+import json
+import os
 import pickle
 import warnings
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
-from autogluon.tabular import TabularPredictor
-from scipy import stats
+from catboost import CatBoostClassifier
 
 from config import config
 from postprocess.scores.transform_score import transform_score
@@ -13,6 +15,58 @@ from postprocess.scores.xgboost_scoring import use_custom_model
 warnings.filterwarnings("ignore")
 
 
+@lru_cache(maxsize=None)
+def load_auto_gluon_model(model_path: str):
+    """Loads an AutoGluon predictor once per process.
+
+    When its deployed model has been exported (training_scripts/export_auto_gluon_native_model.py), that model is
+    loaded instead, and AutoGluon is not imported at all.
+    """
+
+    native_model_path = os.path.join(model_path, config.AUTO_GLUON_NATIVE_MODEL_DIR)
+    if os.path.isdir(native_model_path):
+        return NativeCatBoostPredictor(native_model_path)
+
+    from autogluon.tabular import TabularPredictor
+
+    return TabularPredictor.load(model_path, require_py_version_match=False)
+
+
+class NativeCatBoostPredictor:
+    """The CatBoost model of an AutoGluon predictor, scored with the same features as the predictor passes it."""
+
+    def __init__(self, load_path):
+        with open(os.path.join(load_path, "features.json"), "r") as f:
+            metadata = json.load(f)
+        self.model_name = metadata["model_name"]
+        self.input_features = metadata["features"]
+        self.model_features = metadata["model_features"]
+        # AutoGluon turns the features with two values into 0/1 flags of being the true one, fills the missing values of
+        # the features that were integers in training with 0 and casts every feature to its training dtype
+        self.bool_true_values = metadata["bool_true_values"]
+        self.int_features = metadata["int_features"]
+        self.dtypes = metadata["dtypes"]
+        self.model = CatBoostClassifier()
+        self.model.load_model(os.path.join(load_path, "model.cbm"))
+
+    def features(self) -> list[str]:
+        return self.input_features
+
+    def predict_proba(self, features: pd.DataFrame, model=None) -> pd.DataFrame:
+        if model is not None and model != self.model_name:
+            raise ValueError(f"Only {self.model_name} is exported, {model} needs the AutoGluon predictor")
+        model_features = features[self.model_features].assign(
+            **{
+                feature: (features[feature] == true_value).astype(np.int8)
+                for feature, true_value in self.bool_true_values.items()
+            }
+        )
+        model_features = model_features.fillna({feature: 0 for feature in self.int_features}).astype(self.dtypes)
+        # AutoGluon keeps the probability of the positive class as float32 and derives the negative one from it
+        positive = self.model.predict_proba(model_features)[:, 1].astype(np.float32)
+        return pd.DataFrame({0: 1 - positive, 1: positive}, index=features.index, dtype=np.float64)
+
+
 def auto_gluon_prediction(
     model_input: pd.DataFrame,
     model_path: str,
@@ -24,19 +78,14 @@ def auto_gluon_prediction(
 ):
     """
     Predicting any kind of scores generated by xgboost
-    model_input: input feature dataframe that should contain all the relevant features
+    model_input: feature matrix with the features of the model, see feature_matrix
     model_path: path to the xgboost model, either a .pkl or a .json file
     account_list: list of account ids
     predicting_positive: whether the dependent measure is a positive thing, used to maintain the fact that the higher the score, the better the customer should be.
     """
-    # Check if we can convert from pkl to json if it's a pkl file
-    model = TabularPredictor.load(model_path, require_py_version_match=False)
+    model = load_auto_gluon_model(model_path)
 
-    model_features = list(model.features())
-    for feature in model_features:
-        if feature not in model_input.columns:
-            model_input.loc[:, feature] = 0
-    features = model_input[model_features]
+    features = model_input[list(model.features())]
 
     # Use a custom model for prediction if provided
     if custom_model_base_url is not None:
@@ -52,7 +101,7 @@ def auto_gluon_prediction(
         df_pred[score_name] = df_pred["pred_1"].apply(lambda x: transform_score(x, od))
 
     if calibrator is not None:
-        df_pred[score_name] = df_pred[score_name].apply(lambda x: calibrator.calibrate_score(x))
+        df_pred[score_name] = calibrator.calibrate_scores(df_pred[score_name].to_numpy())
     df_pred[config.IA_ACCOUNT_ID] = account_list
     df_pred = df_pred[[config.IA_ACCOUNT_ID, score_name]]
     return df_pred
@@ -65,10 +114,34 @@ class Calibrator:
         self.old_scores = np.sort(calibrator_data["reference_scores"])
         self.new_scores = np.sort(calibrator_data["new_scores"])
 
+        # The quantile of a score in the new distribution only depends on the new scores below and equal to it, so the
+        # calibrated score is tabulated once for each distinct new score and for each gap around them
+        self.table_scores, counts = np.unique(self.new_scores, return_counts=True)
+        below = np.concatenate([[0], np.cumsum(counts)])
+        # Same quantiles as stats.percentileofscore (kind="rank"), scores between the new scores have no ties
+        gap_quantiles = 2 * below * (50.0 / len(self.new_scores)) / 100.0
+        point_quantiles = (below[:-1] + below[1:] + 1) * (50.0 / len(self.new_scores)) / 100.0
+        # Map to the corresponding value in the old distribution
+        self.gap_calibrated = np.percentile(self.old_scores, gap_quantiles * 100)
+        self.point_calibrated = np.percentile(self.old_scores, point_quantiles * 100)
+
+    def calibrate_scores(self, scores: np.ndarray) -> np.ndarray:
+        """Calibrates an array of scores by looking them up in the precomputed table."""
+
+        scores = np.asarray(scores, dtype=float)
+        position = np.searchsorted(self.table_scores, scores, side="left")
+        point = np.minimum(position, len(self.table_scores) - 1)
+        exact = self.table_scores[point] == scores
+        calibrated = np.where(exact, self.point_calibrated[point], self.gap_calibrated[position])
+        # searchsorted puts NaN after every score, a missing score stays missing instead of becoming the top score
+        return np.where(np.isnan(scores), np.nan, calibrated)
+
     def calibrate_score(self, score):
-        # Find the quantile of the score in the new distribution
-        quantile = stats.percentileofscore(self.new_scores, score) / 100.0
+        return self.calibrate_scores(np.array([score]))[0]
 
-        # Map to the corresponding value in the old distribution
-        calibrated = np.percentile(self.old_scores, quantile * 100)
-        return calibrated
+
+@lru_cache(maxsize=None)
+def load_calibrator(load_path: str) -> Calibrator:
+    """Loads a calibrator and tabulates its scores once per process."""
+
+    return Calibrator(load_path)
@@ -1,11 +1,12 @@
 import warnings
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
 import shap
 from config import config
 from utils.decorators import timer
-from xgboost import XGBClassifier
+from xgboost import Booster, DMatrix, XGBClassifier, XGBModel
 
 warnings.filterwarnings("ignore", message="Saving into deprecated binary model format")
 
@@ -23,44 +24,51 @@ def binary_shap_explain(
     # The feature values to insight of the decision is still inferred by user's prior on the business
     # Only works for tree based models as well
 
+    feature_names = np.array(model_input.columns)
+    shap_values = shap_contributions(xgb_model, model_input)
+    pos_columns, neg_columns, resolved = select_topn_features(shap_values, n)
+    topn_columns = np.hstack([pos_columns, neg_columns])
+    rows = np.arange(len(model_input))[:, None]
+    topn_contributions = shap_values[rows, topn_columns]
+    if all(dtype.kind in "iuf" for dtype in model_input.dtypes):
+        topn_values = model_input.to_numpy()[rows, topn_columns]
+    else:
+        # The values of the rows keep the dtype of their own top features, left to the per account selection
+        resolved[:] = False
+
     # output
-    accountGuids = []
+    accountGuids = [account_list[i] for i in range(len(model_input)) for _ in range(2 * n)]
+    impacts = (["positive"] * n + ["negative"] * n) * len(model_input)
+    importance_level = list(range(1, n + 1)) * 2 * len(model_input)
     features = []
-    impacts = []
-    importance_level = []
     feature_values = []
     feature_contributions = []
     explanations = []
 
-    binary_model = xgb_model.get_booster()
-    binary_explainer = shap.TreeExplainer(binary_model)
-    binary_shap_values = binary_explainer.shap_values(model_input)
-
     for i in range(len(model_input)):
-        account_id = account_list[i]
-        account_shap_values = binary_shap_values[i, :]
+        if resolved[i]:
+            features.extend(feature_names[topn_columns[i]])
+            feature_contributions.extend(topn_contributions[i])
+            feature_values.extend(topn_values[i])
+            continue
         (
             topn_pos_features,
             topn_pos_values,
             topn_neg_features,
             topn_neg_values,
-        ) = get_topn_features(account_shap_values.flatten(), np.array(model_input.columns))
-        accountGuids = accountGuids + [account_id] * 2 * n
-        features = features + list(topn_pos_features) + list(topn_neg_features)
-        impacts = impacts + ["positive"] * n + ["negative"] * n
-        importance_level = importance_level + list(range(1, n + 1)) + list(range(1, n + 1))
-        feature_contributions = feature_contributions + list(topn_pos_values) + list(topn_neg_values)
-        feature_values = (
-            feature_values
-            + list(np.array(model_input[topn_pos_features].iloc[i]))
+        ) = get_topn_features(shap_values[i, :].flatten(), feature_names)
+        features.extend(list(topn_pos_features) + list(topn_neg_features))
+        feature_contributions.extend(list(topn_pos_values) + list(topn_neg_values))
+        feature_values.extend(
+            list(np.array(model_input[topn_pos_features].iloc[i]))
             + list(np.array(model_input[topn_neg_features].iloc[i]))
         )
     if model_name == "redzone":
         feature_explanation = red_zone_feature_explain(features, impacts, feature_values)
-        explanations = explanations + feature_explanation
+        explanations.extend(feature_explanation)
     else:
         # Other model explanation is not ready yet as we need to intepret between feature names and business understandable reasons
-        explanations = explanations + ["None"] * len(features)
+        explanations.extend(["None"] * len(features))
     return pd.DataFrame(
         {
             "accountGuid": accountGuids,
@@ -74,6 +82,55 @@ def binary_shap_explain(
     )
 
 
+@lru_cache
+def tree_explainer(model) -> shap.TreeExplainer:
+    """TreeExplainer of a tree model, built once per model."""
+
+    return shap.TreeExplainer(model)
+
+
+def shap_contributions(model, model_input: pd.DataFrame) -> np.ndarray:
+    """SHAP values of every feature of every account, like TreeExplainer(model).shap_values(model_input).
+
+    XGBoost computes the tree path dependent SHAP values natively, the explainer itself hands boosters over to it, so
+    they are asked directly without building an explainer. Other tree models go through their cached explainer.
+    """
+
+    if isinstance(model, XGBModel):
+        model = model.get_booster()
+    if not isinstance(model, Booster):
+        return tree_explainer(model).shap_values(model_input)
+    best_iteration = getattr(model, "best_iteration", model.num_boosted_rounds() - 1)
+    contributions = model.predict(
+        DMatrix(model_input), iteration_range=(0, best_iteration + 1), pred_contribs=True, validate_features=False
+    )
+    # The last column is the bias
+    return contributions[:, :-1]
+
+
+def select_topn_features(shap_values: np.ndarray, n=5) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Top n positive and negative features of every account at once.
+
+    Returns:
+        tuple: The columns of the n largest positive and of the n smallest negative values of each account, and
+            whether the account has n of both without ties among them. The others need get_topn_features, which pads
+            them and breaks their ties.
+    """
+
+    positive = np.where(shap_values > 0, shap_values, -np.inf)
+    negative = np.where(shap_values < 0, shap_values, np.inf)
+    pos_order = np.argsort(-positive, axis=1, kind="stable")[:, : n + 1]
+    neg_order = np.argsort(negative, axis=1, kind="stable")[:, : n + 1]
+
+    resolved = np.ones(len(shap_values), dtype=bool)
+    for values, order in ((positive, pos_order), (negative, neg_order)):
+        top = np.take_along_axis(values, order, axis=1)
+        resolved &= np.isfinite(top).sum(axis=1) >= n
+        # The next value is compared too, a tie with it could swap it into the top n
+        resolved &= ~(top[:, 1:] == top[:, :-1]).any(axis=1)
+    return pos_order[:, :n], neg_order[:, :n], resolved
+
+
 @timer
 def get_topn_features(
     account_shap_values: np.ndarray, feature_names: np.ndarray, n=5
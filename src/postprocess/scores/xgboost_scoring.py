@@ -1,12 +1,15 @@
 import os
 import warnings
+from functools import lru_cache
 
 import httpx
 import joblib
+import numpy as np
 import pandas as pd
 from api.ApiClient import ApiClient
 from app_utils import logger
 from config import config, settings
+from utils.description_signals import DescriptionSignals
 from utils.utils import df_to_json
 from xgboost import XGBClassifier
 
@@ -157,21 +160,10 @@ def xgb_features(
     return model_input
 
 
-def xgboost_prediction(
-    model_input: pd.DataFrame,
-    model_path: str,
-    account_list: list,
-    predicting_positive: bool = False,
-    score_name="riskScore",
-    custom_model_base_url=None,
-):
-    """
-    Predicting any kind of scores generated by xgboost
-    model_input: input feature dataframe that should contain all the relevant features
-    model_path: path to the xgboost model, either a .pkl or a .json file
-    account_list: list of account ids
-    predicting_positive: whether the dependent measure is a positive thing, used to maintain the fact that the higher the score, the better the customer should be.
-    """
+@lru_cache(maxsize=None)
+def load_xgboost_model(model_path: str) -> XGBClassifier:
+    """Loads an xgboost model once per process, a .pkl model is converted to .json on its first load."""
+
     # Check if we can convert from pkl to json if it's a pkl file
     if "pkl" in model_path and not model_path.endswith(".json"):
         # Create equivalent .json path
@@ -203,11 +195,54 @@ def xgboost_prediction(
     if not hasattr(model, "n_classes_"):
         model.n_classes_ = 2
 
-    model_features = list(model.get_booster().feature_names)
-    for feature in model_features:
-        if feature not in model_input.columns:
-            model_input.loc[:, feature] = 0
-    features = model_input[model_features]
+    return model
+
+
+def feature_matrix(model_input: pd.DataFrame, feature_lists: list[list[str]]) -> pd.DataFrame:
+    """The features of every model in one matrix, validated and assembled once for all the models.
+
+    The columns are the features of all the models in a fixed order (the order of feature_lists), the features the
+    input does not have are set to 0. Integer and boolean features become int64 and the others float64, a feature that
+    is not a number raises a ValueError. Each model then selects its features from it as they are.
+    """
+
+    columns = list(dict.fromkeys(feature for features in feature_lists for feature in features))
+    if model_input.columns.duplicated().any():
+        duplicated = model_input.columns[model_input.columns.duplicated()].tolist()
+        raise ValueError(f"Model input has duplicated features {duplicated}")
+    matrix = model_input.reindex(columns=columns, fill_value=0)
+    not_numeric = [
+        feature
+        for feature, dtype in matrix.dtypes.items()
+        if not (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype))
+    ]
+    if not_numeric:
+        raise ValueError(f"Model features {not_numeric} are not numeric")
+    return matrix.astype(
+        {
+            feature: np.float64 if pd.api.types.is_float_dtype(dtype) else np.int64
+            for feature, dtype in matrix.dtypes.items()
+        }
+    )
+
+
+def xgboost_prediction(
+    model_input: pd.DataFrame,
+    model_path: str,
+    account_list: list,
+    predicting_positive: bool = False,
+    score_name="riskScore",
+    custom_model_base_url=None,
+):
+    """
+    Predicting any kind of scores generated by xgboost
+    model_input: feature matrix with the features of the model, see feature_matrix
+    model_path: path to the xgboost model, either a .pkl or a .json file
+    account_list: list of account ids
+    predicting_positive: whether the dependent measure is a positive thing, used to maintain the fact that the higher the score, the better the customer should be.
+    """
+    model = load_xgboost_model(model_path)
+    features = model_input[list(model.get_booster().feature_names)]
 
     # Use a custom model for prediction if provided
     if custom_model_base_url is not None:
@@ -226,8 +261,21 @@ def xgboost_prediction(
     return df_pred, model, features
 
 
+@lru_cache(maxsize=None)
+def custom_model_client(custom_model_base_url: str) -> ApiClient:
+    """Keep-alive client of the custom model, created once per worker and reused across requests."""
+
+    return ApiClient(
+        base_url=custom_model_base_url,
+        timeout=config.CUSTOM_MODEL_TIMEOUT,
+        connect_timeout=config.CUSTOM_MODEL_CONNECT_TIMEOUT,
+        max_connections=config.CUSTOM_MODEL_MAX_CONNECTIONS,
+        max_retries=config.CUSTOM_MODEL_MAX_RETRIES,
+    )
+
+
 def use_custom_model(custom_model_base_url: str, features: pd.DataFrame) -> pd.DataFrame:
-    client = ApiClient(base_url=custom_model_base_url)
+    client = custom_model_client(custom_model_base_url)
     payload = features.to_dict()
     try:
         response = client.post(endpoint="/predict", data=payload)
@@ -242,8 +290,6 @@ def use_custom_model(custom_model_base_url: str, features: pd.DataFrame) -> pd.D
         logger.error(f"\nNetwork or request error: {e}")
     except Exception as e:
         logger.error(f"\nAn unexpected error occurred: {e}")
-    finally:
-        client.close()
 
 
 def make_scores(df_pred: pd.DataFrame, model_reasons: pd.DataFrame):
@@ -256,208 +302,158 @@ def make_scores(df_pred: pd.DataFrame, model_reasons: pd.DataFrame):
 
 
 def get_universal_reasons(
-    account_id: str,
+    account_ids: list[str],
     income_df_sorted: pd.DataFrame,
     transactions_df: pd.DataFrame,
     as_of_date: pd.Timestamp | str | None,
-) -> tuple[list, list]:
+    signals: DescriptionSignals | None = None,
+    spending_days: pd.Series | None = None,
+) -> dict[str, tuple[list, list]]:
     """
-    Generate universal reasons regardless of prediction scores.
-    Returns tuple of (red_reasons, green_reasons)
+    Generate universal reasons regardless of prediction scores for every account.
+    Returns a dict of account id to (red_reasons, green_reasons)
     """
-    red_reasons = []
-    green_reasons = []
+    universal_reasons = {account_id: ([], []) for account_id in account_ids}
 
     if income_df_sorted is None or transactions_df is None or as_of_date is None:
-        return red_reasons, green_reasons
-
-    # Get account-specific data
-    account_income = income_df_sorted[income_df_sorted["accountGuid"] == account_id]
-    account_transactions = transactions_df[transactions_df["accountGuid"] == account_id]
+        return universal_reasons
 
     # Convert as_of_date to datetime
     as_of_date = pd.to_datetime(as_of_date)
 
     seven_days_ago = as_of_date - pd.Timedelta(days=7)
-
-    # Convert transaction dates to datetime
-    if not account_transactions.empty:
-        account_transactions = account_transactions.copy()
-        account_transactions["date"] = pd.to_datetime(account_transactions["date"])
-        recent_transactions = account_transactions[account_transactions["date"] >= seven_days_ago]
-    else:
-        recent_transactions = pd.DataFrame()
+    recent_transactions = transactions_df[pd.to_datetime(transactions_df["date"]) >= seven_days_ago]
 
     # 1. Check errorCode 401 or 402 in income_df_sorted
-    if not account_income.empty:
-        error_codes = account_income["errorCode"].values
-        if any(code in [401, 402] for code in error_codes):
-            red_reasons.append("Recent Payroll Absent - Job Loss Risk")
+    payroll_absent = set(income_df_sorted.loc[income_df_sorted["errorCode"].isin([401, 402]), "accountGuid"])
 
     # 2. Check loan deposits (transCategory=6, credit) within 7 days
-    if not recent_transactions.empty:
-        loan_deposits = recent_transactions[
-            (recent_transactions["transCategory"] == 6) & (recent_transactions["type"].str.upper() == "CREDIT")
-        ]
-        if not loan_deposits.empty:
-            red_reasons.append(f"{len(loan_deposits)} Loan(s) Funded within the week")
-
     # 3. Check loan payments (transCategory=6, debit) within 7 days
-    if not recent_transactions.empty:
-        loan_payments = recent_transactions[
-            (recent_transactions["transCategory"] == 6) & (recent_transactions["type"].str.upper() == "DEBIT")
-        ]
-        if not loan_payments.empty:
-            green_reasons.append(f"{len(loan_payments)} Loan Payment(s) made this week")
+    loans = recent_transactions["transCategory"] == 6
+    transaction_type = recent_transactions["type"].str.upper()
+    loan_deposits = recent_transactions.loc[loans & (transaction_type == "CREDIT"), "accountGuid"].value_counts()
+    loan_payments = recent_transactions.loc[loans & (transaction_type == "DEBIT"), "accountGuid"].value_counts()
 
     # 4. Check overdrafts/NSF within 7 days using regex keywords
-    if not recent_transactions.empty:
-        # Keywords from overdraft_detection.py
-        nsf_keywords = [
-            r"\bnsf",
-            r"\binsufficient funds\b",
-            r"\binsufficient\b",
-            r"\bnonsufficient\b",
-            r"\bnon-sufficient\b",
-            r"\bnon sufficient\b",
-            r"\breturned item\b",
-            r"\bunpaid item\b",
-            r"\breturned check\b",
-            r"\bret(urned)? ?chk\b",
-            r"\bchargeback\b",
-            r"\bdebit return\b",
-            r"\bach return\b",
-            r"\bpos return\b",
-        ]
-        overdraft_keywords = [
-            r"\boverdraft\b",
-            r"\boverdraft fee\b",
-            r"\bod fee\b",
-            r"\bpaid overdraft item\b",
-            r"\bfee withdrawal overdrawn\b",
-        ]
-        all_keywords = nsf_keywords + overdraft_keywords
-
-        overdraft_mask = recent_transactions["description"].str.contains("|".join(all_keywords), case=False, na=False)
-        if overdraft_mask.any():
-            red_reasons.append("Recent Overdraft Identified")
+    if signals is None:
+        signals = DescriptionSignals(recent_transactions["description"])
+    overdraft_mask = signals.flags(recent_transactions["description"], "nsf") | signals.flags(
+        recent_transactions["description"], "overdraft"
+    )
+    overdrafts = set(recent_transactions.loc[overdraft_mask, "accountGuid"])
 
     # 5. Payroll spending analysis
-    if not account_income.empty and not account_transactions.empty:
-        spending_days = calculate_payroll_spending_days(account_id, account_income, account_transactions, as_of_date)
-        if spending_days is not None:
-            if spending_days <= 3:
+    if spending_days is None:
+        spending_days = payroll_spending_days(income_df_sorted, transactions_df, as_of_date)
+
+    for account_id, (red_reasons, green_reasons) in universal_reasons.items():
+        if account_id in payroll_absent:
+            red_reasons.append("Recent Payroll Absent - Job Loss Risk")
+        if account_id in loan_deposits.index:
+            red_reasons.append(f"{loan_deposits[account_id]} Loan(s) Funded within the week")
+        if account_id in loan_payments.index:
+            green_reasons.append(f"{loan_payments[account_id]} Loan Payment(s) made this week")
+        if account_id in overdrafts:
+            red_reasons.append("Recent Overdraft Identified")
+        account_spending_days = spending_days.get(account_id)
+        if account_spending_days is not None:
+            if account_spending_days <= 3:
                 red_reasons.append("Unfavorable Spending Ratio - High Risk")
-            elif spending_days >= 7:
+            elif account_spending_days >= 7:
                 green_reasons.append("Good Spending Ratio - Low Risk")
 
-    return red_reasons, green_reasons
+    return universal_reasons
 
 
-def calculate_payroll_spending_days(
-    account_id: str, account_income: pd.DataFrame, account_transactions: pd.DataFrame, as_of_date: pd.Timestamp
-) -> float:
-    """
-    Calculate average days to spend payroll/benefit income
+def payroll_spending_days(
+    income_df_sorted: pd.DataFrame, transactions_df: pd.DataFrame, as_of_date: pd.Timestamp | str
+) -> pd.Series:
     """
-    try:
-        # Filter income sources with errorCode = 0 (stable income)
-        stable_income = account_income[account_income["errorCode"] == 0]
-        if stable_income.empty:
-            return None
-
-        spending_periods = []
+    Calculate average days to spend payroll/benefit income of every account with transactions
 
-        # Convert transaction dates to datetime and sort
-        account_transactions = account_transactions.copy()
-        account_transactions["date"] = pd.to_datetime(account_transactions["date"])
-        account_transactions = account_transactions.sort_values("date")
-
-        for _, income_source in stable_income.iterrows():
-            if "historicalPayDay" not in income_source or not income_source["historicalPayDay"]:
-                continue
-
-            historical_paydays = income_source["historicalPayDay"]
-
-            per_paycheck = income_source.get("perPayCheck", 0)
-            if per_paycheck <= 0:
-                continue
-
-            # Process each payday
-            for i, payday_str in enumerate(historical_paydays):
-                payday = pd.to_datetime(payday_str)
-
-                # Find next payday or use as_of_date if it's the last one
-                if i < len(historical_paydays) - 1:
-                    next_payday = pd.to_datetime(historical_paydays[i + 1])
-                else:
-                    next_payday = as_of_date
-
-                # Calculate days to spend this paycheck
-                days_to_spend = calculate_days_to_spend_paycheck(
-                    account_transactions, payday, next_payday, per_paycheck
-                )
-
-                if days_to_spend is not None:
-                    spending_periods.append(days_to_spend)
-
-        if spending_periods:
-            return sum(spending_periods) / len(spending_periods)
-        else:
-            return None
-
-    except Exception as e:
-        # Log error but don't fail the entire function
-        logger.warning(f"Error calculating payroll spending days for account {account_id}: {str(e)}")
-        return None
-
-
-def calculate_days_to_spend_paycheck(
-    transactions: pd.DataFrame, payday: pd.Timestamp, next_payday: pd.Timestamp, per_paycheck: float
-) -> float:
-    """
-    Calculate days from payday until balance goes down by per_paycheck amount
+    A paycheck is spent on the first day the net change (credits minus debits) since its payday reaches -perPayCheck,
+    before the next payday (or as_of_date for the last one). Otherwise it lasts its whole period.
     """
     try:
-        if next_payday <= payday:
-            return 0
-
-        # Get transactions from payday onwards (up to, but not including, next payday)
-        period_transactions = transactions[
-            (transactions["date"] >= payday) & (transactions["date"] < next_payday)
-        ].copy()
-
-        if period_transactions.empty:
-            return (next_payday - payday).days
-
-        # Prepare daily net change by aggregating credits and debits per day
-        period_transactions["date_only"] = period_transactions["date"].dt.normalize()
-        period_transactions["signed_amount"] = period_transactions.apply(
-            lambda row: row["amount"] if row["type"].upper() == "CREDIT" else -row["amount"], axis=1
+        # Filter income sources with errorCode = 0 (stable income)
+        paychecks = income_df_sorted[
+            (income_df_sorted["errorCode"] == 0) & income_df_sorted["accountGuid"].isin(transactions_df["accountGuid"])
+        ]
+        if "historicalPayDay" not in paychecks or "perPayCheck" not in paychecks:
+            return pd.Series(dtype=float)
+        paychecks = paychecks[
+            paychecks["historicalPayDay"].map(lambda paydays: isinstance(paydays, list) and len(paydays) > 0)
+            & ~(paychecks["perPayCheck"] <= 0)
+        ]
+        paychecks = (
+            paychecks[["accountGuid", "historicalPayDay", "perPayCheck"]]
+            .reset_index(drop=True)
+            .rename_axis("source")
+            .reset_index()
+            .explode("historicalPayDay", ignore_index=True)
         )
-        daily_change = period_transactions.groupby("date_only")["signed_amount"].sum().sort_index()
-
-        running_balance_change = 0.0
-        current_day = payday.normalize()
-        end_day = (next_payday - pd.Timedelta(microseconds=1)).normalize()
-
-        while current_day <= end_day:
-            running_balance_change += daily_change.get(current_day, 0.0)
-
-            if running_balance_change <= -per_paycheck:
-                # Use end-of-day timestamp to approximate elapsed time relative to payday
-                day_marker = current_day + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                days_spent = int((day_marker - payday) // pd.Timedelta(days=1))
-                return max(days_spent, 0)
-
-            current_day += pd.Timedelta(days=1)
-
+        if paychecks.empty:
+            return pd.Series(dtype=float)
+
+        # Each paycheck lasts until the next payday of its source
+        payday = pd.to_datetime(paychecks["historicalPayDay"])
+        next_payday = payday.groupby(paychecks["source"]).shift(-1).fillna(pd.to_datetime(as_of_date))
+        payday = payday.to_numpy(dtype="datetime64[ns]")
+        next_payday = next_payday.to_numpy(dtype="datetime64[ns]")
+
+        # Transactions sorted by account and date, a paycheck's transactions are the rows between its two searches
+        date = pd.to_datetime(transactions_df["date"]).to_numpy(dtype="datetime64[ns]")
+        amount = transactions_df["amount"].to_numpy(dtype=float)
+        signed_amount = np.where(transactions_df["type"].str.upper() == "CREDIT", amount, -amount)
+        account_code, _ = pd.factorize(pd.concat([transactions_df["accountGuid"], paychecks["accountGuid"]]))
+        _, date_rank = np.unique(np.concatenate([date, payday, next_payday]), return_inverse=True)
+        n_transactions, n_paychecks = len(date), len(paychecks)
+        account_key = account_code.astype(np.int64) * (date_rank.max() + 1)
+        transaction_key = account_key[:n_transactions] + date_rank[:n_transactions]
+        payday_key = account_key[n_transactions:] + date_rank[n_transactions : n_transactions + n_paychecks]
+        next_payday_key = account_key[n_transactions:] + date_rank[n_transactions + n_paychecks :]
+        order = np.argsort(transaction_key, kind="stable")
+        first = np.searchsorted(transaction_key[order], payday_key)
+        last = np.searchsorted(transaction_key[order], next_payday_key)
+        lengths = np.clip(last - first, 0, None)
+        rows = order[np.repeat(first - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())]
+
+        # Daily net change of every paycheck period, accumulated in day order
+        daily_change = (
+            pd.DataFrame(
+                {
+                    "paycheck": np.repeat(np.arange(n_paychecks), lengths),
+                    "date_only": pd.DatetimeIndex(date[rows]).normalize(),
+                    "signed_amount": signed_amount[rows],
+                }
+            )
+            .groupby(["paycheck", "date_only"])["signed_amount"]
+            .sum()
+            .reset_index()
+        )
+        day_number = daily_change.groupby("paycheck").cumcount().to_numpy()
+        paycheck = daily_change["paycheck"].to_numpy()
+        width = day_number.max() + 1 if len(daily_change) else 1
+        running_balance_change = np.zeros((n_paychecks, width))
+        running_balance_change[paycheck, day_number] = daily_change["signed_amount"].to_numpy()
+        running_balance_change = np.cumsum(running_balance_change, axis=1)
+        days = np.full((n_paychecks, width), np.datetime64("NaT"), dtype="datetime64[ns]")
+        days[paycheck, day_number] = daily_change["date_only"].to_numpy(dtype="datetime64[ns]")
+
+        spent = running_balance_change <= -paychecks["perPayCheck"].to_numpy(dtype=float)[:, None]
+        spent_day = days[np.arange(n_paychecks), spent.argmax(axis=1)]
+        # Use end-of-day timestamp to approximate elapsed time relative to payday
+        day_marker = spent_day + np.timedelta64(1, "D") - np.timedelta64(1, "s")
+        days_spent = np.maximum((day_marker - payday) // np.timedelta64(1, "D"), 0)
         # If balance never went down by per_paycheck amount, use full period
-        return (next_payday - payday).days
+        full_period = (next_payday - payday) // np.timedelta64(1, "D")
+        days_to_spend = np.where(next_payday <= payday, 0, np.where(spent.any(axis=1), days_spent, full_period))
+        return pd.Series(days_to_spend).groupby(paychecks["accountGuid"].to_numpy()).mean()
 
     except Exception as e:
-        logger.warning(f"Error calculating days to spend paycheck: {str(e)}")
-        return None
+        # Log error but don't fail the entire function
+        logger.warning(f"Error calculating payroll spending days: {str(e)}")
+        return pd.Series(dtype=float)
 
 
 def parse_model_reasons(
@@ -469,167 +465,121 @@ def parse_model_reasons(
     income_df_sorted: pd.DataFrame = None,
     transactions_df: pd.DataFrame = None,
     as_of_date: pd.Timestamp | None = None,
+    signals: DescriptionSignals | None = None,
 ):
     """
     parse the top 3 positive and negative reasons for the model score into a list
     """
     LOW_REDZONE_SCORE_CM = settings.settings_dict["LOW_REDZONE_SCORE_CM"]
-    red_accounts = df_pred[df_pred.loc[:, score_name] < LOW_REDZONE_SCORE_CM].accountGuid.unique()
-    green_accounts = df_pred[df_pred.loc[:, score_name] >= LOW_REDZONE_SCORE_CM].accountGuid.unique()
-
-    red_account_reasons = pd.DataFrame(
-        explanation[(explanation.impact == "positive") & explanation.accountGuid.isin(red_accounts)]
-        .groupby("accountGuid")
-        .explanation.unique()
-    ).reset_index()
-    red_account_reasons.loc[:, "assessmentReasonsBad"] = red_account_reasons.explanation.apply(lambda x: list(x))
-    red_account_reasons = red_account_reasons.merge(
-        behaviorial_data[["accountGuid", "alerts"]], on="accountGuid", how="left"
-    )
-    red_account_reasons_good = pd.DataFrame(
-        explanation[(explanation.impact == "negative") & explanation.accountGuid.isin(red_accounts)]
-        .groupby("accountGuid")
-        .explanation.unique()
-    ).reset_index()
-    red_account_reasons_good.loc[:, "assessmentReasonsGoodSHAP"] = red_account_reasons_good.explanation.apply(
-        lambda x: list(x)
+    red_accounts = set(df_pred[df_pred.loc[:, score_name] < LOW_REDZONE_SCORE_CM].accountGuid)
+    green_accounts = set(df_pred[df_pred.loc[:, score_name] >= LOW_REDZONE_SCORE_CM].accountGuid)
+
+    # Unique SHAP explanations of every account, by impact
+    positive = explanation[explanation.impact == "positive"].groupby("accountGuid").explanation.unique().to_dict()
+    negative = explanation[explanation.impact == "negative"].groupby("accountGuid").explanation.unique().to_dict()
+    alerts = behaviorial_data.drop_duplicates("accountGuid").set_index("accountGuid").alerts.to_dict()
+    account_features = (
+        redzone_features.drop_duplicates(config.IA_ACCOUNT_ID)
+        .set_index(config.IA_ACCOUNT_ID)[["recurringMonthlyIncome", "odAll"]]
+        .to_dict("index")
     )
-    red_reasons = red_account_reasons.merge(
-        red_account_reasons_good[["accountGuid", "assessmentReasonsGoodSHAP"]], on="accountGuid", how="inner"
-    )
-    red_reasons.loc[:, "assessmentReasonsBad"] = red_reasons.apply(lambda x: x.assessmentReasonsBad + x.alerts, axis=1)
-    if not red_reasons.empty:
-        red_reasons.loc[:, "assessmentReasonsGood"] = red_reasons.apply(
-            lambda x: assign_rule_based_reasons(x, redzone_features, type="Good"), axis=1
+
+    # Red accounts explain their score with the positive explanations, green accounts with the negative ones
+    rows = []
+    for account_id in sorted(red_accounts & positive.keys() & negative.keys()):
+        bad_reasons = list(positive[account_id]) + alerts[account_id]
+        good_reasons = assign_rule_based_reasons(
+            bad_reasons, list(negative[account_id]), account_features[account_id], type="Good"
         )
-    else:
-        red_reasons.loc[:, "assessmentReasonsGood"] = []
-    red_reasons = red_reasons.drop(columns=["assessmentReasonsGoodSHAP", "alerts"])
-
-    green_account_reasons = pd.DataFrame(
-        explanation[(explanation.impact == "negative") & (explanation.accountGuid.isin(green_accounts))]
-        .groupby("accountGuid")
-        .explanation.unique()
-    ).reset_index()
-    green_account_reasons.loc[:, "assessmentReasonsGood"] = green_account_reasons.explanation.apply(lambda x: list(x))
-    green_account_reasons_bad = pd.DataFrame(
-        explanation[(explanation.impact == "positive") & (explanation.accountGuid.isin(green_accounts))]
-        .groupby("accountGuid")
-        .explanation.unique()
-    ).reset_index()
-    green_account_reasons_bad.loc[:, "assessmentReasonsBadSHAP"] = green_account_reasons_bad.explanation.apply(
-        lambda x: list(x)
-    )
-    green_reasons = green_account_reasons.merge(
-        green_account_reasons_bad[["accountGuid", "assessmentReasonsBadSHAP"]], on="accountGuid", how="inner"
-    )
-    if not green_reasons.empty:
-        green_reasons.loc[:, "assessmentReasonsBad"] = green_reasons.apply(
-            lambda x: assign_rule_based_reasons(x, redzone_features, type="Bad"), axis=1
+        rows.append(
+            {
+                "accountGuid": account_id,
+                "explanation": positive[account_id],
+                "assessmentReasonsBad": bad_reasons,
+                "assessmentReasonsGood": good_reasons,
+            }
         )
+    if rows:
+        columns = ["accountGuid", "explanation", "assessmentReasonsBad", "assessmentReasonsGood"]
     else:
-        green_reasons.loc[:, "assessmentReasonsBad"] = []
-    green_reasons = green_reasons.drop(columns="assessmentReasonsBadSHAP")
-
-    # Handle empty dataframe concatenation to avoid warnings
-    frames_to_concat = []
-    if not red_reasons.empty:
-        frames_to_concat.append(red_reasons)
-    if not green_reasons.empty:
-        frames_to_concat.append(green_reasons)
-
-    if frames_to_concat:
-        reasons = pd.concat(frames_to_concat, axis=0).reset_index(drop=True)
-    else:
-        # Create an empty DataFrame with expected columns
-        # Create a list of columns that would be expected in the result
-        expected_columns = ["accountGuid", "explanation", "assessmentReasonsGood", "assessmentReasonsBad"]
-
-        # Create an empty DataFrame with those columns
-        reasons = pd.DataFrame(columns=expected_columns)
+        columns = ["accountGuid", "explanation", "assessmentReasonsGood", "assessmentReasonsBad"]
+    for account_id in sorted(green_accounts & negative.keys() & positive.keys()):
+        good_reasons = list(negative[account_id])
+        bad_reasons = assign_rule_based_reasons(
+            list(positive[account_id]), good_reasons, account_features[account_id], type="Bad"
+        )
+        rows.append(
+            {
+                "accountGuid": account_id,
+                "explanation": negative[account_id],
+                "assessmentReasonsGood": good_reasons,
+                "assessmentReasonsBad": bad_reasons,
+            }
+        )
 
     # Add universal reasons for all accounts
     if income_df_sorted is not None and transactions_df is not None and as_of_date is not None:
         all_accounts = df_pred["accountGuid"].unique()
+        if signals is None:
+            signals = DescriptionSignals(transactions_df["description"])
+        universal_reasons = get_universal_reasons(
+            list(all_accounts), income_df_sorted, transactions_df, as_of_date=as_of_date, signals=signals
+        )
+        account_rows = {}
+        for row in rows:
+            account_rows.setdefault(row["accountGuid"], row)
         for account_id in all_accounts:
-            universal_red, universal_green = get_universal_reasons(
-                account_id,
-                income_df_sorted,
-                transactions_df,
-                as_of_date=as_of_date,
-            )
-
-            # Find or create row for this account
-            account_row_idx = reasons[reasons["accountGuid"] == account_id].index
-            if len(account_row_idx) > 0:
+            universal_red, universal_green = universal_reasons[account_id]
+            if account_id in account_rows:
                 # Account exists, add universal reasons to existing lists
-                idx = account_row_idx[0]
-                current_bad = reasons.loc[idx, "assessmentReasonsBad"]
-                current_good = reasons.loc[idx, "assessmentReasonsGood"]
-
-                if isinstance(current_bad, list):
-                    reasons.at[idx, "assessmentReasonsBad"] = current_bad + universal_red
-                else:
-                    reasons.at[idx, "assessmentReasonsBad"] = universal_red
-
-                if isinstance(current_good, list):
-                    reasons.at[idx, "assessmentReasonsGood"] = current_good + universal_green
-                else:
-                    reasons.at[idx, "assessmentReasonsGood"] = universal_green
+                row = account_rows[account_id]
+                row["assessmentReasonsBad"] = row["assessmentReasonsBad"] + universal_red
+                row["assessmentReasonsGood"] = row["assessmentReasonsGood"] + universal_green
             else:
                 # Account doesn't exist, create new row
-                new_row = pd.DataFrame(
+                rows.append(
                     {
-                        "accountGuid": [account_id],
-                        "explanation": [[]],
-                        "assessmentReasonsBad": [universal_red],
-                        "assessmentReasonsGood": [universal_green],
+                        "accountGuid": account_id,
+                        "explanation": [],
+                        "assessmentReasonsBad": universal_red,
+                        "assessmentReasonsGood": universal_green,
                     }
                 )
-                reasons = pd.concat([reasons, new_row], ignore_index=True)
-
-    reasons.loc[:, "assessmentReasonsBad"] = reasons.loc[:, "assessmentReasonsBad"].apply(
-        lambda alert_list: deduplicate_list(alert_list) if isinstance(alert_list, list) else []
-    )
 
-    reasons.loc[:, "assessmentReasonsGood"] = reasons.loc[:, "assessmentReasonsGood"].apply(
-        lambda alert_list: deduplicate_list(alert_list) if isinstance(alert_list, list) else []
-    )
+    reasons = pd.DataFrame(rows, columns=columns)
+    reasons["assessmentReasonsBad"] = [deduplicate_list(alert_list) for alert_list in reasons["assessmentReasonsBad"]]
+    reasons["assessmentReasonsGood"] = [
+        deduplicate_list(alert_list) for alert_list in reasons["assessmentReasonsGood"]
+    ]
     return reasons
 
 
-def assign_rule_based_reasons(row, redzone_features, type="Good"):
+def assign_rule_based_reasons(bad_reasons: list, good_reasons: list, features: dict, type="Good") -> list:
     """
     Assign rule-based reasons based on the redzone features.
-    This function checks specific conditions in the redzone_features DataFrame
+    This function checks specific conditions on the account's redzone features (a dict of feature values)
     and returns a list of reasons if any condition is met.
     """
     reasons = []
-    account_id = row[config.IA_ACCOUNT_ID]
-    features = redzone_features[redzone_features[config.IA_ACCOUNT_ID] == account_id]
     if type == "Good":
-        bad_reasons = row["assessmentReasonsBad"]
-        good_reasons = row["assessmentReasonsGoodSHAP"]
         if "Considerable Loan Payback History" in good_reasons:
             # and "High Borrowing Activity" not in bad_reasons:
             reasons.append("Considerable Loan Payback History")
 
         # if features.recurringMonthlyIncome.iloc[0] >= 2000 and "Low Recurring Income" not in bad_reasons and "Limited Total Inflow" not in bad_reasons and "Low Active Income" not in bad_reasons:
         if (
-            features.recurringMonthlyIncome.iloc[0] >= 2000
+            features["recurringMonthlyIncome"] >= 2000
             and "Limited Total Inflow" not in bad_reasons
             and "Low Active Income" not in bad_reasons
         ):
             reasons.append("Considerable Recurring Income")
 
     if type == "Bad":
-        bad_reasons = row["assessmentReasonsBadSHAP"]
-        good_reasons = row["assessmentReasonsGood"]
         # if "High Borrowing Activity" in bad_reasons and "Considerable Loan Payback History" not in good_reasons:
         if "High Borrowing Activity" in bad_reasons:
             reasons.append("Multiple loan Credit Found, Possible Loan Stacker")
 
-        if features.odAll.iloc[0] > 0 and "Low Overdraft/NSF Count" not in good_reasons:
+        if features["odAll"] > 0 and "Low Overdraft/NSF Count" not in good_reasons:
             reasons.append("Overdrafts/NSF Found in Transactions")
 
     # Add more conditions as needed
@@ -5,10 +5,15 @@ from config import config
 from postprocess.sources.helpers.calculate_frequency_amount import (
     active_income_check,
     amount_stability_check,
-    calculate_frequency_amount,
     recurring_income_check,
 )
-from postprocess.sources.helpers.find_missing_payment import find_missing_payment
+from postprocess.sources.helpers.find_missing_payment import find_missing_payments
+from postprocess.sources.helpers.source_partition import (
+    SourcePartition,
+    assign_source_ids,
+    iter_account_clusters,
+    same_day_summary,
+)
 from utils.decorators import timer
 
 # Benefit source is basically copied from payroll source
@@ -24,16 +29,19 @@ class BenefitSource:
         income_source_trans: pd.DataFrame,
         as_of_date: pd.Timestamp,
         sourceID=0,
+        partition: SourcePartition | None = None,
     ) -> tuple[dict, pd.DataFrame, int]:
         """Returns the benefit source categories given the transactions."""
 
-        holidays = config.HOLIDAYS
         income_source_dict = {}
+        source_ids = {}
 
         # 1:payroll, 2:benefit, 3:transfer, 4:deposit, 5: gig, 6:loan
-        result = result[result.type == "CREDIT"]
+        if partition is None:
+            partition = SourcePartition(result)
+        result = partition.credits
 
-        customer_df = result[result["transCategory"] == 2]
+        customer_df = partition.category(2)
 
         if len(customer_df) == 0:
             for account_id in result[config.PS_ACCOUNT_ID].unique():
@@ -69,56 +77,112 @@ class BenefitSource:
 
         if len(customer_df) > 0:
             # Process separately for each account_guid
-            for account_id in customer_df[config.PS_ACCOUNT_ID].unique():
-                account_df = customer_df[customer_df[config.IA_ACCOUNT_ID] == account_id]
+            frequencies = partition.frequencies()
+            missing_payday_sources = {}
+            for account_id, i, target in iter_account_clusters(customer_df):
+                cluster = str(account_id) + "_" + str(i)
+                source_name = target[config.PS_TXN_SHORT].unique()[0]
+                _, num_of_payday, per_paycheck, last_payday, historicalPayDay = same_day_summary(target)
+                income_type = "Benefit"
+
+                # Same day/single trans check
+                (
+                    freq,
+                    monthly_income,
+                    monthly_num_pay,
+                    regular_payday,
+                    same_day_freq,
+                    next_pay_day,
+                    payment_near_holiday,
+                    next_pay_day_on_holiday,
+                ) = frequencies[(2, account_id, i)]
+                # The income checks expect parsed dates
+                target[config.PS_TXN_DATE] = pd.to_datetime(target[config.PS_TXN_DATE], errors="coerce")
+                active_score = active_income_check(target, as_of_date, freq, "Benefit")
+                recurring_score = recurring_income_check(target, freq, regular_payday, same_day_freq)
+                stability_score, std_mean_ratio = amount_stability_check(target, freq)
+                if stability_score != 3:
+                    stable_monthly_income = monthly_income * (1 - std_mean_ratio)
+                else:
+                    stable_monthly_income = monthly_income
+                recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
+
+                # Amount check
+                if per_paycheck < config.PS_LOW_AMOUNT_CHECK:
+                    income_source_dict[cluster] = {
+                        "accountGuid": account_id,
+                        "sourceID": "None",
+                        "sourceName": source_name,
+                        "sourceType": "None",
+                        "sourceChannel": "None",
+                        "numOfPay": num_of_payday,
+                        "numOfPayMonthly": int(monthly_num_pay),
+                        "frequency": freq,
+                        "perPayCheck": round(per_paycheck, 2),
+                        "monthlyIncome": round(monthly_income, 2),
+                        "stableMonthlyIncome": round(stable_monthly_income, 2),
+                        "regularPayDay": regular_payday,
+                        "historicalPayDay": historicalPayDay,
+                        "missingPayDay": [],
+                        "sameDayFreq": same_day_freq,
+                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                        "incomeType": income_type,
+                        "depositMethod": "Direct Deposit",
+                        "activeScore": active_score,
+                        "recurringScore": recurring_score,
+                        "stabilityScore": stability_score,
+                        "errorCode": 302,
+                        "errorMessage": "Benefit Per_paycheck lower than $" + str(config.PS_LOW_AMOUNT_CHECK),
+                        "nextPayDay": "Not Applicable",
+                        "paymentNearHoliday": "None",
+                        "nextPayDayOnHoliday": "Not Applicable",
+                    }
+                    continue
 
-                for i in list(set(account_df.cluster_label)):
-                    cluster = str(account_id) + "_" + str(i)
-                    target = account_df[account_df.cluster_label == i].sort_values(config.PS_TXN_DATE)
-                    source_name = target[config.PS_TXN_SHORT].unique()[0]
-                    same_day_amount = (
-                        target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]]
-                        .groupby(config.PS_TXN_DATE)
-                        .sum()
-                        .reset_index()
-                    )
-                    num_of_payday = len(same_day_amount)
-                    per_paycheck = same_day_amount[config.PS_TXN_AMOUNT].mean()
-                    last_payday = pd.to_datetime(target[config.PS_TXN_DATE]).max()
-                    income_type = "Benefit"
-                    historicalPayDay = list(
-                        target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]]
-                        .groupby(config.PS_TXN_DATE)
-                        .sum()
-                        .reset_index()
-                        .date
-                    )
+                if num_of_payday == 1:
+                    sourceID += 1
+                    income_source_dict[cluster] = {
+                        "accountGuid": account_id,
+                        "sourceID": "I" + str(sourceID) + "_err_202",
+                        "sourceName": source_name,
+                        "sourceType": "None",
+                        "sourceChannel": "None",
+                        "numOfPay": 1,
+                        "numOfPayMonthly": 0,
+                        "frequency": "None",
+                        "perPayCheck": round(per_paycheck, 2),
+                        "monthlyIncome": round(monthly_income, 2),
+                        "stableMonthlyIncome": round(stable_monthly_income, 2),
+                        "regularPayDay": "None",
+                        "historicalPayDay": historicalPayDay,
+                        "missingPayDay": [],
+                        "sameDayFreq": 0,
+                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                        "incomeType": income_type,
+                        "depositMethod": "Direct Deposit",
+                        "activeScore": active_score,
+                        "recurringScore": recurring_score,
+                        "stabilityScore": stability_score,
+                        "errorCode": 202,
+                        "errorMessage": "Benefit only occurred once/on the same day",
+                        "nextPayDay": "Not Applicable",
+                        "paymentNearHoliday": "None",
+                        "nextPayDayOnHoliday": "Not Applicable",
+                    }
+                    source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_202"
+                    continue
 
-                    # Same day/single trans check
-                    (
-                        freq,
-                        monthly_income,
-                        monthly_num_pay,
-                        regular_payday,
-                        same_day_freq,
-                        next_pay_day,
-                        payment_near_holiday,
-                        next_pay_day_on_holiday,
-                    ) = calculate_frequency_amount(target, holidays, ignore_small_amounts=True)
-                    active_score = active_income_check(target, as_of_date, freq, "Benefit")
-                    recurring_score = recurring_income_check(target, freq, regular_payday, same_day_freq)
-                    stability_score, std_mean_ratio = amount_stability_check(target, freq)
-                    if stability_score != 3:
-                        stable_monthly_income = monthly_income * (1 - std_mean_ratio)
-                    else:
-                        stable_monthly_income = monthly_income
-                    recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
+                # Missing paydays are found for all the sources at once after the loop
+                missing_payday = []
+                missing_payday_sources[cluster] = (historicalPayDay, freq)
 
-                    # Amount check
-                    if per_paycheck < config.PS_LOW_AMOUNT_CHECK:
+                # Skip if the income not seen within a certain peirod of time
+                if freq == "W":
+                    if recency > config.PS_RECENCY_CHECK_W:
+                        sourceID += 1
                         income_source_dict[cluster] = {
                             "accountGuid": account_id,
-                            "sourceID": "None",
+                            "sourceID": "I" + str(sourceID) + "_err_402",
                             "sourceName": source_name,
                             "sourceType": "None",
                             "sourceChannel": "None",
@@ -130,7 +194,7 @@ class BenefitSource:
                             "stableMonthlyIncome": round(stable_monthly_income, 2),
                             "regularPayDay": regular_payday,
                             "historicalPayDay": historicalPayDay,
-                            "missingPayDay": [],
+                            "missingPayDay": missing_payday,
                             "sameDayFreq": same_day_freq,
                             "lastPayDay": last_payday.strftime("%Y-%m-%d"),
                             "incomeType": income_type,
@@ -138,248 +202,165 @@ class BenefitSource:
                             "activeScore": active_score,
                             "recurringScore": recurring_score,
                             "stabilityScore": stability_score,
-                            "errorCode": 302,
-                            "errorMessage": "Benefit Per_paycheck lower than $" + str(config.PS_LOW_AMOUNT_CHECK),
+                            "errorCode": 402,
+                            "errorMessage": "Benefit income not seen within "
+                            + str(config.PS_RECENCY_CHECK_W)
+                            + " days",
                             "nextPayDay": "Not Applicable",
                             "paymentNearHoliday": "None",
                             "nextPayDayOnHoliday": "Not Applicable",
                         }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_402"
                         continue
 
-                    if num_of_payday == 1:
+                elif freq == "B":
+                    if recency > config.PS_RECENCY_CHECK_B:
                         sourceID += 1
                         income_source_dict[cluster] = {
                             "accountGuid": account_id,
-                            "sourceID": "I" + str(sourceID) + "_err_202",
+                            "sourceID": "I" + str(sourceID) + "_err_402",
                             "sourceName": source_name,
                             "sourceType": "None",
                             "sourceChannel": "None",
-                            "numOfPay": 1,
-                            "numOfPayMonthly": 0,
-                            "frequency": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
                             "perPayCheck": round(per_paycheck, 2),
                             "monthlyIncome": round(monthly_income, 2),
                             "stableMonthlyIncome": round(stable_monthly_income, 2),
-                            "regularPayDay": "None",
+                            "regularPayDay": regular_payday,
                             "historicalPayDay": historicalPayDay,
-                            "missingPayDay": [],
-                            "sameDayFreq": 0,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
                             "lastPayDay": last_payday.strftime("%Y-%m-%d"),
                             "incomeType": income_type,
                             "depositMethod": "Direct Deposit",
                             "activeScore": active_score,
                             "recurringScore": recurring_score,
                             "stabilityScore": stability_score,
-                            "errorCode": 202,
-                            "errorMessage": "Benefit only occurred once/on the same day",
+                            "errorCode": 402,
+                            "errorMessage": "Benefit income not seen within "
+                            + str(config.PS_RECENCY_CHECK_B)
+                            + " days",
                             "nextPayDay": "Not Applicable",
                             "paymentNearHoliday": "None",
                             "nextPayDayOnHoliday": "Not Applicable",
                         }
-                        income_source_trans.loc[
-                            (income_source_trans.cluster_label == i) & (income_source_trans.accountGuid == account_id),
-                            "sourceID",
-                        ] = "I" + str(sourceID) + "_err_202"
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_402"
                         continue
 
-                    missing_payday = find_missing_payment(historicalPayDay, freq)
-
-                    # Skip if the income not seen within a certain peirod of time
-                    if freq == "W":
-                        if recency > config.PS_RECENCY_CHECK_W:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_402",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 402,
-                                "errorMessage": "Benefit income not seen within "
-                                + str(config.PS_RECENCY_CHECK_W)
-                                + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_402"
-                            continue
-
-                    elif freq == "B":
-                        if recency > config.PS_RECENCY_CHECK_B:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_402",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 402,
-                                "errorMessage": "Benefit income not seen within "
-                                + str(config.PS_RECENCY_CHECK_B)
-                                + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_402"
-                            continue
+                elif freq == "S":
+                    if recency > config.PS_RECENCY_CHECK_S:
+                        sourceID += 1
+                        income_source_dict[cluster] = {
+                            "accountGuid": account_id,
+                            "sourceID": "I" + str(sourceID) + "_err_402",
+                            "sourceName": source_name,
+                            "sourceType": "None",
+                            "sourceChannel": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
+                            "perPayCheck": round(per_paycheck, 2),
+                            "monthlyIncome": round(monthly_income, 2),
+                            "stableMonthlyIncome": round(stable_monthly_income, 2),
+                            "regularPayDay": regular_payday,
+                            "historicalPayDay": historicalPayDay,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
+                            "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                            "incomeType": income_type,
+                            "depositMethod": "Direct Deposit",
+                            "activeScore": active_score,
+                            "recurringScore": recurring_score,
+                            "stabilityScore": stability_score,
+                            "errorCode": 402,
+                            "errorMessage": "Benefit income not seen within "
+                            + str(config.PS_RECENCY_CHECK_S)
+                            + " days",
+                            "nextPayDay": "Not Applicable",
+                            "paymentNearHoliday": "None",
+                            "nextPayDayOnHoliday": "Not Applicable",
+                        }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_402"
+                        continue
 
-                    elif freq == "S":
-                        if recency > config.PS_RECENCY_CHECK_S:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_402",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 402,
-                                "errorMessage": "Benefit income not seen within "
-                                + str(config.PS_RECENCY_CHECK_S)
-                                + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_402"
-                            continue
+                elif freq == "M":
+                    if recency > config.PS_RECENCY_CHECK_M:
+                        sourceID += 1
+                        income_source_dict[cluster] = {
+                            "accountGuid": account_id,
+                            "sourceID": "I" + str(sourceID) + "_err_402",
+                            "sourceName": source_name,
+                            "sourceType": "None",
+                            "sourceChannel": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
+                            "perPayCheck": round(per_paycheck, 2),
+                            "monthlyIncome": round(monthly_income, 2),
+                            "stableMonthlyIncome": round(stable_monthly_income, 2),
+                            "regularPayDay": regular_payday,
+                            "historicalPayDay": historicalPayDay,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
+                            "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                            "incomeType": income_type,
+                            "depositMethod": "Direct Deposit",
+                            "activeScore": active_score,
+                            "recurringScore": recurring_score,
+                            "stabilityScore": stability_score,
+                            "errorCode": 402,
+                            "errorMessage": "Benefit income not seen within "
+                            + str(config.PS_RECENCY_CHECK_M)
+                            + " days",
+                            "nextPayDay": "Not Applicable",
+                            "paymentNearHoliday": "None",
+                            "nextPayDayOnHoliday": "Not Applicable",
+                        }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_402"
+                        continue
 
-                    elif freq == "M":
-                        if recency > config.PS_RECENCY_CHECK_M:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_402",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 402,
-                                "errorMessage": "Benefit income not seen within "
-                                + str(config.PS_RECENCY_CHECK_M)
-                                + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_402"
-                            continue
+                sourceID += 1
+                income_source_dict[cluster] = {
+                    "accountGuid": account_id,
+                    "sourceID": "I" + str(sourceID) + "_err_000",
+                    "sourceName": source_name,
+                    "sourceType": "None",
+                    "sourceChannel": "None",
+                    "numOfPay": num_of_payday,
+                    "numOfPayMonthly": int(monthly_num_pay),
+                    "frequency": freq,
+                    "perPayCheck": round(per_paycheck, 2),
+                    "monthlyIncome": round(monthly_income, 2),
+                    "stableMonthlyIncome": round(stable_monthly_income, 2),
+                    "regularPayDay": regular_payday,
+                    "historicalPayDay": historicalPayDay,
+                    "missingPayDay": missing_payday,
+                    "sameDayFreq": same_day_freq,
+                    "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                    "incomeType": income_type,
+                    "depositMethod": "Direct Deposit",
+                    "activeScore": active_score,
+                    "recurringScore": recurring_score,
+                    "stabilityScore": stability_score,
+                    "errorCode": 000,
+                    "errorMessage": "NA",
+                    "nextPayDay": next_pay_day,
+                    "paymentNearHoliday": payment_near_holiday,
+                    "nextPayDayOnHoliday": "True" if next_pay_day_on_holiday else "False",
+                }
 
-                    sourceID += 1
-                    income_source_dict[cluster] = {
-                        "accountGuid": account_id,
-                        "sourceID": "I" + str(sourceID) + "_err_000",
-                        "sourceName": source_name,
-                        "sourceType": "None",
-                        "sourceChannel": "None",
-                        "numOfPay": num_of_payday,
-                        "numOfPayMonthly": int(monthly_num_pay),
-                        "frequency": freq,
-                        "perPayCheck": round(per_paycheck, 2),
-                        "monthlyIncome": round(monthly_income, 2),
-                        "stableMonthlyIncome": round(stable_monthly_income, 2),
-                        "regularPayDay": regular_payday,
-                        "historicalPayDay": historicalPayDay,
-                        "missingPayDay": missing_payday,
-                        "sameDayFreq": same_day_freq,
-                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                        "incomeType": income_type,
-                        "depositMethod": "Direct Deposit",
-                        "activeScore": active_score,
-                        "recurringScore": recurring_score,
-                        "stabilityScore": stability_score,
-                        "errorCode": 000,
-                        "errorMessage": "NA",
-                        "nextPayDay": next_pay_day,
-                        "paymentNearHoliday": payment_near_holiday,
-                        "nextPayDayOnHoliday": "True" if next_pay_day_on_holiday else "False",
-                    }
+                # Add sourceID to income_trans
+                source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_000"
 
-                    # Add sourceID to income_trans
+            missing_paydays = find_missing_payments(
+                [historical_paydays for historical_paydays, _ in missing_payday_sources.values()],
+                [freq for _, freq in missing_payday_sources.values()],
+            )
+            for cluster, missing_payday in zip(missing_payday_sources, missing_paydays):
+                income_source_dict[cluster]["missingPayDay"] = missing_payday
 
-                    income_source_trans.loc[
-                        (income_source_trans.cluster_label == i) & (income_source_trans.accountGuid == account_id),
-                        "sourceID",
-                    ] = "I" + str(sourceID) + "_err_000"
+        assign_source_ids(income_source_trans, source_ids, [config.IA_ACCOUNT_ID, config.CLUSTER_LABEL])
 
         return income_source_dict, income_source_trans, sourceID
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from postprocess.sources.benefit_source import BenefitSource
+from postprocess.sources.gig_source import GigSource
+from postprocess.sources.helpers.source_partition import SourcePartition
+from postprocess.sources.income_source import IncomeSource
+from postprocess.sources.loan_source import LoanSource
+from postprocess.sources.transfer_source import TransferSource
+from utils.decorators import timer
+from utils.description_signals import DescriptionSignals
+
+
+@timer
+def categorize_sources(
+    result: pd.DataFrame, as_of_date: pd.Timestamp, signals: DescriptionSignals | None = None
+) -> tuple[dict, dict, dict, dict, pd.DataFrame, dict, pd.DataFrame]:
+    """Categorizes income and loan sources in one stage, sharing a single partition of the credit transactions.
+
+    Returns the payroll, transfer, benefit and gig source dicts, the income source transactions,
+    the loan source dict and the loan source transactions.
+    """
+
+    partition = SourcePartition(result, signals)
+
+    # Aggregate income sources
+    sourceID = 0
+    payroll_source_dict, income_source_trans, sourceID = IncomeSource.categorize_income_source(
+        result, as_of_date=as_of_date, sourceID=sourceID, partition=partition
+    )
+    transfer_source_dict, income_source_trans, sourceID = TransferSource.categorize_income_source(
+        result, income_source_trans, as_of_date=as_of_date, sourceID=sourceID, partition=partition
+    )
+    benefit_source_dict, income_source_trans, sourceID = BenefitSource.categorize_income_source(
+        result, income_source_trans, as_of_date=as_of_date, sourceID=sourceID, partition=partition
+    )
+    gig_source_dict, income_source_trans, sourceID = GigSource.categorize_income_source(
+        result, income_source_trans, as_of_date=as_of_date, sourceID=sourceID, partition=partition
+    )
+
+    # Aggregate loan sources
+    loan_source_dict, loan_source_trans = LoanSource.categorize_loan_source(result, sourceID=0, partition=partition)
+
+    return (
+        payroll_source_dict,
+        transfer_source_dict,
+        benefit_source_dict,
+        gig_source_dict,
+        income_source_trans,
+        loan_source_dict,
+        loan_source_trans,
+    )
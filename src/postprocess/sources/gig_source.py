@@ -6,9 +6,14 @@ from utils.decorators import timer
 from postprocess.sources.helpers.calculate_frequency_amount import (
     active_income_check,
     amount_stability_check,
-    calculate_frequency_amount,
     recurring_income_check,
 )
+from postprocess.sources.helpers.source_partition import (
+    GIG_CLUSTER,
+    SourcePartition,
+    assign_source_ids,
+    same_day_summary,
+)
 
 
 class GigSource:
@@ -21,22 +26,20 @@ class GigSource:
         income_source_trans: pd.DataFrame,
         as_of_date: pd.Timestamp,
         sourceID=0,
+        partition: SourcePartition | None = None,
     ) -> tuple[dict, pd.DataFrame, int]:
         """Returns the gig income source categories given the transactions."""
 
-        # Load holidays for payday prediction
-        holidays = config.HOLIDAYS
         income_source_dict = {}
+        source_ids = {}
 
         # Only consider credit for now
-        result = result[result.type == "CREDIT"]
-
-        # Use simple rule for separating deposit and transfer for null
-        # fee is a negative keyword for transfer but model does not pick it out
-        result = result[result.type == "CREDIT"]
+        if partition is None:
+            partition = SourcePartition(result)
+        result = partition.credits
 
         # Output the income_source_trans
-        customer_df = result[result["transCategory"] == 5]
+        customer_df = partition.category(5)
 
         if len(customer_df) == 0:
             for account_id in result[config.PS_ACCOUNT_ID].unique():
@@ -72,24 +75,15 @@ class GigSource:
 
         if len(customer_df) > 0:
             # Process separately for each account_guid
-            for account_id in customer_df[config.PS_ACCOUNT_ID].unique():
-                target = customer_df[
-                    (customer_df.transCategory == 5) & (customer_df[config.IA_ACCOUNT_ID] == account_id)
-                ].sort_values(config.PS_TXN_DATE)
-                if len(target) == 0:
-                    continue
+            frequencies = partition.frequencies()
+            for account_id, positions in customer_df.groupby(config.PS_ACCOUNT_ID, sort=False).indices.items():
+                target = customer_df.iloc[positions].sort_values(config.PS_TXN_DATE)
                 income_type = "gig"
                 source_name = "gig"
                 cluster = str(account_id) + "_" + "gig"
 
                 # Group sameday transactions into one, this is for getting the historical payday
-                same_day_amount = (
-                    target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]].groupby(config.PS_TXN_DATE).sum().reset_index()
-                )
-                num_of_payday = len(same_day_amount)
-                per_paycheck = same_day_amount[config.PS_TXN_AMOUNT].mean()
-                last_payday = pd.to_datetime(target[config.PS_TXN_DATE]).max()
-                historicalPayDay = list(same_day_amount[config.PS_TXN_DATE])
+                same_day_amount, num_of_payday, per_paycheck, last_payday, historicalPayDay = same_day_summary(target)
                 total_days = (target[config.PS_TXN_DATE].max() - target[config.PS_TXN_DATE].min()) / np.timedelta64(
                     1, "D"
                 )
@@ -104,7 +98,11 @@ class GigSource:
                     next_pay_day,
                     payment_near_holiday,
                     next_pay_day_on_holiday,
-                ) = calculate_frequency_amount(same_day_amount, holidays)
+                ) = frequencies[(5, account_id, GIG_CLUSTER)]
+                # The income checks expect parsed dates
+                same_day_amount[config.PS_TXN_DATE] = pd.to_datetime(
+                    same_day_amount[config.PS_TXN_DATE], errors="coerce"
+                )
                 active_score = active_income_check(same_day_amount, as_of_date, freq, "Gig")
                 recurring_score = recurring_income_check(same_day_amount, freq, regular_payday, same_day_freq)
                 stability_score, std_mean_ratio = amount_stability_check(same_day_amount, freq)
@@ -145,10 +143,7 @@ class GigSource:
                         "paymentNearHoliday": "None",
                         "nextPayDayOnHoliday": "Not Applicable",
                     }
-                    income_source_trans.loc[
-                        (income_source_trans.transCategory == 5) & (income_source_trans.accountGuid == account_id),
-                        "sourceID",
-                    ] = "I" + str(sourceID) + "_err_203"
+                    source_ids[(account_id,)] = "I" + str(sourceID) + "_err_203"
                     continue
 
                 recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
@@ -183,10 +178,7 @@ class GigSource:
                         "paymentNearHoliday": "None",
                         "nextPayDayOnHoliday": "Not Applicable",
                     }
-                    income_source_trans.loc[
-                        (income_source_trans.transCategory == 5) & (income_source_trans.accountGuid == account_id),
-                        "sourceID",
-                    ] = "I" + str(sourceID) + "_err_403"
+                    source_ids[(account_id,)] = "I" + str(sourceID) + "_err_403"
                     continue
                 sourceID += 1
                 income_source_dict[cluster] = {
@@ -219,9 +211,13 @@ class GigSource:
                 }
 
                 # Add sourceID to income_trans
-                income_source_trans.loc[
-                    (income_source_trans.transCategory == 5) & (income_source_trans.accountGuid == account_id),
-                    "sourceID",
-                ] = "I" + str(sourceID) + "_err_000"
+                source_ids[(account_id,)] = "I" + str(sourceID) + "_err_000"
+
+        assign_source_ids(
+            income_source_trans,
+            source_ids,
+            [config.IA_ACCOUNT_ID],
+            restrict=income_source_trans.transCategory == 5,
+        )
 
         return income_source_dict, income_source_trans, sourceID
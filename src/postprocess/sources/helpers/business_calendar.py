@@ -0,0 +1,148 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import config
+
+# Dates outside the precomputed range are still answered, through np.busday_offset instead of a table lookup
+_TABLE_START = np.datetime64("1960-01-01", "D")
+_TABLE_END = np.datetime64("2110-12-31", "D")
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class BusinessDayCalendar:
+    """Immutable weekend/holiday calendar with the next and previous business day of every date precomputed.
+
+    Holidays keep the order they were given in, so callers scanning them get the same first match as a loop would.
+    """
+
+    def __init__(self, holiday_dates):
+        holiday_days = pd.to_datetime(pd.Series(list(holiday_dates), dtype=object), errors="coerce").dropna()
+        self.holiday_sequence = _read_only(holiday_days.to_numpy(dtype="datetime64[D]"))
+        self.holidays = frozenset(holiday_days.dt.date)
+        self._busdaycal = np.busdaycalendar(holidays=np.unique(self.holiday_sequence))
+
+        start, end = _TABLE_START, _TABLE_END
+        if len(self.holiday_sequence):
+            start = min(start, self.holiday_sequence.min() - 7)
+            end = max(end, self.holiday_sequence.max() + 7)
+        days = np.arange(start, end + 1, dtype="datetime64[D]")
+        self._start = start
+        self._start_ordinal = start.astype(datetime.date).toordinal()
+        self._is_business = _read_only(np.is_busday(days, busdaycal=self._busdaycal))
+        self._next = _read_only(np.busday_offset(days + 1, 0, roll="forward", busdaycal=self._busdaycal))
+        self._previous = _read_only(np.busday_offset(days - 1, 0, roll="backward", busdaycal=self._busdaycal))
+        # Plain tuples of day gaps for the scalar helpers, indexing them is cheaper than numpy scalar access
+        self._is_business_flags = tuple(self._is_business.tolist())
+        self._days_to_next = tuple((self._next - days).astype(np.int64).tolist())
+        self._days_to_previous = tuple((days - self._previous).astype(np.int64).tolist())
+
+    @classmethod
+    def from_holidays(cls, holidays: pd.DataFrame) -> "BusinessDayCalendar":
+        """Builds a calendar from a holiday frame, parsing its HolidayDate column once."""
+
+        return cls(pd.to_datetime(holidays["HolidayDate"], format="%m/%d/%y", errors="coerce"))
+
+    def _position(self, date) -> int | None:
+        position = date.toordinal() - self._start_ordinal
+        if 0 <= position < len(self._is_business_flags):
+            return position
+        return None
+
+    def is_business(self, date) -> bool:
+        """Whether a single date is neither a weekend nor a holiday."""
+
+        position = self._position(date)
+        if position is None:
+            return bool(np.is_busday(np.datetime64(date, "D"), busdaycal=self._busdaycal))
+        return self._is_business_flags[position]
+
+    def days_to_next(self, date) -> int:
+        """Number of days from a single date to the first business day after it."""
+
+        position = self._position(date)
+        if position is None:
+            day = np.datetime64(date, "D")
+            return int((np.busday_offset(day + 1, 0, roll="forward", busdaycal=self._busdaycal) - day).astype(int))
+        return self._days_to_next[position]
+
+    def days_to_previous(self, date) -> int:
+        """Number of days from the last business day before a single date to that date."""
+
+        position = self._position(date)
+        if position is None:
+            day = np.datetime64(date, "D")
+            return int((day - np.busday_offset(day - 1, 0, roll="backward", busdaycal=self._busdaycal)).astype(int))
+        return self._days_to_previous[position]
+
+    def _lookup(self, table: np.ndarray, dates, fallback) -> np.ndarray:
+        days = np.asarray(dates, dtype="datetime64[D]")
+        positions = (days - self._start).astype(np.int64)
+        inside = (positions >= 0) & (positions < len(table))
+        result = table[np.where(inside, positions, 0)]
+        if not inside.all():
+            result = result.copy()
+            result[~inside] = fallback(days[~inside])
+        return result
+
+    def business_day_neighbours(self, dates) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Whether each date is a business day, with the previous and next business day, in one lookup."""
+
+        days = np.asarray(dates, dtype="datetime64[D]")
+        positions = (days - self._start).astype(np.int64)
+        if positions.size and positions.min() >= 0 and positions.max() < len(self._is_business):
+            return self._is_business[positions], self._previous[positions], self._next[positions]
+        return self.is_business_day(days), self.previous_business_day(days), self.next_business_day(days)
+
+    def is_business_day(self, dates) -> np.ndarray:
+        """Whether each date is neither a weekend nor a holiday."""
+
+        return self._lookup(self._is_business, dates, lambda days: np.is_busday(days, busdaycal=self._busdaycal))
+
+    def next_business_day(self, dates) -> np.ndarray:
+        """First business day strictly after each date."""
+
+        return self._lookup(
+            self._next, dates, lambda days: np.busday_offset(days + 1, 0, roll="forward", busdaycal=self._busdaycal)
+        )
+
+    def previous_business_day(self, dates) -> np.ndarray:
+        """Last business day strictly before each date."""
+
+        return self._lookup(
+            self._previous,
+            dates,
+            lambda days: np.busday_offset(days - 1, 0, roll="backward", busdaycal=self._busdaycal),
+        )
+
+    def offset(self, dates, n) -> np.ndarray:
+        """Moves each date n business days, dates falling on a non-business day are first rolled forward."""
+
+        days = np.asarray(dates, dtype="datetime64[D]")
+        return np.busday_offset(days, n, roll="forward", busdaycal=self._busdaycal)
+
+    def holidays_within(self, date, business_days: int) -> tuple[np.ndarray, np.ndarray]:
+        """Positions in holiday order of the holidays at most business_days business days away from date,
+        with their signed business day counts (positive when the holiday comes after the date)."""
+
+        counts = np.busday_count(np.datetime64(date, "D"), self.holiday_sequence)
+        positions = np.flatnonzero(np.abs(counts) <= business_days)
+        return positions, counts[positions]
+
+
+BUSINESS_CALENDAR = BusinessDayCalendar.from_holidays(config.HOLIDAYS)
+
+
+def get_business_calendar(holidays=None) -> BusinessDayCalendar:
+    """Returns the calendar for a holiday frame, the configured holidays reuse the calendar built at startup."""
+
+    if isinstance(holidays, BusinessDayCalendar):
+        return holidays
+    if holidays is None or holidays is config.HOLIDAYS:
+        return BUSINESS_CALENDAR
+    return BusinessDayCalendar.from_holidays(holidays)
@@ -9,7 +9,7 @@ from postprocess.sources.helpers.enhanced_payday_prediction import (
 )
 from utils.decorators import timer
 
-from .source_debit_date import check_weekly_income_on_holiday, predict_next_payday
+from .source_debit_date import check_weekly_income_on_holiday, predict_next_paydays
 
 
 def format_enhanced_payday_result(enhanced_result: dict, fallback_day_month: str) -> tuple[str, float]:
@@ -98,12 +98,7 @@ def format_enhanced_payday_result(enhanced_result: dict, fallback_day_month: str
         return str(predicted_pattern), confidence
 
 
-@timer
-def calculate_frequency_amount(
-    target: pd.DataFrame,
-    holidays: pd.DataFrame = None,
-    ignore_small_amounts: bool = False,
-) -> tuple[
+FrequencyAmount = tuple[
     Literal["I", "W", "B", "S", "M"],
     float,
     Union[float, int],
@@ -112,7 +107,19 @@ def calculate_frequency_amount(
     str,  # nextPayDay
     str,  # paymentNearHoliday
     int,  # nextPayDayOnHoliday
-]:
+]
+
+# Result for a cluster without any payment left after dropping small amounts
+NO_FREQUENCY_AMOUNT = ("I", 0.0, 0, "None", 0.0, "Not Applicable", "None", 0)
+
+CLUSTER_CODE = "_cluster"
+
+
+def calculate_frequency_amount(
+    target: pd.DataFrame,
+    holidays: pd.DataFrame = None,
+    ignore_small_amounts: bool = False,
+) -> FrequencyAmount:
     """Returns the income frequency and amounts.
 
     Args:
@@ -124,105 +131,168 @@ def calculate_frequency_amount(
     # target = target.copy() # THIS LINE CAUSES MULTIPLE TESTS TO FAIL (?)
     target[config.PS_TXN_DATE] = pd.to_datetime(target[config.PS_TXN_DATE], errors="coerce")
 
-    # Sort earliest to latest
-    target = target.sort_values(config.PS_TXN_DATE)
-
-    if ignore_small_amounts:
-        target_filtered = target[target[config.PS_TXN_AMOUNT] > 50].copy()
-
-        if target_filtered.empty:
-            return "I", 0.0, 0, "None", 0.0, "Not Applicable", "None", 0
-
-        if len(target_filtered) >= config.MINIMUM_N_PAYS_AMOUNT_TWEAK_M:
-            median_amount = target_filtered[config.PS_TXN_AMOUNT].median()
-            if pd.notna(median_amount) and median_amount > 0:
-                lower_bound = 0.3 * median_amount
-                # upper_bound = 2.0 * median_amount
-                target_trimmed = target_filtered[
-                    (
-                        target_filtered[config.PS_TXN_AMOUNT] >= lower_bound
-                        # & (target_filtered[config.PS_TXN_AMOUNT] <= upper_bound)
-                    )
-                ].copy()
-                if not target_trimmed.empty:
-                    target_filtered = target_trimmed
-
-        target = target_filtered
-
-    # Add up payroll amounts on the same day
-    df_freq = target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]].groupby(config.PS_TXN_DATE).sum().reset_index()
-
-    # Number of days with a payroll
-    num_of_payday = len(df_freq)
-
-    # Number of paychecks on a payday
-    num_of_pay_pp = 1
-
-    # Average amount received on a payday
-    average_amount = df_freq[config.PS_TXN_AMOUNT].mean()
-
-    # Days between latest and earliest
-    total_days = (df_freq[config.PS_TXN_DATE].max() - df_freq[config.PS_TXN_DATE].min()) / np.timedelta64(1, "D")
-
-    # Interval calculates the days between two payrolls
-    df_freq["interval"] = df_freq[config.PS_TXN_DATE].diff() / np.timedelta64(1, "D")
+    results = calculate_frequency_amount_batch(
+        target.assign(**{CLUSTER_CODE: 0}), [CLUSTER_CODE], holidays, ignore_small_amounts
+    )
+    if ignore_small_amounts and not results:
+        return NO_FREQUENCY_AMOUNT
+    return results[(0,)]
 
-    # day_month is the day of payroll date
-    df_freq["day_month"] = df_freq[config.PS_TXN_DATE].dt.day
 
-    # day_week is the weekday of payroll date
-    df_freq["day_week"] = df_freq[config.PS_TXN_DATE].dt.day_name()
+@timer
+def calculate_frequency_amount_batch(
+    transactions: pd.DataFrame,
+    keys: list[str],
+    holidays: pd.DataFrame = None,
+    ignore_small_amounts: bool | np.ndarray = False,
+) -> dict[tuple, FrequencyAmount]:
+    """Returns the income frequency and amounts of every cluster in one call.
 
-    # month_start indicates whether the date is the start of a month, 1 yes, 0 no
-    df_freq["month_start"] = df_freq[config.PS_TXN_DATE].dt.is_month_start.astype(int)
+    The same-day merge, intervals and interval ratios are computed for all the clusters at once, only the
+    frequency classification itself runs per cluster.
 
-    # month_end indicates whether the date is the end of a month, 1 yes, 0 no
-    df_freq["month_end"] = df_freq[config.PS_TXN_DATE].dt.is_month_end.astype(int)
+    Args:
+        transactions: Input transactions of all the clusters.
+        keys: Columns identifying a cluster.
+        holidays: Calendar of holidays for payday adjustments.
+        ignore_small_amounts: Drop small/irregular payments before frequency calc, either for all the clusters or
+            per transaction, the flag must be the same for all the transactions of a cluster.
 
-    # month_mid indicates whether the date is the 15th of a month, 1 yes, 0 no
-    df_freq["month_mid"] = df_freq["day_month"].apply(lambda x: 1 if x == 15 else 0)
+    Returns:
+        dict: calculate_frequency_amount result for each cluster, keyed by the tuple of its key values.
+    """
 
-    # week_month indicates in which week of the month the payroll occurs
-    df_freq["week_month"] = df_freq["day_month"].apply((lambda x: (x - 1) // 7 + 1)).astype(str)
+    frame = transactions[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]].copy()
+    frame[config.PS_TXN_DATE] = pd.to_datetime(frame[config.PS_TXN_DATE], errors="coerce")
+    frame[CLUSTER_CODE] = transactions.groupby(keys, sort=False).ngroup().to_numpy()
+    ignored = np.broadcast_to(np.asarray(ignore_small_amounts, dtype=bool), len(frame))
+    cluster_keys = (
+        transactions[keys].assign(**{CLUSTER_CODE: frame[CLUSTER_CODE].to_numpy()}).drop_duplicates(CLUSTER_CODE)
+    )
+    cluster_keys = dict(zip(cluster_keys[CLUSTER_CODE], cluster_keys[keys].itertuples(index=False, name=None)))
+    in_cluster = frame[CLUSTER_CODE].to_numpy() >= 0
+    frame = frame[in_cluster]
+    ignored = ignored[in_cluster]
+
+    results = {}
+    if ignored.any():
+        has_payment = set(frame.loc[ignored, CLUSTER_CODE])
+        large = (~ignored) | (frame[config.PS_TXN_AMOUNT] > 50).to_numpy()
+        frame = frame[large]
+        ignored = ignored[large]
+        for code in has_payment - set(frame[CLUSTER_CODE]):
+            results[cluster_keys[code]] = NO_FREQUENCY_AMOUNT
+
+        amounts = frame.groupby(CLUSTER_CODE)[config.PS_TXN_AMOUNT]
+        median_amount = amounts.transform("median")
+        tweaked = (
+            ignored
+            & (amounts.transform("size") >= config.MINIMUM_N_PAYS_AMOUNT_TWEAK_M)
+            & (median_amount > 0)
+        )
+        kept = ~tweaked | (frame[config.PS_TXN_AMOUNT] >= 0.3 * median_amount)
+        # Keep every payment of a cluster the trimming would empty
+        kept |= ~kept.groupby(frame[CLUSTER_CODE]).transform("any")
+        frame = frame[kept]
 
-    # The sum of month_start, month_end, month_mid, which are semi_indicators
-    df_freq["semi_indicator"] = df_freq[["month_start", "month_end", "month_mid"]].sum(axis=1)
+    # Add up payroll amounts on the same day
+    df_freq = frame.groupby([CLUSTER_CODE, config.PS_TXN_DATE])[config.PS_TXN_AMOUNT].sum().reset_index()
+    if df_freq.empty:
+        return results
 
-    # interval_W indicates whether the interval is 7, 1 yes, 0 no
-    df_freq["interval_W"] = df_freq["interval"].apply(lambda x: 1 if x == 7 else 0)
+    codes = df_freq[CLUSTER_CODE].to_numpy()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    num_of_paydays = ends - starts
 
-    # interval_B indicates whether the interval is >=13 and <=17 (so it is either a semi-monthly or biweekly), 1 yes, 0 no
-    df_freq["interval_B"] = df_freq["interval"].apply(lambda x: 1 if x >= 13 and x <= 17 else 0)
+    paydays = df_freq[config.PS_TXN_DATE]
+    payday_values = paydays.to_numpy()
+    amount_values = df_freq[config.PS_TXN_AMOUNT].to_numpy(dtype=np.float64)
 
-    # interval_M indicates whether the interval is >=25 and <=35, 1 yes, 0 no
-    df_freq["interval_M"] = df_freq["interval"].apply(lambda x: 1 if x >= 25 and x <= 35 else 0)
+    # Days between latest and earliest
+    total_days = (payday_values[ends - 1] - payday_values[starts]) / np.timedelta64(1, "D")
+
+    # Interval calculates the days between two payrolls, the first payday of a cluster has none
+    interval = (paydays.diff() / np.timedelta64(1, "D")).to_numpy(copy=True)
+    interval[starts] = np.nan
+
+    # The number of intervals which are weekly, biweekly/semi-monthly, monthly and a multiple of 7
+    interval_W = np.add.reduceat((interval == 7).astype(int), starts)
+    interval_B = np.add.reduceat(((interval >= 13) & (interval <= 17)).astype(int), starts)
+    interval_M = np.add.reduceat(((interval >= 25) & (interval <= 35)).astype(int), starts)
+    multiple_of_7 = np.add.reduceat((interval % 7 == 0).astype(int), starts)
+
+    day_month = paydays.dt.day.to_numpy()
+    day_week = paydays.dt.day_name().to_numpy()
+    month_end = np.add.reduceat(paydays.dt.is_month_end.to_numpy().astype(int), starts)
+
+    last_paydays = {}
+    for k, (start, end) in enumerate(zip(starts, ends)):
+        last_paydays[cluster_keys[codes[start]]] = pd.Timestamp(payday_values[end - 1])
+        num_of_payday = int(num_of_paydays[k])
+        # The ratio is number of W/B/S/M intervals over (num_of_payday-1)
+        # (num_of_payday-1) is the total number of intervals since first one gets a null
+        results[cluster_keys[codes[start]]] = _classify_frequency(
+            paydays=pd.Series(payday_values[start:end]),
+            num_of_payday=num_of_payday,
+            average_amount=amount_values[start:end].sum() / num_of_payday,
+            total_days=total_days[k],
+            interval_W_ratio=interval_W[k] / (num_of_payday - 1) if num_of_payday > 1 else 0,
+            interval_B_ratio=interval_B[k] / (num_of_payday - 1) if num_of_payday > 1 else 0,
+            interval_M_ratio=interval_M[k] / (num_of_payday - 1) if num_of_payday > 1 else 0,
+            multiple_of_7_ratio=multiple_of_7[k] / (num_of_payday - 1) if num_of_payday > 1 else 0,
+            day_week_counts=pd.Series(day_week[start:end]).value_counts(),
+            day_month_counts=pd.Series(day_month[start:end]).value_counts(),
+            month_end_count=month_end[k],
+            holidays=holidays,
+        )
 
-    # weekday in week x of a month
-    df_freq["weekday_weekmonth"] = df_freq[["day_week", "week_month"]].agg(" in Week ".join, axis=1)
+    # Predict next payday with holiday adjustment, for all the clusters with a frequency in one call
+    predicted = [key for key in last_paydays if results[key][0] != "I"]
+    next_pay_dates, next_payday_on_holiday_flags = predict_next_paydays(
+        [last_paydays[key] for key in predicted],
+        [results[key][0] for key in predicted],
+        [results[key][3] for key in predicted],
+        [results[key][6] for key in predicted],
+    )
+    for key, next_pay_date, nextPayDayOnHoliday in zip(predicted, next_pay_dates, next_payday_on_holiday_flags):
+        nextPayDay = "Not Applicable" if isinstance(next_pay_date, str) else str(next_pay_date.date())
+        results[key] = results[key][:5] + (nextPayDay, results[key][6], nextPayDayOnHoliday)
+
+    return results
+
+
+def _classify_frequency(
+    paydays: pd.Series,
+    num_of_payday: int,
+    average_amount: float,
+    total_days: float,
+    interval_W_ratio: float,
+    interval_B_ratio: float,
+    interval_M_ratio: float,
+    multiple_of_7_ratio: float,
+    day_week_counts: pd.Series,
+    day_month_counts: pd.Series,
+    month_end_count: int,
+    holidays: pd.DataFrame = None,
+) -> FrequencyAmount:
+    """Classifies the frequency and regular payday of a cluster from its payday statistics.
 
-    # Interval is mutiple of 7
-    df_freq["multiple_of_7"] = df_freq["interval"].apply(lambda x: 1 if x % 7 == 0 else 0)
-    multiple_of_7_ratio = df_freq["multiple_of_7"].sum() / (num_of_payday - 1) if num_of_payday > 1 else 0
+    The next payday is left as not applicable, calculate_frequency_amount_batch predicts it for all clusters at once.
+    """
 
-    # The ratio is number of W/B/S/M intervals over (num_of_payday-1)
-    # (num_of_payday-1) is the total number of intervals since first one gets a null
-    interval_W_ratio = df_freq["interval_W"].sum() / (num_of_payday - 1) if num_of_payday > 1 else 0
-    interval_B_ratio = df_freq["interval_B"].sum() / (num_of_payday - 1) if num_of_payday > 1 else 0
-    interval_M_ratio = df_freq["interval_M"].sum() / (num_of_payday - 1) if num_of_payday > 1 else 0
+    # Number of paychecks on a payday
+    num_of_pay_pp = 1
 
     # Get the most frequent weekday the payroll occurs
-    pay_weekday = df_freq["day_week"].value_counts().index[0]
+    pay_weekday = day_week_counts.index[0]
 
     # Get the most frequent day of the month the paroll occurs
-    pay_day_month = df_freq["day_month"].value_counts().index
+    pay_day_month = day_month_counts.index
 
     # Calculate the ratio of payrolls occurs on the most frequent weekday
-    same_weekday_ratio = df_freq["day_week"].value_counts().values[0] / num_of_payday
+    same_weekday_ratio = day_week_counts.values[0] / num_of_payday
 
-    # Get the most frequent weekday_weekmonth
-    df_freq["weekday_weekmonth"].value_counts().index[0]
-
-    day_month_counts = df_freq["day_month"].value_counts()
 
     # Assign initial values
     freq = "I"
@@ -259,7 +329,7 @@ def calculate_frequency_amount(
     # based on whether they show up on the same week day or day of the month
     elif interval_B_ratio > ratio:
         # Convert pandas dates to datetime.date objects for enhanced prediction
-        observed_paydays = [date.date() for date in df_freq[config.PS_TXN_DATE]]
+        observed_paydays = [date.date() for date in paydays]
 
         # Use enhanced logic to determine biweekly vs semi-monthly
         pattern_result = determine_biweekly_or_semimonthly(observed_paydays)
@@ -312,7 +382,7 @@ def calculate_frequency_amount(
                 freq = "I"
         else:
             # No clear pattern - fall back to old logic
-            same_day_month_ratio = np.sum(df_freq["day_month"].value_counts().values[:2]) / num_of_payday
+            same_day_month_ratio = np.sum(day_month_counts.values[:2]) / num_of_payday
 
             if same_weekday_ratio > same_day_month_ratio:
                 # Biweekly pattern
@@ -338,11 +408,11 @@ def calculate_frequency_amount(
 
                     if is_near_end_of_month and len(pay_day_month) >= 2:
                         same_day_month_ratio_2 = (
-                            df_freq["day_month"].value_counts().values[1] + df_freq["month_end"].sum()
+                            day_month_counts.values[1] + month_end_count
                         ) / num_of_payday
                     else:
                         same_day_month_ratio_2 = (
-                            df_freq["day_month"].value_counts().values[0] + df_freq["month_end"].sum()
+                            day_month_counts.values[0] + month_end_count
                         ) / num_of_payday
 
                     if max(same_day_month_ratio, same_day_month_ratio_2) > ratio:
@@ -350,7 +420,7 @@ def calculate_frequency_amount(
                         first_day = pay_day_month[0]
                         second_day = None
 
-                        for candidate_day in df_freq["day_month"].value_counts().index[1:]:
+                        for candidate_day in day_month_counts.index[1:]:
                             if abs(first_day - candidate_day) >= 7:
                                 second_day = candidate_day
                                 break
@@ -382,13 +452,13 @@ def calculate_frequency_amount(
         monthly_num_pay = num_of_pay_pp * 1
 
         # Convert pandas dates to datetime.date objects for enhanced prediction
-        observed_paydays = [date.date() for date in df_freq[config.PS_TXN_DATE]]
+        observed_paydays = [date.date() for date in paydays]
 
         # Use enhanced payday prediction
         enhanced_result = predict_monthly_regular_payday_enhanced(observed_paydays)
 
         # Fallback values for backward compatibility
-        same_day_month_ratio = np.sum(df_freq["day_month"].value_counts().values[0]) / num_of_payday
+        same_day_month_ratio = np.sum(day_month_counts.values[0]) / num_of_payday
         fallback_day_month = str(day_month_counts.index[0])
 
         # Convert enhanced result to backward-compatible format
@@ -410,26 +480,23 @@ def calculate_frequency_amount(
             same_day_freq = same_weekday_ratio
 
     # Try to give a regular payday for frequency I:
-    if freq == "I" and len(df_freq) > config.MINIMUM_N_PAYDAYS_FOR_FREQ_I_HAVE_REGULAR_PAYDAY:
+    if freq == "I" and num_of_payday > config.MINIMUM_N_PAYDAYS_FOR_FREQ_I_HAVE_REGULAR_PAYDAY:
         if same_weekday_ratio > ratio:
             regular_payday = pay_weekday
             same_day_freq = same_weekday_ratio
         elif len(pay_day_month) >= 2:
             regular_payday = str(pay_day_month[0]) + "," + str(pay_day_month[1])
-            same_day_freq = np.sum(df_freq["day_month"].value_counts().values[:2]) / num_of_payday
+            same_day_freq = np.sum(day_month_counts.values[:2]) / num_of_payday
         else:
             regular_payday = str(pay_day_month[0])
-            same_day_freq = np.sum(df_freq["day_month"].value_counts().values[:2]) / num_of_payday
+            same_day_freq = np.sum(day_month_counts.values[:2]) / num_of_payday
 
     # New functionality: Calculate nextPayDay, paymentNearHoliday, nextPayDayOnHoliday
     nextPayDay = "Not Applicable"
     paymentNearHoliday = "None"
     nextPayDayOnHoliday = 0
 
-    # Get last payday for prediction
-    last_payday = df_freq[config.PS_TXN_DATE].max()
-
-    # Predict next payday
+    # Payment near holiday for the next payday prediction
     if freq != "I":
         # First calculate paymentNearHoliday
         if holidays is not None and len(holidays) > 0:
@@ -442,7 +509,7 @@ def calculate_frequency_amount(
                 "Saturday",
                 "Sunday",
             ]:
-                historical_paydays = df_freq[config.PS_TXN_DATE].tolist()
+                historical_paydays = paydays.tolist()
                 paymentNearHoliday = check_weekly_income_on_holiday(
                     pd.to_datetime(historical_paydays), regular_payday, holidays, freq
                 )
@@ -464,11 +531,6 @@ def calculate_frequency_amount(
         else:
             paymentNearHoliday = "None"
 
-        # Now predict next payday with holiday adjustment
-        next_pay_date, nextPayDayOnHoliday = predict_next_payday(last_payday, freq, regular_payday, paymentNearHoliday)
-        if next_pay_date != "Not Applicable" and next_pay_date is not None:
-            nextPayDay = str(next_pay_date.date()) if hasattr(next_pay_date, "date") else str(next_pay_date)
-
     return (
         freq,
         monthly_income,
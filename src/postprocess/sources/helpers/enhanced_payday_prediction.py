@@ -9,17 +9,16 @@ analysis when primary patterns cannot be detected.
 """
 
 import calendar
+import copy
 from collections import Counter
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List
 
 import numpy as np
-import pandas as pd
-from config import config
+from postprocess.sources.helpers.business_calendar import BUSINESS_CALENDAR
 
-# Import holiday data loader if available
-holidays = config.HOLIDAYS
-holiday_dates = set(pd.to_datetime(holidays["HolidayDate"], format="%m/%d/%y", errors="coerce").dt.date)
+holiday_dates = BUSINESS_CALENDAR.holidays
 
 
 def is_weekend(date):
@@ -34,23 +33,17 @@ def is_holiday(date):
 
 def is_business_day(date):
     """Check if a date is a business day (not weekend or holiday)"""
-    return not (is_weekend(date) or is_holiday(date))
+    return BUSINESS_CALENDAR.is_business(date)
 
 
 def get_previous_business_day(date):
     """Get the previous business day"""
-    prev_date = date - timedelta(days=1)
-    while not is_business_day(prev_date):
-        prev_date = prev_date - timedelta(days=1)
-    return prev_date
+    return date - timedelta(days=BUSINESS_CALENDAR.days_to_previous(date))
 
 
 def get_next_business_day(date):
     """Get the next business day"""
-    next_date = date + timedelta(days=1)
-    while not is_business_day(next_date):
-        next_date = next_date + timedelta(days=1)
-    return next_date
+    return date + timedelta(days=BUSINESS_CALENDAR.days_to_next(date))
 
 
 def get_last_day_of_month(year, month):
@@ -113,6 +106,80 @@ def get_weekday_of_last_week(date):
         return None  # This is not last week
 
 
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Codes of how an observed payday matches an intended payday, see _match_codes
+NO_MATCH, ON_DAY, MOVED_BEFORE, MOVED_AFTER = 0, 1, 2, 3
+
+
+def _weekday_of(dates):
+    """Weekday (Monday=0) of datetime64[D] dates, 1970-01-01 was a Thursday"""
+    return (dates.astype(np.int64) + 3) % 7
+
+
+class _PaydayHistory:
+    """Observed paydays as numpy day arrays, shared by all the pattern analyzers of one payday history"""
+
+    def __init__(self, observed_paydays):
+        self.dates = np.array(list(observed_paydays), dtype="datetime64[D]")
+        months = self.dates.astype("datetime64[M]")
+        # First day and number of days of the previous, current and next month of each payday
+        self._month_starts = {shift: (months + shift).astype("datetime64[D]") for shift in (-1, 0, 1, 2)}
+        self._month_lengths = {
+            shift: (self._month_starts[shift + 1] - self._month_starts[shift]).astype(np.int64) for shift in (-1, 0, 1)
+        }
+        self.days = (self.dates - self._month_starts[0]).astype(np.int64) + 1
+        self.weekdays = _weekday_of(self.dates)
+
+    def month_start(self, shift=0):
+        """First day of each payday's month, moved by shift months (-1 to 1)"""
+        return self._month_starts[shift]
+
+    def month_length(self, shift=0):
+        """Number of days in each payday's month, moved by shift months (-1 to 1)"""
+        return self._month_lengths[shift]
+
+
+@lru_cache(maxsize=1000)
+def _payday_history(observed_paydays: tuple) -> _PaydayHistory:
+    return _PaydayHistory(observed_paydays)
+
+
+def _match_codes(paydays, intended):
+    """How each payday matches the intended payday broadcast against it
+
+    ON_DAY when paid on the intended date, MOVED_BEFORE/MOVED_AFTER when the intended date is not a business day
+    and the payday is the previous/next business day, NO_MATCH otherwise.
+    """
+    business_day, previous_business_day, next_business_day = BUSINESS_CALENDAR.business_day_neighbours(intended)
+    # The three cases exclude each other, as the previous business day < intended date < the next business day
+    return (
+        (paydays == intended) * ON_DAY
+        + (~business_day & (paydays == previous_business_day)) * MOVED_BEFORE
+        + (~business_day & (paydays == next_business_day)) * MOVED_AFTER
+    )
+
+
+def _day_of_month_codes(history, candidate_days, shifts=(0,)):
+    """Match codes of every payday against each candidate day of its month moved by each shift (-1 to 1) months
+
+    Codes are NO_MATCH where the day doesn't exist in that month. Returns the codes and whether each day exists,
+    both shaped shifts x paydays x candidate days.
+    """
+    candidate_days = np.asarray(candidate_days, dtype=np.int64)
+    month_starts = np.stack([history.month_start(shift) for shift in shifts])[:, :, None]
+    month_lengths = np.stack([history.month_length(shift) for shift in shifts])[:, :, None]
+    exists = candidate_days <= month_lengths
+    codes = _match_codes(history.dates[:, None], month_starts + (candidate_days - 1))
+    return np.where(exists, codes, NO_MATCH), exists
+
+
+def _month_end_codes(history, shifts=(0,)):
+    """Match codes of every payday against the last day of its month moved by each shift (-1 to 1) months"""
+    month_ends = np.stack([history.month_start(shift) + (history.month_length(shift) - 1) for shift in shifts])
+    return _match_codes(history.dates, month_ends)
+
+
 def analyze_day_of_month_pattern_hybrid(observed_paydays: List[datetime]) -> Dict[str, Any]:
     """Two-phase day-of-month analysis: raw pattern detection + outlier adjustment validation"""
     if len(observed_paydays) < 2:
@@ -123,105 +190,29 @@ def analyze_day_of_month_pattern_hybrid(observed_paydays: List[datetime]) -> Dic
     max_count = day_counts.most_common(1)[0][1]
     tied_days = [day for day, count in day_counts.items() if count == max_count]
 
-    # Test each tied day and find the one with best adjustment performance
-    best_score = 0.0
-    best_result = None
-
-    for candidate_day in tied_days:
-        raw_count = day_counts[candidate_day]
-
-        # Phase 2: For outliers, check if they're adjusted versions of candidate day
-        adjusted_matches = raw_count  # Start with raw matches
-        # Track adjustment direction counts
-        adjustment_count_A = 0  # After adjustments (forward)
-        adjustment_count_B = 0  # Before adjustments (backward)
-        outliers = []
-
-        for observed_date in observed_paydays:
-            if observed_date.day != candidate_day:
-                outliers.append(observed_date)
-
-        for outlier_date in outliers:
-            year, month = outlier_date.year, outlier_date.month
-
-            # Construct intended payday for this month based on inferred pattern
-            intended_date = None
-            try:
-                intended_date = datetime(year, month, candidate_day).date()
-            except ValueError:
-                # Day doesn't exist in this month (e.g., Feb 30) - skip this outlier
-                continue
-
-            # Only check adjustments if intended date falls on non-business day
-            if not is_business_day(intended_date):
-                prev_business_day = get_previous_business_day(intended_date)
-                next_business_day = get_next_business_day(intended_date)
-
-                if outlier_date == prev_business_day:
-                    adjusted_matches += 1
-                    adjustment_count_B += 1
-                elif outlier_date == next_business_day:
-                    adjusted_matches += 1
-                    adjustment_count_A += 1
-
-            # Handle cross-month adjustments more comprehensively
-            # Check if outlier could be from previous month's adjustment
-            if month > 1:
-                prev_month_year, prev_month = year, month - 1
-            else:
-                prev_month_year, prev_month = year - 1, 12
-
-            try:
-                prev_month_intended = datetime(prev_month_year, prev_month, candidate_day).date()
-                if not is_business_day(prev_month_intended):
-                    # Check both directions of adjustment
-                    prev_month_adjusted_back = get_previous_business_day(prev_month_intended)
-                    prev_month_adjusted_forward = get_next_business_day(prev_month_intended)
-
-                    if outlier_date == prev_month_adjusted_back:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                    elif outlier_date == prev_month_adjusted_forward:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-            except ValueError:
-                pass
-
-            # Check if outlier could be from next month's adjustment
-            if month < 12:
-                next_month_year, next_month = year, month + 1
-            else:
-                next_month_year, next_month = year + 1, 1
-
-            try:
-                next_month_intended = datetime(next_month_year, next_month, candidate_day).date()
-                if not is_business_day(next_month_intended):
-                    # Check both directions of adjustment
-                    next_month_adjusted_back = get_previous_business_day(next_month_intended)
-                    next_month_adjusted_forward = get_next_business_day(next_month_intended)
-
-                    if outlier_date == next_month_adjusted_back:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                    elif outlier_date == next_month_adjusted_forward:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-            except ValueError:
-                pass
-
-        # Calculate consistency for this candidate
-        final_consistency = adjusted_matches / len(observed_paydays)
-
-        if final_consistency > best_score:
-            best_score = final_consistency
-            best_result = {
-                "day": candidate_day,
-                "raw_count": raw_count,
-                "adjusted_matches": adjusted_matches,
-                "consistency": final_consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    # Phase 2: For outliers, check if they're adjusted versions of each tied day, all tied days at once
+    history = _payday_history(tuple(observed_paydays))
+    candidate_days = np.array(tied_days)
+    raw_counts = np.array([day_counts[day] for day in tied_days])
+    # Adjustments within the same month, and cross-month adjustments from the previous and next month
+    codes, exists = _day_of_month_codes(history, candidate_days, shifts=(0, -1, 1))
+    # Outliers whose intended day doesn't exist in their month (e.g., Feb 30) are skipped
+    outliers = (history.days[:, None] != candidate_days) & exists[0]
+    adjustment_counts_A = ((codes == MOVED_AFTER) & outliers).sum(axis=(0, 1))
+    adjustment_counts_B = ((codes == MOVED_BEFORE) & outliers).sum(axis=(0, 1))
+    adjusted_counts = raw_counts + adjustment_counts_A + adjustment_counts_B
+
+    # The first tied day with the best consistency wins
+    best = int(np.argmax(adjusted_counts))
+    best_score = int(adjusted_counts[best]) / len(observed_paydays)
+    best_result = {
+        "day": tied_days[best],
+        "raw_count": int(raw_counts[best]),
+        "adjusted_matches": int(adjusted_counts[best]),
+        "consistency": best_score,
+        "adjustment_count_A": int(adjustment_counts_A[best]),
+        "adjustment_count_B": int(adjustment_counts_B[best]),
+    }
 
     if best_result and best_score >= 0.6:  # At least 60% consistency
         # Determine adjustment direction
@@ -258,77 +249,23 @@ def analyze_last_day_pattern_hybrid(observed_paydays: List[datetime]) -> Dict[st
     if len(observed_paydays) < 2:
         return {"is_valid": False, "score": 0.0}
 
+    history = _payday_history(tuple(observed_paydays))
+
     # Phase 1: Get raw consistency - count actual last day matches
     # Note: For last-day patterns, there's no tie scenario since there's only one last day per month
-    raw_matches = 0
-    for observed_date in observed_paydays:
-        year, month = observed_date.year, observed_date.month
-        last_day_of_month = get_last_day_of_month(year, month)
-        if observed_date.day == last_day_of_month:
-            raw_matches += 1
+    outliers = history.days != history.month_length()
+    raw_matches = int((~outliers).sum())
 
     # Phase 2: For outliers, check if they're adjusted versions of last day
-    adjusted_matches = raw_matches  # Start with raw matches
-    # Track adjustment direction counts
-    adjustment_count_A = 0  # After adjustments (forward)
-    adjustment_count_B = 0  # Before adjustments (backward)
-    outliers = []
-
-    for observed_date in observed_paydays:
-        year, month = observed_date.year, observed_date.month
-        last_day_of_month = get_last_day_of_month(year, month)
-        if observed_date.day != last_day_of_month:
-            outliers.append(observed_date)
-
-    for outlier_date in outliers:
-        year, month = outlier_date.year, outlier_date.month
-        last_day_of_month = get_last_day_of_month(year, month)
-        intended_date = datetime(year, month, last_day_of_month).date()
-
-        # Only check adjustments if intended date falls on non-business day
-        if not is_business_day(intended_date):
-            prev_business_day = get_previous_business_day(intended_date)
-            next_business_day = get_next_business_day(intended_date)
-
-            if outlier_date == prev_business_day:
-                adjusted_matches += 1
-                adjustment_count_B += 1
-            elif outlier_date == next_business_day:
-                adjusted_matches += 1
-                adjustment_count_A += 1
-
-        # Handle cross-month adjustments for last-day patterns
-        # Check if outlier could be from previous month's last-day adjustment
-        if month > 1:
-            prev_month_year, prev_month = year, month - 1
-        else:
-            prev_month_year, prev_month = year - 1, 12
-
-        prev_month_last_day = get_last_day_of_month(prev_month_year, prev_month)
-        prev_month_intended = datetime(prev_month_year, prev_month, prev_month_last_day).date()
-
-        if not is_business_day(prev_month_intended):
-            prev_month_adjusted = get_next_business_day(prev_month_intended)
-            # Check if the adjustment crossed into the current month
-            if prev_month_adjusted.month != prev_month and outlier_date == prev_month_adjusted:
-                adjusted_matches += 1
-                adjustment_count_A += 1
-
-        # Check if outlier could be from next month's last-day adjustment moved backward
-        if month < 12:
-            next_month_year, next_month = year, month + 1
-        else:
-            next_month_year, next_month = year + 1, 1
-
-        next_month_last_day = get_last_day_of_month(next_month_year, next_month)
-        next_month_intended = datetime(next_month_year, next_month, next_month_last_day).date()
-
-        if not is_business_day(next_month_intended):
-            next_month_adjusted = get_previous_business_day(next_month_intended)
-            # Check if the adjustment crossed into the current month
-            if next_month_adjusted.month != next_month and outlier_date == next_month_adjusted:
-                adjusted_matches += 1
-                adjustment_count_B += 1
+    # Previous month's last day moved forward or next month's last day moved backward into the current month
+    same_month_codes, prev_month_codes, next_month_codes = _month_end_codes(history, shifts=(0, -1, 1))
+    adjustment_count_A = int(((same_month_codes == MOVED_AFTER) & outliers).sum()) + int(
+        ((prev_month_codes == MOVED_AFTER) & outliers).sum()
+    )
+    adjustment_count_B = int(((same_month_codes == MOVED_BEFORE) & outliers).sum()) + int(
+        ((next_month_codes == MOVED_BEFORE) & outliers).sum()
+    )
+    adjusted_matches = raw_matches + adjustment_count_A + adjustment_count_B
 
     # Calculate final consistency
     final_consistency = adjusted_matches / len(observed_paydays)
@@ -379,71 +316,36 @@ def analyze_weekday_pattern_k_week(observed_paydays: List[datetime]) -> Dict[str
     max_count = pattern_counts.most_common(1)[0][1]
     tied_patterns = [pattern for pattern, count in pattern_counts.items() if count == max_count]
 
-    # Test each tied pattern and find the one with best adjustment performance
-    best_score = 0.0
-    best_result = None
-
-    for candidate_pattern in tied_patterns:
-        candidate_weekday, candidate_week = candidate_pattern
-        raw_count = pattern_counts[candidate_pattern]
-
-        # Phase 2: For outliers, check if they're adjusted versions of candidate pattern
-        adjusted_matches = raw_count  # Start with raw matches
-        # Track adjustment direction counts
-        adjustment_count_A = 0  # After adjustments (forward)
-        adjustment_count_B = 0  # Before adjustments (backward)
-        outliers = []
-
-        for observed_date in observed_paydays:
-            observed_pattern = get_weekday_of_k_week(observed_date)
-            if observed_pattern != candidate_pattern and observed_pattern[1] <= 4:
-                outliers.append(observed_date)
-
-        for outlier_date in outliers:
-            year, month = outlier_date.year, outlier_date.month
-            weekday_num = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(
-                candidate_weekday
-            )
-
-            # Find the k-th occurrence of this weekday in the month
-            occurrence_count = 0
-            intended_date = None
-
-            for day in range(1, get_last_day_of_month(year, month) + 1):
-                test_date = datetime(year, month, day).date()
-                if test_date.weekday() == weekday_num:
-                    occurrence_count += 1
-                    if occurrence_count == candidate_week:
-                        intended_date = test_date
-                        break
-
-            if intended_date:
-                # Only check adjustments if intended date falls on non-business day
-                if not is_business_day(intended_date):
-                    prev_business_day = get_previous_business_day(intended_date)
-                    next_business_day = get_next_business_day(intended_date)
-
-                    if outlier_date == prev_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                    elif outlier_date == next_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-
-        # Calculate consistency for this candidate
-        final_consistency = adjusted_matches / len([p for p in k_week_patterns if p[1] <= 4])
-
-        if final_consistency > best_score:
-            best_score = final_consistency
-            best_result = {
-                "weekday": candidate_weekday,
-                "week": candidate_week,
-                "raw_count": raw_count,
-                "adjusted_matches": adjusted_matches,
-                "consistency": final_consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    # Phase 2: For outliers, check if they're adjusted versions of each tied pattern, all tied patterns at once
+    history = _payday_history(tuple(observed_paydays))
+    candidate_weekdays = np.array([WEEKDAY_NAMES.index(weekday) for weekday, _ in tied_patterns])
+    candidate_weeks = np.array([week for _, week in tied_patterns])
+    raw_counts = np.array([pattern_counts[pattern] for pattern in tied_patterns])
+    weeks = (history.days - 1) // 7 + 1
+    outliers = (weeks[:, None] <= 4) & (
+        (history.weekdays[:, None] != candidate_weekdays) | (weeks[:, None] != candidate_weeks)
+    )
+
+    # The k-th occurrence of the candidate weekday in each outlier's month, it always exists for weeks 1-4
+    month_start = history.month_start()[:, None]
+    first_occurrence = (candidate_weekdays - _weekday_of(month_start)) % 7
+    codes = _match_codes(history.dates[:, None], month_start + first_occurrence + 7 * (candidate_weeks - 1))
+    adjustment_counts_A = ((codes == MOVED_AFTER) & outliers).sum(axis=0)
+    adjustment_counts_B = ((codes == MOVED_BEFORE) & outliers).sum(axis=0)
+    adjusted_counts = raw_counts + adjustment_counts_A + adjustment_counts_B
+
+    # The first tied pattern with the best consistency wins
+    best = int(np.argmax(adjusted_counts))
+    best_score = int(adjusted_counts[best]) / len(k_week_patterns)
+    best_result = {
+        "weekday": tied_patterns[best][0],
+        "week": tied_patterns[best][1],
+        "raw_count": int(raw_counts[best]),
+        "adjusted_matches": int(adjusted_counts[best]),
+        "consistency": best_score,
+        "adjustment_count_A": int(adjustment_counts_A[best]),
+        "adjustment_count_B": int(adjustment_counts_B[best]),
+    }
 
     if best_result and best_score >= 0.6:  # At least 60% consistency
         # Determine adjustment direction
@@ -491,65 +393,31 @@ def analyze_weekday_pattern_last_week(observed_paydays: List[datetime]) -> Dict[
     max_count = pattern_counts.most_common(1)[0][1]
     tied_patterns = [pattern for pattern, count in pattern_counts.items() if count == max_count]
 
-    # Test each tied pattern and find the one with best adjustment performance
-    best_score = 0.0
-    best_result = None
-
-    for candidate_weekday in tied_patterns:
-        raw_count = pattern_counts[candidate_weekday]
-
-        # Phase 2: For outliers, check if they're adjusted versions of candidate pattern
-        adjusted_matches = raw_count  # Start with raw matches
-        # Track adjustment direction counts
-        adjustment_count_A = 0  # After adjustments (forward)
-        adjustment_count_B = 0  # Before adjustments (backward)
-        outliers = []
-
-        for observed_date in observed_paydays:
-            if get_weekday_of_last_week(observed_date) != candidate_weekday:
-                outliers.append(observed_date)
-
-        for outlier_date in outliers:
-            year, month = outlier_date.year, outlier_date.month
-            ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(candidate_weekday)
-
-            # Construct intended payday for this month based on inferred pattern
-            # Find last occurrence of this weekday in month
-            last_day = get_last_day_of_month(year, month)
-            intended_date = None
-
-            for day in range(last_day, 0, -1):
-                test_date = datetime(year, month, day).date()
-                if get_weekday_of_last_week(test_date) == candidate_weekday:
-                    intended_date = test_date
-                    break
-
-            if intended_date:
-                # Only check adjustments if intended date falls on non-business day
-                if not is_business_day(intended_date):
-                    prev_business_day = get_previous_business_day(intended_date)
-                    next_business_day = get_next_business_day(intended_date)
-
-                    if outlier_date == prev_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                    elif outlier_date == next_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-
-        # Calculate consistency for this candidate
-        final_consistency = adjusted_matches / len(observed_paydays)
-
-        if final_consistency > best_score:
-            best_score = final_consistency
-            best_result = {
-                "weekday": candidate_weekday,
-                "raw_count": raw_count,
-                "adjusted_matches": adjusted_matches,
-                "consistency": final_consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    # Phase 2: For outliers, check if they're adjusted versions of each tied pattern, all tied patterns at once
+    history = _payday_history(tuple(observed_paydays))
+    candidate_weekdays = np.array([WEEKDAY_NAMES.index(weekday) for weekday in tied_patterns])
+    raw_counts = np.array([pattern_counts[pattern] for pattern in tied_patterns])
+    in_last_week = history.month_length() - history.days < 7
+    outliers = ~in_last_week[:, None] | (history.weekdays[:, None] != candidate_weekdays)
+
+    # The last occurrence of the candidate weekday in each outlier's month
+    month_end = (history.month_start() + (history.month_length() - 1))[:, None]
+    codes = _match_codes(history.dates[:, None], month_end - (_weekday_of(month_end) - candidate_weekdays) % 7)
+    adjustment_counts_A = ((codes == MOVED_AFTER) & outliers).sum(axis=0)
+    adjustment_counts_B = ((codes == MOVED_BEFORE) & outliers).sum(axis=0)
+    adjusted_counts = raw_counts + adjustment_counts_A + adjustment_counts_B
+
+    # The first tied pattern with the best consistency wins
+    best = int(np.argmax(adjusted_counts))
+    best_score = int(adjusted_counts[best]) / len(observed_paydays)
+    best_result = {
+        "weekday": tied_patterns[best],
+        "raw_count": int(raw_counts[best]),
+        "adjusted_matches": int(adjusted_counts[best]),
+        "consistency": best_score,
+        "adjustment_count_A": int(adjustment_counts_A[best]),
+        "adjustment_count_B": int(adjustment_counts_B[best]),
+    }
 
     if best_result and best_score >= 0.6:  # At least 60% consistency
         # Determine adjustment direction
@@ -692,43 +560,26 @@ def analyze_near_specific_days_tendency(observed_paydays: List[datetime], tolera
         return {"is_valid": False, "score": 0.0}
 
     # For each possible target day (1-31), count how many paydays fall within tolerance
-    day_scores = {}
-
-    for target_day in range(1, 32):
-        matches = 0
+    history = _payday_history(tuple(observed_paydays))
+    target_days = np.arange(1, 32)
+    # Skip target days that don't exist in the payday's month
+    within_tolerance = (target_days <= history.month_length()[:, None]) & (
+        np.abs(history.days[:, None] - target_days) <= tolerance
+    )
+    matches = within_tolerance.sum(axis=0)
+
+    # Find the best target day, the first one with the most matches
+    if matches.any():
+        best_target_day = int(target_days[np.argmax(matches)])
+        best_score = int(matches.max()) / len(observed_paydays)
         match_details = []
-
         for date in observed_paydays:
-            year, month = date.year, date.month
-            last_day_of_month = get_last_day_of_month(year, month)
-
-            # Skip if target day doesn't exist in this month
-            if target_day > last_day_of_month:
-                continue
-
-            # Calculate distance from target day
-            distance = abs(date.day - target_day)
-
-            if distance <= tolerance:
-                matches += 1
+            distance = abs(date.day - best_target_day)
+            if best_target_day <= get_last_day_of_month(date.year, date.month) and distance <= tolerance:
                 match_details.append(
-                    {"date": date, "target_day": target_day, "actual_day": date.day, "distance": distance}
+                    {"date": date, "target_day": best_target_day, "actual_day": date.day, "distance": distance}
                 )
-
-        if matches > 0:
-            consistency = matches / len(observed_paydays)
-            day_scores[target_day] = {
-                "target_day": target_day,
-                "matches": matches,
-                "consistency": consistency,
-                "match_details": match_details,
-            }
-
-    # Find the best target day
-    if day_scores:
-        best_target_day = max(day_scores.keys(), key=lambda d: day_scores[d]["consistency"])
-        best_score = day_scores[best_target_day]["consistency"]
-        best_details = day_scores[best_target_day]
+        best_details = {"matches": int(matches.max()), "match_details": match_details}
 
         # Calculate average distance from target day
         distances = [detail["distance"] for detail in best_details["match_details"]]
@@ -752,6 +603,21 @@ def analyze_near_specific_days_tendency(observed_paydays: List[datetime], tolera
     return {"is_valid": False, "score": 0.0}
 
 
+def _nearby_non_business_days(history, max_day, skip_from_day=None):
+    """Days of month 1 or 2 days from each payday that fall on a non-business day of the payday's month
+
+    Days run from 1 to max_day, paydays on or after skip_from_day are skipped. Days are listed in payday order.
+    """
+    offsets = np.array([-2, -1, 1, 2])
+    potential_days = history.days[:, None] + offsets
+    # Keep within valid day range, and the day has to exist in this month (e.g., no Feb 30)
+    candidates = (potential_days >= 1) & (potential_days <= np.minimum(max_day, history.month_length())[:, None])
+    if skip_from_day is not None:
+        candidates &= (history.days < skip_from_day)[:, None]
+    candidates &= ~BUSINESS_CALENDAR.is_business_day(history.dates[:, None] + offsets)
+    return potential_days[candidates].tolist()
+
+
 def _generate_candidate_day_pairs(observed_paydays: List[datetime]) -> List[tuple]:
     """Generate candidate day pairs from observed paydays
 
@@ -762,41 +628,20 @@ def _generate_candidate_day_pairs(observed_paydays: List[datetime]) -> List[tupl
     """
     days_seen = set(date.day for date in observed_paydays)
 
-    # If 3 or fewer observations, add potential intended paydays based on nearby non-business days
+    # If 3 or fewer observations, add potential intended paydays based on nearby non-business days,
+    # the observed date might be an adjustment and the non-business day the intended payday
     if len(observed_paydays) <= 3:
-        additional_candidates = set()
-
-        for observed_date in observed_paydays:
-            # Check if days around the observed date are non-business days
-            # If so, the observed date might be an adjustment, and the non-business day is the intended payday
-            for offset in [-2, -1, 1, 2]:
-                try:
-                    potential_intended_day = observed_date.day + offset
-                    # Keep within valid day range (1-31)
-                    if potential_intended_day < 1 or potential_intended_day > 31:
-                        continue
-
-                    # Try to construct the date in the same month
-                    potential_date = datetime(observed_date.year, observed_date.month, potential_intended_day).date()
-
-                    # If this potential date is NOT a business day, add it as a candidate
-                    if not is_business_day(potential_date):
-                        additional_candidates.add(potential_intended_day)
-                except ValueError:
-                    # Day doesn't exist in this month (e.g., Feb 30)
-                    continue
+        history = _payday_history(tuple(observed_paydays))
+        additional_candidates = set(_nearby_non_business_days(history, max_day=31))
 
         # Add additional candidates to days_seen
         days_seen = days_seen.union(additional_candidates)
 
-    candidates = []
-
-    for day1 in sorted(days_seen):
-        for day2 in sorted(days_seen):
-            if day2 > day1 and day2 - day1 >= 7:
-                candidates.append((day1, day2))
-
-    return candidates
+    # All pairs of distinct days in ascending order, kept when they are at least 7 days apart
+    days = np.array(sorted(days_seen))
+    first, second = np.triu_indices(len(days), k=1)
+    apart = days[second] - days[first] >= 7
+    return list(zip(days[first[apart]].tolist(), days[second[apart]].tolist()))
 
 
 def analyze_semi_monthly_two_days_pattern(observed_paydays: List[datetime]) -> Dict[str, Any]:
@@ -815,55 +660,28 @@ def analyze_semi_monthly_two_days_pattern(observed_paydays: List[datetime]) -> D
     if not candidate_pairs:
         return {"is_valid": False, "score": 0.0}
 
+    # Match codes of every payday against every day of month, each pair takes the first day that matches
+    history = _payday_history(tuple(observed_paydays))
+    day_codes = _day_of_month_codes(history, np.arange(1, 32))[0][0]
+    day1s = np.array([day1 for day1, _ in candidate_pairs])
+    day2s = np.array([day2 for _, day2 in candidate_pairs])
+    codes = np.where(day_codes[:, day1s - 1] != NO_MATCH, day_codes[:, day1s - 1], day_codes[:, day2s - 1])
+    adjusted_counts = (codes != NO_MATCH).sum(axis=0)
+
+    # The first pair with the best consistency wins
     best_score = 0.0
     best_result = None
-
-    for day1, day2 in candidate_pairs:
-        adjusted_matches = 0
-        adjustment_count_A = 0
-        adjustment_count_B = 0
-
-        for observed_date in observed_paydays:
-            year, month = observed_date.year, observed_date.month
-
-            # Check if date matches either day (with adjustments)
-            for target_day in [day1, day2]:
-                try:
-                    intended_date = datetime(year, month, target_day).date()
-                except ValueError:
-                    continue
-
-                # Check raw match
-                if observed_date == intended_date:
-                    adjusted_matches += 1
-                    break
-
-                # Check business day adjustments
-                if not is_business_day(intended_date):
-                    prev_business_day = get_previous_business_day(intended_date)
-                    next_business_day = get_next_business_day(intended_date)
-
-                    if observed_date == prev_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                        break
-                    elif observed_date == next_business_day:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-                        break
-
-        consistency = adjusted_matches / len(observed_paydays)
-
-        if consistency > best_score:
-            best_score = consistency
-            best_result = {
-                "day1": day1,
-                "day2": day2,
-                "adjusted_matches": adjusted_matches,
-                "consistency": consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    best = int(np.argmax(adjusted_counts))
+    if adjusted_counts[best] > 0:
+        best_score = int(adjusted_counts[best]) / len(observed_paydays)
+        best_result = {
+            "day1": candidate_pairs[best][0],
+            "day2": candidate_pairs[best][1],
+            "adjusted_matches": int(adjusted_counts[best]),
+            "consistency": best_score,
+            "adjustment_count_A": int((codes[:, best] == MOVED_AFTER).sum()),
+            "adjustment_count_B": int((codes[:, best] == MOVED_BEFORE).sum()),
+        }
 
     if best_result and best_score >= 0.6:
         adjustment_direction = "None"
@@ -912,30 +730,9 @@ def analyze_semi_monthly_day_and_last_pattern(observed_paydays: List[datetime])
 
     # If 3 or fewer observations, add potential intended paydays based on nearby non-business days
     if len(observed_paydays) <= 3:
-        additional_candidates = set()
-
-        for observed_date in observed_paydays:
-            # Skip dates near end of month (they might be the "last day" slot)
-            if observed_date.day >= 28:
-                continue
-
-            # Check if days around the observed date are non-business days
-            for offset in [-2, -1, 1, 2]:
-                try:
-                    potential_intended_day = observed_date.day + offset
-                    # Keep within valid day range for specific day (1-23)
-                    if potential_intended_day < 1 or potential_intended_day > 23:
-                        continue
-
-                    # Try to construct the date in the same month
-                    potential_date = datetime(observed_date.year, observed_date.month, potential_intended_day).date()
-
-                    # If this potential date is NOT a business day, add it as a candidate
-                    if not is_business_day(potential_date):
-                        additional_candidates.add(potential_intended_day)
-                except ValueError:
-                    # Day doesn't exist in this month
-                    continue
+        # Skip dates near end of month (they might be the "last day" slot), specific days run from 1 to 23
+        history = _payday_history(tuple(observed_paydays))
+        additional_candidates = set(_nearby_non_business_days(history, max_day=23, skip_from_day=28))
 
         # Add additional candidates to days_seen
         days_seen = days_seen.union(additional_candidates)
@@ -946,70 +743,25 @@ def analyze_semi_monthly_day_and_last_pattern(observed_paydays: List[datetime])
     if not candidate_days:
         return {"is_valid": False, "score": 0.0}
 
+    # Paydays that don't match the specific day (with adjustments) are checked against the last day
+    history = _payday_history(tuple(observed_paydays))
+    specific_codes = _day_of_month_codes(history, candidate_days)[0][0]
+    codes = np.where(specific_codes != NO_MATCH, specific_codes, _month_end_codes(history)[0][:, None])
+    adjusted_counts = (codes != NO_MATCH).sum(axis=0)
+
+    # The first specific day with the best consistency wins
     best_score = 0.0
     best_result = None
-
-    for specific_day in candidate_days:
-        adjusted_matches = 0
-        adjustment_count_A = 0
-        adjustment_count_B = 0
-
-        for observed_date in observed_paydays:
-            year, month = observed_date.year, observed_date.month
-            last_day_of_month = get_last_day_of_month(year, month)
-
-            # Check if date matches specific day (with adjustments)
-            try:
-                intended_specific = datetime(year, month, specific_day).date()
-
-                if observed_date == intended_specific:
-                    adjusted_matches += 1
-                    continue
-
-                if not is_business_day(intended_specific):
-                    prev_bd = get_previous_business_day(intended_specific)
-                    next_bd = get_next_business_day(intended_specific)
-
-                    if observed_date == prev_bd:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-                        continue
-                    elif observed_date == next_bd:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-                        continue
-            except ValueError:
-                pass
-
-            # Check if date matches last day (with adjustments)
-            intended_last = datetime(year, month, last_day_of_month).date()
-
-            if observed_date == intended_last:
-                adjusted_matches += 1
-                continue
-
-            if not is_business_day(intended_last):
-                prev_bd = get_previous_business_day(intended_last)
-                next_bd = get_next_business_day(intended_last)
-
-                if observed_date == prev_bd:
-                    adjusted_matches += 1
-                    adjustment_count_B += 1
-                elif observed_date == next_bd:
-                    adjusted_matches += 1
-                    adjustment_count_A += 1
-
-        consistency = adjusted_matches / len(observed_paydays)
-
-        if consistency > best_score:
-            best_score = consistency
-            best_result = {
-                "specific_day": specific_day,
-                "adjusted_matches": adjusted_matches,
-                "consistency": consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    best = int(np.argmax(adjusted_counts))
+    if adjusted_counts[best] > 0:
+        best_score = int(adjusted_counts[best]) / len(observed_paydays)
+        best_result = {
+            "specific_day": candidate_days[best],
+            "adjusted_matches": int(adjusted_counts[best]),
+            "consistency": best_score,
+            "adjustment_count_A": int((codes[:, best] == MOVED_AFTER).sum()),
+            "adjustment_count_B": int((codes[:, best] == MOVED_BEFORE).sum()),
+        }
 
     if best_result and best_score >= 0.6:
         adjustment_direction = "None"
@@ -1107,73 +859,32 @@ def analyze_biweekly_weekday_pattern(observed_paydays: List[datetime]) -> Dict[s
     max_count = weekday_counts.most_common(1)[0][1]
     tied_weekdays = [weekday for weekday, count in weekday_counts.items() if count == max_count]
 
-    weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
-    best_score = 0.0
-    best_result = None
-
-    for candidate_weekday in tied_weekdays:
-        raw_matches = weekday_counts[candidate_weekday]
-        adjusted_matches = raw_matches
-        adjustment_count_A = 0
-        adjustment_count_B = 0
-
-        # Check outliers - dates that don't fall on the candidate weekday
-        for observed_date in observed_paydays:
-            if observed_date.weekday() != candidate_weekday:
-                # This might be an adjustment from the intended weekday
-                # Calculate what the intended date would be
-                days_diff = (candidate_weekday - observed_date.weekday()) % 7
-
-                # Try moving backward to find intended date
-                if days_diff > 0:
-                    # Intended date is in the past
-                    intended_date = observed_date - timedelta(days=(7 - days_diff))
-                else:
-                    # We're already past the intended weekday, look at previous week
-                    intended_date = observed_date - timedelta(days=7)
-
-                # Check if intended date is a non-business day
-                if not is_business_day(intended_date):
-                    next_bd = get_next_business_day(intended_date)
-                    prev_bd = get_previous_business_day(intended_date)
-
-                    if observed_date == next_bd:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-                    elif observed_date == prev_bd:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-
-                # Also try moving forward to find intended date
-                if days_diff == 0:
-                    days_diff = 7
-                intended_date_forward = observed_date + timedelta(days=days_diff)
-
-                if not is_business_day(intended_date_forward):
-                    next_bd = get_next_business_day(intended_date_forward)
-                    prev_bd = get_previous_business_day(intended_date_forward)
-
-                    if observed_date == next_bd:
-                        adjusted_matches += 1
-                        adjustment_count_A += 1
-                    elif observed_date == prev_bd:
-                        adjusted_matches += 1
-                        adjustment_count_B += 1
-
-        consistency = adjusted_matches / len(observed_paydays)
-
-        if consistency > best_score:
-            best_score = consistency
-            best_result = {
-                "weekday": weekday_names[candidate_weekday],
-                "weekday_num": candidate_weekday,
-                "raw_matches": raw_matches,
-                "adjusted_matches": adjusted_matches,
-                "consistency": consistency,
-                "adjustment_count_A": adjustment_count_A,
-                "adjustment_count_B": adjustment_count_B,
-            }
+    # Check outliers - dates that don't fall on the candidate weekday, all tied weekdays at once
+    history = _payday_history(tuple(observed_paydays))
+    candidate_weekdays = np.array(tied_weekdays)
+    raw_counts = np.array([weekday_counts[weekday] for weekday in tied_weekdays])
+    outliers = history.weekdays[:, None] != candidate_weekdays
+
+    # The intended date is the candidate weekday in the week before or after the outlier
+    days_diff = (candidate_weekdays - history.weekdays[:, None]) % 7
+    paydays = history.dates[:, None]
+    codes = np.stack([_match_codes(paydays, paydays - (7 - days_diff)), _match_codes(paydays, paydays + days_diff)])
+    adjustment_counts_A = ((codes == MOVED_AFTER) & outliers).sum(axis=(0, 1))
+    adjustment_counts_B = ((codes == MOVED_BEFORE) & outliers).sum(axis=(0, 1))
+    adjusted_counts = raw_counts + adjustment_counts_A + adjustment_counts_B
+
+    # The first tied weekday with the best consistency wins
+    best = int(np.argmax(adjusted_counts))
+    best_score = int(adjusted_counts[best]) / len(observed_paydays)
+    best_result = {
+        "weekday": WEEKDAY_NAMES[tied_weekdays[best]],
+        "weekday_num": tied_weekdays[best],
+        "raw_matches": int(raw_counts[best]),
+        "adjusted_matches": int(adjusted_counts[best]),
+        "consistency": best_score,
+        "adjustment_count_A": int(adjustment_counts_A[best]),
+        "adjustment_count_B": int(adjustment_counts_B[best]),
+    }
 
     if best_result and best_score >= 0.6:
         adjustment_direction = "None"
@@ -1213,7 +924,8 @@ def determine_biweekly_or_semimonthly(observed_paydays: List[datetime]) -> Dict[
     2. Semi-monthly patterns (two specific days or day + last day)
 
     Returns the pattern with highest consistency score. If there's a tie and only 2-3 observations,
-    favors biweekly.
+    favors biweekly. Results are memoized per payday history, as the same history comes up again across
+    source types and repeated requests.
 
     Args:
         observed_paydays: List of observed payday dates
@@ -1221,6 +933,11 @@ def determine_biweekly_or_semimonthly(observed_paydays: List[datetime]) -> Dict[
     Returns:
         Dictionary with the best pattern type and details
     """
+    return copy.deepcopy(_determine_biweekly_or_semimonthly(tuple(observed_paydays)))
+
+
+@lru_cache(maxsize=1000)
+def _determine_biweekly_or_semimonthly(observed_paydays: tuple) -> Dict[str, Any]:
     if len(observed_paydays) < 2:
         return {
             "predicted_pattern": None,
@@ -1287,12 +1004,19 @@ def determine_biweekly_or_semimonthly(observed_paydays: List[datetime]) -> Dict[
 def predict_monthly_regular_payday_enhanced(observed_paydays: List[datetime]) -> Dict[str, Any]:
     """Enhanced prediction with fallback patterns for end-of-month and near-specific-days
 
+    Results are memoized per payday history, as the same history comes up again across requests.
+
     Args:
         observed_paydays: List of observed payday dates
 
     Returns:
         Dictionary with prediction results, including fallback patterns
     """
+    return copy.deepcopy(_predict_monthly_regular_payday_enhanced(tuple(observed_paydays)))
+
+
+@lru_cache(maxsize=1000)
+def _predict_monthly_regular_payday_enhanced(observed_paydays: tuple) -> Dict[str, Any]:
     # First try the regular prediction
     primary_result = predict_monthly_regular_payday(observed_paydays)
 
@@ -3,6 +3,13 @@ import pandas as pd
 
 from utils.decorators import timer
 
+# Frequency: (interval from which a payment may be missing, regular interval, accepted deviation) in days
+MISSING_PAYMENT_INTERVALS = {
+    "W": (9, 7, 1),
+    "B": (18, 14, 2),
+    "M": (35, 30, 5),
+}
+
 
 @timer
 def find_missing_payment(
@@ -10,55 +17,72 @@ def find_missing_payment(
 ) -> list[pd.Timestamp]:
     """Missing payment detection."""
 
-    historical_payday = pd.Series(historical_payday)
-    missing_days = []
-    if freq == "I" or freq == "S" or len(historical_payday) <= 1:
-        return []
-    intervals = (historical_payday.diff() / np.timedelta64(1, "D")).iloc[1:]
-    if freq == "W":
-        for i, interval in enumerate(intervals):
-            current_date = historical_payday.iloc[i]
-            if interval >= 9:  # Possible missing payment
-                n_missing, interval_deviation = int(interval // 7), interval % 7
-                if interval_deviation >= 6 or interval_deviation <= 1:
-                    if interval_deviation <= 1:
-                        n_missing -= 1
-                    for j in range(n_missing):
-                        new_date = current_date + pd.DateOffset(days=7)
-                        missing_days.append(new_date)
-                        current_date = new_date
-    if freq == "B":
-        for i, interval in enumerate(intervals):
-            current_date = historical_payday.iloc[i]
-            if interval >= 18:  # Possible missing payment
-                n_missing, interval_deviation = (
-                    int(interval // 14),
-                    interval % 14,
-                )
-                if interval_deviation >= 12 or interval_deviation <= 2:
-                    if interval_deviation <= 2:
-                        n_missing -= 1
-                    for j in range(n_missing):
-                        new_date = current_date + pd.DateOffset(days=14)
-                        missing_days.append(new_date)
-                        current_date = new_date
-    if freq == "M":
-        for i, interval in enumerate(intervals):
-            current_date = historical_payday.iloc[i]
-            if interval >= 35:  # Possible missing payment
-                n_missing, interval_deviation = (
-                    int(interval // 30),
-                    interval % 30,
-                )
-                if interval_deviation >= 25 or interval_deviation <= 5:
-                    if interval_deviation <= 5:
-                        n_missing -= 1
-                    for j in range(n_missing):
-                        new_date = current_date + pd.DateOffset(months=1)
-                        missing_days.append(new_date)
-                        current_date = new_date
-
-    if len(missing_days) == 0:
-        return []
-    else:
+    return find_missing_payments([historical_payday], [freq])[0]
+
+
+@timer
+def find_missing_payments(historical_paydays: list[list], freqs: list[str]) -> list[list[pd.Timestamp]]:
+    """Missing payment detection of many sources at once.
+
+    An interval close to a multiple of the regular one has a payment missing every regular interval after its first
+    payday, weekly and biweekly ones stepping 7 and 14 days and monthly ones one calendar month at a time like
+    pd.DateOffset(months=1) (the day is clipped to the month length and stays clipped).
+
+    Args:
+        historical_paydays: Paydays of each source, sorted.
+        freqs: Frequency of each source.
+
+    Returns:
+        list: The missing paydays of each source, empty when none are found.
+    """
+
+    missing_days = [[] for _ in freqs]
+    sources = [
+        k
+        for k, (paydays, freq) in enumerate(zip(historical_paydays, freqs))
+        if freq in MISSING_PAYMENT_INTERVALS and len(paydays) > 1
+    ]
+    if not sources:
         return missing_days
+
+    lengths = np.array([len(historical_paydays[k]) for k in sources])
+    paydays = pd.Series([payday for k in sources for payday in historical_paydays[k]])
+    paydays = paydays.to_numpy(dtype="datetime64[ns]")
+    source_of = np.repeat(np.arange(len(sources)), lengths)[:-1]
+    source_intervals = np.array([MISSING_PAYMENT_INTERVALS[freqs[k]] for k in sources])
+    minimum, regular, deviation_limit = source_intervals[source_of].T
+
+    # The interval after each payday up to the next one, the last payday of a source has none within it
+    intervals = np.diff(paydays) / np.timedelta64(1, "D")
+    within_source = np.ones(len(intervals), dtype=bool)
+    within_source[np.cumsum(lengths)[:-1] - 1] = False
+
+    with np.errstate(invalid="ignore"):
+        n_missing, interval_deviation = intervals // regular, intervals % regular
+        possible = within_source & (intervals >= minimum)  # Possible missing payment
+        close = interval_deviation <= deviation_limit
+        possible &= (interval_deviation >= regular - deviation_limit) | close
+    n_missing = np.where(possible, n_missing - close, 0).astype(np.int64)
+
+    # One row per missing payment, numbered from 1 after the payday starting its interval
+    gaps = np.repeat(np.arange(len(intervals)), n_missing)
+    steps = np.arange(len(gaps)) - np.repeat(np.cumsum(n_missing) - n_missing, n_missing) + 1
+    starts = paydays[gaps]
+    new_dates = starts + steps * regular[gaps].astype(np.int64) * np.timedelta64(1, "D")
+
+    monthly = regular[gaps] == 30
+    if monthly.any():
+        start_days, start_months = starts[monthly].astype("datetime64[D]"), starts[monthly].astype("datetime64[M]")
+        months = start_months + steps[monthly]
+        days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+        # Each month is offset from the previous missing payday, so a clipped day stays clipped
+        days_in_month = pd.Series(days_in_month).groupby(gaps[monthly]).cummin().to_numpy()
+        day = np.minimum((start_days - start_months.astype("datetime64[D]")).astype(np.int64) + 1, days_in_month)
+        time_of_day = starts[monthly] - start_days
+        new_dates[monthly] = months.astype("datetime64[D]") + (day - 1) * np.timedelta64(1, "D") + time_of_day
+
+    new_dates = pd.DatetimeIndex(new_dates).tolist()
+    counts = np.bincount(source_of[gaps], minlength=len(sources))
+    for k, end, count in zip(sources, np.cumsum(counts), counts):
+        missing_days[k] = new_dates[end - count : end]
+    return missing_days
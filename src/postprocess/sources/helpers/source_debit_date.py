@@ -1,13 +1,14 @@
 import datetime
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
 from config import config
 from config.preload import load_holidays
-from postprocess.sources.helpers.enhanced_payday_prediction import (
-    get_next_business_day,
-    get_previous_business_day,
-    is_business_day,
+from postprocess.sources.helpers.business_calendar import (
+    BUSINESS_CALENDAR,
+    BusinessDayCalendar,
+    get_business_calendar,
 )
 
 
@@ -21,327 +22,240 @@ def debit_date_analysis(income_sources: pd.DataFrame, as_of_date: str):
     holidays = config.HOLIDAYS
     if holidays is None:
         holidays = load_holidays(config.HOLIDAYS_PATH)
-    holidays.loc[:, "HolidayDate"] = pd.to_datetime(holidays.loc[:, "HolidayDate"], format="%m/%d/%y").dt.date
-    holidays = holidays[
-        (pd.to_datetime(holidays.HolidayDate) <= pd.to_datetime(as_of_date))
-        & (pd.to_datetime(holidays.HolidayDate) >= pd.to_datetime(as_of_date) - pd.Timedelta(days=365))
+    # Only the holidays of the year before as_of_date, the shared holiday frame is left untouched
+    holiday_dates = pd.Series(get_business_calendar(holidays).holiday_sequence)
+    holidays = BusinessDayCalendar(
+        holiday_dates[
+            (holiday_dates <= pd.to_datetime(as_of_date))
+            & (holiday_dates >= pd.to_datetime(as_of_date) - pd.Timedelta(days=365))
+        ]
+    )
+    frequencies = income_sources["frequency"].tolist()
+    regular_paydays = income_sources["regularPayDay"].tolist()
+    # Run estimate next payday only if the source has a frequency, for all of them in one call
+    sources = [
+        i
+        for i, (income_type, frequency) in enumerate(zip(income_sources["incomeType"], frequencies))
+        if income_type in ["Payroll", "Benefit"] and frequency in ["B", "W", "M", "S"]
     ]
-    next_paydays = []
-    payment_near_holiday_list = []
-    next_payday_on_holiday_list = []
-    for i in range(len(income_sources)):
-        frequency = income_sources.iloc[i, :].loc["frequency"]
-        last_payday = income_sources.iloc[i, :].loc["lastPayDay"]
-        regular_payday = income_sources.iloc[i, :].loc["regularPayDay"]
-        historical_paydays = income_sources.iloc[i, :].loc["historicalPayDay"]
-        num_pays = income_sources.iloc[i, :].loc["numOfPay"]
-        same_day_freq = income_sources.iloc[i, :].loc["sameDayFreq"]
-        income_type = income_sources.iloc[i, :].loc["incomeType"]
-        if income_type not in ["Payroll", "Benefit"] or frequency not in ["B", "W", "M", "S"]:
-            next_paydays.append("Not Applicable")
-            payment_near_holiday_list.append("None")
-            next_payday_on_holiday_list.append("Not Applicable")
+    last_paydays = income_sources["lastPayDay"].tolist()
+    predicted_paydays, on_holiday_flags = predict_next_paydays(
+        [last_paydays[i] for i in sources], [frequencies[i] for i in sources], [regular_paydays[i] for i in sources]
+    )
+
+    historical_paydays = income_sources["historicalPayDay"].tolist()
+    num_pays = income_sources["numOfPay"].tolist()
+    same_day_freqs = income_sources["sameDayFreq"].tolist()
+    next_paydays = ["Not Applicable"] * len(income_sources)
+    payment_near_holiday_list = ["None"] * len(income_sources)
+    next_payday_on_holiday_list = ["Not Applicable"] * len(income_sources)
+    for i, next_pay_date, next_payday_on_holiday_flag in zip(sources, predicted_paydays, on_holiday_flags):
+        if isinstance(next_pay_date, str):
+            next_payday_on_holiday_list[i] = "None"
             continue
-        # Run estimate next payday only if the source has a frequency
-        next_pay_date, next_payday_on_holiday_flag = predict_next_payday(last_payday, frequency, regular_payday)
-        if next_pay_date == "Not Applicable":
-            next_paydays.append("Not Applicable")
-            payment_near_holiday_list.append("None")
-            next_payday_on_holiday_list.append("None")
-            continue
-        next_payday_on_holiday = str(next_payday_on_holiday_flag == 1)
+        next_paydays[i] = next_pay_date
+        next_payday_on_holiday_list[i] = str(next_payday_on_holiday_flag == 1)
 
         # Estimate if payment would show up on holiday
-        if frequency in ["W", "B"] and regular_payday not in [
-            "Friday",
-            "Wednesday",
-            "Thursday",
-            "Tuesday",
-            "Monday",
-            "Saturday",
-            "Sunday",
-        ]:
-            next_paydays.append(next_pay_date)
-            payment_near_holiday_list.append("None")
-            next_payday_on_holiday_list.append(next_payday_on_holiday)
+        frequency, regular_payday = frequencies[i], regular_paydays[i]
+        if frequency in ["W", "B"] and regular_payday not in WEEK_DAY_ENCODING:
             continue
-
-        if frequency == "S" and (same_day_freq < 0.5 or num_pays < 4):
-            next_paydays.append(next_pay_date)
-            payment_near_holiday_list.append("None")
-            next_payday_on_holiday_list.append(next_payday_on_holiday)
+        if frequency == "S" and (same_day_freqs[i] < 0.5 or num_pays[i] < 4):
             continue
-        if frequency == "M" and (same_day_freq < 0.5 or num_pays < 3):
-            next_paydays.append(next_pay_date)
-            payment_near_holiday_list.append("None")
-            next_payday_on_holiday_list.append(next_payday_on_holiday)
+        if frequency == "M" and (same_day_freqs[i] < 0.5 or num_pays[i] < 3):
             continue
-        payment_near_holiday = check_weekly_income_on_holiday(
-            pd.to_datetime(historical_paydays), regular_payday, holidays, frequency
+        payment_near_holiday_list[i] = check_weekly_income_on_holiday(
+            pd.to_datetime(historical_paydays[i]), regular_payday, holidays, frequency
         )
-        next_paydays.append(next_pay_date)
-        payment_near_holiday_list.append(payment_near_holiday)
-        next_payday_on_holiday_list.append(next_payday_on_holiday)
     income_sources.loc[:, "nextPayDay"] = next_paydays
     income_sources.loc[:, "paymentNearHoliday"] = payment_near_holiday_list
     income_sources.loc[:, "nextPayDayOnHoliday"] = next_payday_on_holiday_list
     return income_sources
 
 
-def filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate):
-    """
-    Filter candidates to only keep those at least 3 days after last payday,
-    then return the one closest to the estimate.
+WEEK_DAY_ENCODING = {
+    "Monday": 0,
+    "Tuesday": 1,
+    "Wednesday": 2,
+    "Thursday": 3,
+    "Friday": 4,
+    "Saturday": 5,
+    "Sunday": 6,
+}
 
-    Returns tuple of (selected_candidate, or None if no valid candidates)
-    """
-    min_date = last_payday + datetime.timedelta(days=3)
-    candidates = [c for c in candidates if c > min_date]
-    if not candidates:
-        return None
-    distances = [np.abs((candidate - next_payday_estimate).days) for candidate in candidates]
-    return candidates[np.argmin(distances)]
+# Candidate day standing for the last day of the month
+MONTH_END = 0
 
+ONE_DAY = np.timedelta64(1, "D")
 
-# Next payday prediction
-def predict_next_payday(last_payday, freq, regular_payday, paymentNearHoliday="None"):
-    """
-    Returns tuple of (next_payday, nextPayDayOnHoliday)
+# Stand-in date for sources without a next payday, keeps the calendar lookups on valid dates
+NO_PAYDAY = np.datetime64("2000-01-03", "D")
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a Thursday
+    return (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+
+
+@lru_cache(maxsize=1000)
+def _next_payday_rule(freq, regular_payday):
+    """Parses a frequency and regular payday into how their next payday is computed, None when it can't be.
+
+    The rule is one of:
+        ("weekday", days, weekday): the regular weekday (or None) closest to days after the last payday
+        ("week_month", weekday, week): the weekday in a week (-1 for the last one) of the next month
+        ("month_day", days, candidates): the (month shift, day) candidate closest to days after the last payday
     """
-    regular_payday = str(regular_payday)
-    week_day_encoding = {
-        "Monday": 0,
-        "Tuesday": 1,
-        "Wednesday": 2,
-        "Thursday": 3,
-        "Friday": 4,
-        "Saturday": 5,
-        "Sunday": 6,
-    }
-    if last_payday == "None" or last_payday == "Not Applicable":
-        return "Not Applicable", 0
-    last_payday = pd.Timestamp(last_payday)
-    if regular_payday == "None" or regular_payday is None:
-        return "Not Applicable", 0
-    if freq == "I":
-        return "Not Applicable", 0
-
-    # Calculate base next payday
-    next_pay_date = None
-
-    if freq == "W":
-        # Find the occurrence of regular payday weekday closest to 7 days from last payday
-        if regular_payday in week_day_encoding:
-            expected_weekday = week_day_encoding[regular_payday]
-            target_date = last_payday + datetime.timedelta(days=7)
-            target_weekday = target_date.weekday()
-
-            # Calculate days to adjust from target to get to the expected weekday
-            days_diff = (expected_weekday - target_weekday) % 7
-            if days_diff > 3:
-                # Closer to go backward (e.g., if diff is 6, going back 1 day is closer)
-                days_diff -= 7
-
-            next_pay_date = target_date + datetime.timedelta(days=days_diff)
-        else:
-            # Regular payday is not a valid weekday, just add 7 days
-            next_pay_date = last_payday + datetime.timedelta(days=7)
-    elif freq == "B":
-        # Find the occurrence of regular payday weekday closest to 14 days from last payday
-        if regular_payday in week_day_encoding:
-            expected_weekday = week_day_encoding[regular_payday]
-            target_date = last_payday + datetime.timedelta(days=14)
-            target_weekday = target_date.weekday()
-
-            # Calculate days to adjust from target to get to the expected weekday
-            days_diff = (expected_weekday - target_weekday) % 7
-            if days_diff > 3:
-                # Closer to go backward (e.g., if diff is 6, going back 1 day is closer)
-                days_diff -= 7
-
-            next_pay_date = target_date + datetime.timedelta(days=days_diff)
-        else:
-            # Regular payday is not a valid weekday, just add 14 days
-            next_pay_date = last_payday + datetime.timedelta(days=14)
-    elif freq == "M":
-        last_payment_month = last_payday.month
-        last_payment_year = last_payday.year
-        next_month = (last_payment_month) % 12 + 1
-        next_year = last_payment_year if last_payment_month + 1 <= 12 else last_payment_year + 1
-        next_2_month = (next_month) % 12 + 1
-        next_2_year = next_year if next_month + 1 <= 12 else next_year + 1
+
+    if regular_payday == "None" or freq == "I":
+        return None
+    if freq in ["W", "B"]:
+        return ("weekday", 7 if freq == "W" else 14, WEEK_DAY_ENCODING.get(regular_payday))
+    if freq == "M":
         if "in Week" in regular_payday:
-            day_week = week_day_encoding[regular_payday.split()[0]]
+            day_week = WEEK_DAY_ENCODING[regular_payday.split()[0]]
             week_part = regular_payday.split()[-1]
-            if week_part == "last":
-                # For "last" week, we need to find the last occurrence of that weekday in the month
-                week_month = -1  # Special marker for last week
-            else:
-                week_month = int(week_part)
-            next_pay_date = get_date_from_week_month(next_month, next_year, day_week, week_month)
-        elif "lastday" in regular_payday:
-            next_payday_estimate = last_payday + datetime.timedelta(days=30)
-
-            candidate1 = pd.Timestamp(next_year, next_month, 1) + pd.offsets.MonthEnd()
-            candidate2 = pd.Timestamp(last_payment_year, last_payment_month, 1) + pd.offsets.MonthEnd()
-            candidate3 = pd.Timestamp(next_2_year, next_2_month, 1) + pd.offsets.MonthEnd()
-            candidates = [candidate1, candidate2, candidate3]
-            next_pay_date = filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate)
-            if next_pay_date is None:
-                return "Not Applicable", 0
-        elif "near end of month" in regular_payday.lower():
-            next_payday_estimate = last_payday + datetime.timedelta(days=30)
-
-            # Use the actual end of month
-            candidate1 = pd.Timestamp(next_year, next_month, 1) + pd.offsets.MonthEnd()
-            candidate2 = pd.Timestamp(last_payment_year, last_payment_month, 1) + pd.offsets.MonthEnd()
-            candidate3 = pd.Timestamp(next_2_year, next_2_month, 1) + pd.offsets.MonthEnd()
-            candidates = [candidate1, candidate2, candidate3]
-            next_pay_date = filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate)
-            if next_pay_date is None:
-                return "Not Applicable", 0
+            # For "last" week, we need to find the last occurrence of that weekday in the month
+            week_month = -1 if week_part == "last" else int(week_part)
+            return ("week_month", day_week, week_month)
+        if "lastday" in regular_payday or "near end of month" in regular_payday.lower():
+            target_day = MONTH_END
         elif "near day" in regular_payday.lower():
-            next_payday_estimate = last_payday + datetime.timedelta(days=30)
-
             # Extract target day from "near day {target_day}"
             target_day = int(regular_payday.split()[-1])
-            candidate1 = pd.Timestamp(
-                next_year, next_month, min(target_day, pd.Timestamp(next_year, next_month, 1).days_in_month)
-            )
-            candidate2 = pd.Timestamp(
-                last_payment_year,
-                last_payment_month,
-                min(target_day, pd.Timestamp(last_payment_year, last_payment_month, 1).days_in_month),
-            )
-            candidate3 = pd.Timestamp(
-                next_2_year, next_2_month, min(target_day, pd.Timestamp(next_2_year, next_2_month, 1).days_in_month)
-            )
-            candidates = [candidate1, candidate2, candidate3]
-            next_pay_date = filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate)
-            if next_pay_date is None:
-                return "Not Applicable", 0
         elif regular_payday.isnumeric():
-            next_payday_estimate = last_payday + datetime.timedelta(days=30)
-            candidate1 = pd.Timestamp(
-                next_year, next_month, min(int(regular_payday), pd.Timestamp(next_year, next_month, 1).days_in_month)
-            )
-            candidate2 = pd.Timestamp(
-                last_payment_year,
-                last_payment_month,
-                min(int(regular_payday), pd.Timestamp(last_payment_year, last_payment_month, 1).days_in_month),
-            )
-            candidate3 = pd.Timestamp(
-                next_2_year,
-                next_2_month,
-                min(int(regular_payday), pd.Timestamp(next_2_year, next_2_month, 1).days_in_month),
-            )
-            candidates = [candidate1, candidate2, candidate3]
-            next_pay_date = filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate)
-            if next_pay_date is None:
-                return "Not Applicable", 0
+            target_day = int(regular_payday)
         else:
-            return "Not Applicable", 0
-
-    elif freq == "S":
+            return None
+        return ("month_day", 30, ((1, target_day), (0, target_day), (2, target_day)))
+    if freq == "S":
         if "," not in regular_payday:
-            return "Not Applicable", 0
-        last_payment_month = last_payday.month
-        last_payment_year = last_payday.year
-        next_month = (last_payment_month) % 12 + 1
-        next_year = last_payment_year if last_payment_month + 1 <= 12 else last_payment_year + 1
+            return None
         regular_payday_1, regular_payday_2 = regular_payday.split(",")[0], regular_payday.split(",")[1]
-        next_payday_estimate = last_payday + datetime.timedelta(days=15)
-        if "lastday" in regular_payday_1:
-            candidate1 = pd.Timestamp(next_year, next_month, 1) + pd.offsets.MonthEnd()
-            candidate2 = pd.Timestamp(last_payment_year, last_payment_month, 1) + pd.offsets.MonthEnd()
-        else:
-            candidate1 = pd.Timestamp(
-                next_year, next_month, min(int(regular_payday_1), pd.Timestamp(next_year, next_month, 1).days_in_month)
-            )
-            candidate2 = pd.Timestamp(
-                last_payment_year,
-                last_payment_month,
-                min(int(regular_payday_1), pd.Timestamp(last_payment_year, last_payment_month, 1).days_in_month),
-            )
+        day_1 = MONTH_END if "lastday" in regular_payday_1 else int(regular_payday_1)
+        day_2 = MONTH_END if "lastday" in regular_payday_2 else int(regular_payday_2)
+        return ("month_day", 15, ((1, day_1), (0, day_1), (1, day_2), (0, day_2)))
+    return None
+
+
+def _predict_weekday(last_paydays: np.ndarray, days: int, weekday) -> np.ndarray:
+    # Find the occurrence of regular payday weekday closest to days from last payday
+    target_dates = last_paydays + np.timedelta64(days, "D")
+    if weekday is None:
+        # Regular payday is not a valid weekday, just add the days
+        return target_dates
+    days_diff = (weekday - _weekday(target_dates)) % 7
+    # Closer to go backward (e.g., if diff is 6, going back 1 day is closer)
+    days_diff[days_diff > 3] -= 7
+    return target_dates + days_diff * ONE_DAY
+
+
+def _predict_week_month(last_paydays: np.ndarray, weekday: int, week_month: int) -> np.ndarray:
+    next_month = last_paydays.astype("datetime64[M]") + 1
+    first_day = next_month.astype("datetime64[D]")
+    if week_month == -1:
+        # The last occurrence of the weekday in the month, counting back from its last day
+        last_day = (next_month + 1).astype("datetime64[D]") - 1
+        return last_day - (_weekday(last_day) - weekday) % 7
+    # A week past the end of the month keeps its day number, but in the next month
+    day = first_day + (weekday - _weekday(first_day)) % 7 + (week_month - 1) * 7
+    return first_day + (day - day.astype("datetime64[M]").astype("datetime64[D]"))
+
+
+def _predict_month_day(last_paydays: np.ndarray, days: int, candidate_days) -> np.ndarray:
+    month = last_paydays.astype("datetime64[M]")
+    candidates = []
+    for month_shift, day in candidate_days:
+        first_day = (month + month_shift).astype("datetime64[D]")
+        days_in_month = (month + month_shift + 1).astype("datetime64[D]") - first_day
+        day = days_in_month if day == MONTH_END else np.minimum(day * ONE_DAY, days_in_month)
+        candidates.append(first_day + day - 1)
+    candidates = np.stack(candidates).astype("datetime64[ns]")
+
+    # Only keep candidates at least 3 days after last payday, then select the one closest to the estimate
+    valid = candidates > last_paydays + np.timedelta64(3, "D")
+    distances = np.abs((candidates - (last_paydays + np.timedelta64(days, "D"))) // ONE_DAY)
+    best = np.where(valid, distances, np.iinfo(np.int64).max).argmin(axis=0)
+    next_paydays = candidates[best, np.arange(len(last_paydays))]
+    next_paydays[~valid.any(axis=0)] = np.datetime64("NaT")
+    return next_paydays
 
-        if "lastday" in regular_payday_2:
-            candidate3 = pd.Timestamp(next_year, next_month, 1) + pd.offsets.MonthEnd()
-            candidate4 = pd.Timestamp(last_payment_year, last_payment_month, 1) + pd.offsets.MonthEnd()
-        else:
-            candidate3 = pd.Timestamp(
-                next_year, next_month, min(int(regular_payday_2), pd.Timestamp(next_year, next_month, 1).days_in_month)
-            )
-            candidate4 = pd.Timestamp(
-                last_payment_year,
-                last_payment_month,
-                min(int(regular_payday_2), pd.Timestamp(last_payment_year, last_payment_month, 1).days_in_month),
-            )
-        candidates = [candidate1, candidate2, candidate3, candidate4]
-        next_pay_date = filter_and_select_closest_candidate(candidates, last_payday, next_payday_estimate)
-        if next_pay_date is None:
-            return "Not Applicable", 0
-    else:
-        return "Not Applicable", 0
 
-    if next_pay_date is None:
-        return "Not Applicable", 0
-
-    # Check if original next payday is on holiday/weekend
-    next_pay_date_obj = next_pay_date.date() if hasattr(next_pay_date, "date") else next_pay_date
-    nextPayDayOnHoliday = 0 if is_business_day(next_pay_date_obj) else 1
-
-    # Apply holiday adjustments based on paymentNearHoliday
-    if not is_business_day(next_pay_date_obj):
-        if paymentNearHoliday == "A":  # After (forward adjustment)
-            adjusted_date = get_next_business_day(next_pay_date_obj)
-            return pd.Timestamp(adjusted_date), nextPayDayOnHoliday
-        elif paymentNearHoliday == "B":  # Before (backward adjustment)
-            adjusted_date = get_previous_business_day(next_pay_date_obj)
-            return pd.Timestamp(adjusted_date), nextPayDayOnHoliday
+# Next payday prediction
+def predict_next_paydays(last_paydays, freqs, regular_paydays, payment_near_holidays=None):
+    """
+    Returns the (next_payday, nextPayDayOnHoliday) lists of many income sources at once,
+    sources sharing a frequency and regular payday are predicted together
+    """
+    if payment_near_holidays is None:
+        payment_near_holidays = ["None"] * len(freqs)
+
+    next_pay_dates = np.full(len(freqs), np.datetime64("NaT"), dtype="datetime64[ns]")
+    last_pay_dates = next_pay_dates.copy()
+    sources_by_rule = {}
+    for i, (last_payday, freq, regular_payday) in enumerate(zip(last_paydays, freqs, regular_paydays)):
+        if last_payday == "None" or last_payday == "Not Applicable":
+            continue
+        last_pay_dates[i] = pd.Timestamp(last_payday).to_datetime64()
+        rule = _next_payday_rule(freq, str(regular_payday))
+        if rule is not None:
+            sources_by_rule.setdefault(rule, []).append(i)
+
+    for (kind, *parameters), sources in sources_by_rule.items():
+        last_payday = last_pay_dates[sources]
+        if kind == "month_day":
+            next_pay_dates[sources] = _predict_month_day(last_payday, *parameters)
+            continue
+        if np.isnat(last_payday).any():
+            raise ValueError("Cannot predict a weekly or monthly weekday payday without a last payday")
+        if kind == "weekday":
+            next_pay_dates[sources] = _predict_weekday(last_payday, *parameters)
         else:
-            # Default to previous business day (same as "B" case)
-            adjusted_date = get_previous_business_day(next_pay_date_obj)
-            return pd.Timestamp(adjusted_date), nextPayDayOnHoliday
-
-    return next_pay_date, nextPayDayOnHoliday
-
+            next_pay_dates[sources] = _predict_week_month(last_payday, *parameters)
 
-def get_date_from_week_month(month, year, weekday, nweekday):
-    first_day = pd.Timestamp(year, month, 1)
-    first_day_weekday = first_day.weekday()
+    # Check if original next payday is on holiday/weekend
+    predicted = ~np.isnat(next_pay_dates)
+    next_pay_days = next_pay_dates.astype("datetime64[D]")
+    on_holiday = predicted & ~BUSINESS_CALENDAR.is_business_day(np.where(predicted, next_pay_days, NO_PAYDAY))
+
+    # Apply holiday adjustments based on paymentNearHoliday, forward after and backward otherwise
+    if on_holiday.any():
+        after = np.array([payment_near_holiday == "A" for payment_near_holiday in payment_near_holidays], dtype=bool)
+        adjusted_days = np.where(
+            after,
+            BUSINESS_CALENDAR.next_business_day(np.where(on_holiday, next_pay_days, NO_PAYDAY)),
+            BUSINESS_CALENDAR.previous_business_day(np.where(on_holiday, next_pay_days, NO_PAYDAY)),
+        )
+        next_pay_dates = np.where(on_holiday, adjusted_days.astype("datetime64[ns]"), next_pay_dates)
 
-    if nweekday == -1:  # Handle "last" week
-        # Find the last occurrence of the weekday in the month
-        last_day = pd.Timestamp(year, month, 1) + pd.offsets.MonthEnd()
-        last_day_weekday = last_day.weekday()
+    next_paydays = [
+        pd.Timestamp(next_pay_date) if is_predicted else "Not Applicable"
+        for next_pay_date, is_predicted in zip(next_pay_dates, predicted)
+    ]
+    return next_paydays, on_holiday.astype(int).tolist()
 
-        # Calculate days back from end of month to get to the target weekday
-        if weekday <= last_day_weekday:
-            days_back = last_day_weekday - weekday
-        else:
-            days_back = 7 - (weekday - last_day_weekday)
 
-        return last_day - pd.Timedelta(days=days_back)
-    else:
-        # Original logic for numbered weeks
-        if weekday < first_day_weekday:
-            day = (first_day + pd.Timedelta(days=7 - first_day_weekday + weekday + (nweekday - 1) * 7)).day
-        else:
-            day = (first_day + pd.Timedelta(days=weekday - first_day_weekday + (nweekday - 1) * 7)).day
-        return pd.Timestamp(year, month, day)
+def predict_next_payday(last_payday, freq, regular_payday, paymentNearHoliday="None"):
+    """
+    Returns tuple of (next_payday, nextPayDayOnHoliday)
+    """
+    next_paydays, on_holiday = predict_next_paydays([last_payday], [freq], [regular_payday], [paymentNearHoliday])
+    return next_paydays[0], on_holiday[0]
 
 
 # Check whether income would show up on holiday
 def check_weekly_income_on_holiday(dates, regular_payday, holidays, frequency):
+    # holidays is a holiday frame or a BusinessDayCalendar, either way it is parsed once and not per date
+    calendar = get_business_calendar(holidays)
     income_shifted_near_holiday_index = []
     income_shifted_days = []
     for i, date in enumerate(dates):
-        if date.date() in list(pd.to_datetime(holidays.HolidayDate).dt.date):
+        if date.date() in calendar.holidays:
             # return "payment shows up on holiday"
             return None
         if not date_on_regular_payday(regular_payday, date.date(), frequency):
             near_holiday, dates_to_holiday, _ = check_income_would_show_up_on_holiday(
-                date.date(), frequency, regular_payday, holidays.HolidayDate
+                date.date(), frequency, regular_payday, calendar
             )
             if near_holiday:
                 income_shifted_near_holiday_index.append(i)
@@ -364,13 +278,15 @@ def check_weekly_income_on_holiday(dates, regular_payday, holidays, frequency):
 
 
 def check_income_would_show_up_on_holiday(date, frequency, regular_payday, holidays):
-    # 1. Loop through the list of holidays if there is a holiday within 3 business days of the current date
+    # 1. Find the holidays within 3 business days of the current date, in holiday order
     # 2. Check if the holiday is a regular payday of the income
-    for holiday in list(pd.to_datetime(holidays).dt.date):
-        if abs(np.busday_count(date, holiday)) <= 3:
-            hit_holiday = date_on_regular_payday(regular_payday, holiday, frequency)
-            if hit_holiday:
-                return True, np.busday_count(date, holiday), holiday
+    calendar = holidays if isinstance(holidays, BusinessDayCalendar) else BusinessDayCalendar(pd.to_datetime(holidays))
+    positions, counts = calendar.holidays_within(date, 3)
+    for position, count in zip(positions, counts):
+        holiday = calendar.holiday_sequence[position].astype(datetime.date)
+        hit_holiday = date_on_regular_payday(regular_payday, holiday, frequency)
+        if hit_holiday:
+            return True, count, holiday
     return False, None, None
 
 
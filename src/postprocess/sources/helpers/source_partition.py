@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from config import config
+from postprocess.sources.helpers.calculate_frequency_amount import FrequencyAmount, calculate_frequency_amount_batch
+from utils.description_signals import DescriptionSignals
+
+# Transfer/deposit subcategory rules in the order they are applied, later rules override earlier ones.
+# Each rule is (subcategory, description signal family or None for any description, transCategory values it applies
+# to or None for any category). The signal family of a subcategory searches TRANSFER_SUBCATEGORY_PATTERNS.
+TRANSFER_SUBCATEGORY_RULES = [
+    ("Other Transfer", None, [3]),
+    ("Other Deposit", None, [4]),
+    ("Balance Transfer", "Balance Transfer", None),
+    # Transfer
+    ("Cash App", "Cash App", [3]),
+    ("Venmo", "Venmo", [3]),
+    ("Paypal", "Paypal", [3]),
+    ("Apple Pay", "Apple Pay", [3]),
+    ("Zelle", "Zelle", [3]),
+    # Deposit
+    ("Cash Deposit", "Cash Deposit", [4]),
+    ("Mobile Deposit", "Mobile Deposit", [4]),
+    ("Check Deposit", "Check Deposit", [4]),
+]
+
+# Cluster of every gig credit of an account, gig sources are not split any further
+GIG_CLUSTER = "gig"
+
+
+def transfer_subcategories(credits: pd.DataFrame, signals: DescriptionSignals | None = None) -> pd.Series:
+    """Assigns the transfer/deposit subcategory of every credit, matching each pattern once per unique description."""
+
+    descriptions = credits[config.IA_ORIGINAL_DESCRIPTION]
+    if signals is None:
+        signals = DescriptionSignals(descriptions)
+    trans_category = credits[config.TRANS_CATEGORY].to_numpy()
+
+    subcategory = np.full(len(credits), np.nan, dtype=object)
+    for name, family, categories in TRANSFER_SUBCATEGORY_RULES:
+        mask = np.ones(len(credits), dtype=bool)
+        if family is not None:
+            mask = signals.flags(descriptions, family)
+        if categories is not None:
+            mask &= np.isin(trans_category, categories)
+        subcategory[mask] = name
+
+    return pd.Series(subcategory, index=credits.index, name="subcategory")
+
+
+def iter_account_clusters(customer_df: pd.DataFrame, key: str = config.CLUSTER_LABEL):
+    """Yields (account_id, cluster, target) per account and cluster without re-filtering the frame for each one.
+
+    Accounts come in order of first appearance and clusters in set order, target is sorted by date.
+    """
+
+    account_positions = customer_df.groupby(config.PS_ACCOUNT_ID, sort=False).indices
+    for account_id, positions in account_positions.items():
+        account_df = customer_df.iloc[positions]
+        cluster_positions = account_df.groupby(key, sort=False).indices
+        for i in list(set(account_df[key])):
+            target = account_df.iloc[cluster_positions[i]].sort_values(config.PS_TXN_DATE)
+            yield account_id, i, target
+
+
+def same_day_summary(target: pd.DataFrame) -> tuple[pd.DataFrame, int, float, pd.Timestamp, list]:
+    """Groups same day transactions of a source and returns the statistics shared by all the source types."""
+
+    same_day_amount = (
+        target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]].groupby(config.PS_TXN_DATE).sum().reset_index()
+    )
+    num_of_payday = len(same_day_amount)
+    per_paycheck = same_day_amount[config.PS_TXN_AMOUNT].mean()
+    last_payday = pd.to_datetime(target[config.PS_TXN_DATE]).max()
+    historicalPayDay = list(same_day_amount[config.PS_TXN_DATE])
+    return same_day_amount, num_of_payday, per_paycheck, last_payday, historicalPayDay
+
+
+def assign_source_ids(
+    source_trans: pd.DataFrame, source_ids: dict, keys: list[str], restrict: pd.Series | None = None
+) -> None:
+    """Writes the sourceID recorded for each key tuple onto the matching rows of source_trans in one pass."""
+
+    if not source_ids:
+        return
+    assigned = pd.DataFrame(list(source_ids.keys()), columns=keys)
+    assigned["assignedSourceID"] = list(source_ids.values())
+    matched = source_trans[keys].merge(assigned, how="left", on=keys)["assignedSourceID"].to_numpy()
+    hit = pd.notna(matched)
+    if restrict is not None:
+        hit &= restrict.to_numpy(dtype=bool)
+    source_trans.loc[hit, "sourceID"] = matched[hit]
+
+
+class SourcePartition:
+    """Credit transactions of a request filtered and partitioned once, shared by all the source categorizers."""
+
+    def __init__(self, result: pd.DataFrame, signals: DescriptionSignals | None = None):
+        self.credits = result[result.type == "CREDIT"].copy()
+        self.credits["subcategory"] = transfer_subcategories(self.credits, signals)
+        self._category_positions = self.credits.groupby(config.TRANS_CATEGORY, sort=False).indices
+        self._loan_debits = result[(result[config.TRANS_CATEGORY] == 6) & (result.type == "DEBIT")]
+        self._frequencies = None
+
+    def category(self, *trans_categories: int) -> pd.DataFrame:
+        """Returns the credits of the given transCategory values in their original order."""
+
+        positions = [self._category_positions[c] for c in trans_categories if c in self._category_positions]
+        if not positions:
+            return self.credits.iloc[0:0]
+        return self.credits.iloc[np.sort(np.concatenate(positions))]
+
+    def frequencies(self) -> dict[tuple, FrequencyAmount]:
+        """Returns the frequency and amounts of every income and loan cluster, computed in one call on first use.
+
+        Keyed by (transCategory, account, cluster). The cluster is the cluster label of payroll, benefit and loan
+        debits, the subcategory of transfers and deposits and GIG_CLUSTER for gig. Other transfers and deposits are
+        all clustered together, so they get none. Small amounts are ignored for payroll and benefit only.
+        """
+
+        if self._frequencies is None:
+            payroll_benefit = self.category(1, 2)
+            transfers = self.category(3, 4)
+            transfers = transfers[~transfers.subcategory.isin(["Other Transfer", "Other Deposit"])]
+            loans = self._loan_debits
+            columns = [config.PS_ACCOUNT_ID, config.PS_TXN_DATE, config.PS_TXN_AMOUNT, config.TRANS_CATEGORY]
+            clusters = pd.concat(
+                [
+                    payroll_benefit[columns].assign(frequencyCluster=payroll_benefit[config.CLUSTER_LABEL]),
+                    transfers[columns].assign(frequencyCluster=transfers["subcategory"]),
+                    self.category(5)[columns].assign(frequencyCluster=GIG_CLUSTER),
+                    loans[columns].assign(frequencyCluster=loans[config.CLUSTER_LABEL]),
+                ],
+                ignore_index=True,
+            )
+            self._frequencies = calculate_frequency_amount_batch(
+                clusters,
+                [config.TRANS_CATEGORY, config.PS_ACCOUNT_ID, "frequencyCluster"],
+                config.HOLIDAYS,
+                ignore_small_amounts=clusters[config.TRANS_CATEGORY].isin([1, 2]).to_numpy(),
+            )
+        return self._frequencies
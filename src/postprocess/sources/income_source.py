@@ -5,10 +5,16 @@ from config import config
 from postprocess.sources.helpers.calculate_frequency_amount import (
     active_income_check,
     amount_stability_check,
-    calculate_frequency_amount,
     recurring_income_check,
 )
-from postprocess.sources.helpers.find_missing_payment import find_missing_payment
+from postprocess.sources.helpers.find_missing_payment import find_missing_payments
+from postprocess.sources.helpers.source_partition import (
+    SourcePartition,
+    assign_source_ids,
+    iter_account_clusters,
+    same_day_summary,
+)
+from postprocess.summary_info.account_windows import WINDOWS, AccountWindows
 from utils.decorators import timer
 
 
@@ -18,19 +24,16 @@ class IncomeSource:
     @staticmethod
     @timer
     def categorize_income_source(
-        result: pd.DataFrame, as_of_date: pd.Timestamp, sourceID=0
+        result: pd.DataFrame, as_of_date: pd.Timestamp, sourceID=0, partition: SourcePartition | None = None
     ) -> tuple[dict, pd.DataFrame, int]:
         """Returns the income source categories given the transactions."""
 
-        # Load holidays for payday prediction
-        holidays = config.HOLIDAYS
-
         income_source_dict = {}
+        source_ids = {}
 
-        # Create a copy of the result DataFrame to avoid SettingWithCopyWarning
-        result = result.copy()
-
-        result = result[result.type == "CREDIT"]
+        if partition is None:
+            partition = SourcePartition(result)
+        result = partition.credits
 
         # We define this explicitly because its part of the final output the income_source_trans
         income_source_trans = result[
@@ -73,7 +76,7 @@ class IncomeSource:
             income_source_trans["date"], errors="coerce"
         ).dt.day_name()
         income_source_trans.loc[:, "sourceID"] = "None"
-        customer_df = result[result[config.TRANS_CATEGORY] == 1]
+        customer_df = partition.category(1)
         #
         if len(customer_df) == 0:
             for account_id in result[config.PS_ACCOUNT_ID].unique():
@@ -109,56 +112,114 @@ class IncomeSource:
 
         if len(customer_df) > 0:
             # process separately for each account_guid
-            for account_id in customer_df[config.PS_ACCOUNT_ID].unique():
-                account_df = customer_df[customer_df[config.IA_ACCOUNT_ID] == account_id]
-                for i in list(set(account_df.cluster_label)):
-                    cluster = str(account_id) + "_" + str(i)
-                    target = account_df[account_df.cluster_label == i].sort_values(config.PS_TXN_DATE)
-
-                    # Group sameday transactions into one, this is for getting the historical payday
-                    source_name = target[config.PS_TXN_SHORT].unique()[0]
-                    same_day_amount = (
-                        target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]]
-                        .groupby(config.PS_TXN_DATE)
-                        .sum()
-                        .reset_index()
-                    )
-                    num_of_payday = len(same_day_amount)
-                    per_paycheck = same_day_amount[config.PS_TXN_AMOUNT].mean()
-                    last_payday = pd.to_datetime(target[config.PS_TXN_DATE]).max()
-                    income_type = "Payroll"
-                    historicalPayDay = list(
-                        target[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]]
-                        .groupby(config.PS_TXN_DATE)
-                        .sum()
-                        .reset_index()
-                        .date
-                    )
-
-                    (
-                        freq,
-                        monthly_income,
-                        monthly_num_pay,
-                        regular_payday,
-                        same_day_freq,
-                        next_pay_day,
-                        payment_near_holiday,
-                        next_pay_day_on_holiday,
-                    ) = calculate_frequency_amount(target, holidays, ignore_small_amounts=True)
-                    active_score = active_income_check(target, as_of_date, freq, "Payroll")
-                    recurring_score = recurring_income_check(target, freq, regular_payday, same_day_freq)
-                    stability_score, std_mean_ratio = amount_stability_check(target, freq)
-                    if stability_score != 3:
-                        stable_monthly_income = monthly_income * (1 - std_mean_ratio)
-                    else:
-                        stable_monthly_income = monthly_income
-                    recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
-
-                    # Amount check
-                    if per_paycheck < config.PS_LOW_AMOUNT_CHECK:
+            frequencies = partition.frequencies()
+            missing_payday_sources = {}
+            for account_id, i, target in iter_account_clusters(customer_df):
+                cluster = str(account_id) + "_" + str(i)
+
+                # Group sameday transactions into one, this is for getting the historical payday
+                source_name = target[config.PS_TXN_SHORT].unique()[0]
+                _, num_of_payday, per_paycheck, last_payday, historicalPayDay = same_day_summary(target)
+                income_type = "Payroll"
+
+                (
+                    freq,
+                    monthly_income,
+                    monthly_num_pay,
+                    regular_payday,
+                    same_day_freq,
+                    next_pay_day,
+                    payment_near_holiday,
+                    next_pay_day_on_holiday,
+                ) = frequencies[(1, account_id, i)]
+                # The income checks expect parsed dates
+                target[config.PS_TXN_DATE] = pd.to_datetime(target[config.PS_TXN_DATE], errors="coerce")
+                active_score = active_income_check(target, as_of_date, freq, "Payroll")
+                recurring_score = recurring_income_check(target, freq, regular_payday, same_day_freq)
+                stability_score, std_mean_ratio = amount_stability_check(target, freq)
+                if stability_score != 3:
+                    stable_monthly_income = monthly_income * (1 - std_mean_ratio)
+                else:
+                    stable_monthly_income = monthly_income
+                recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
+
+                # Amount check
+                if per_paycheck < config.PS_LOW_AMOUNT_CHECK:
+                    income_source_dict[cluster] = {
+                        "accountGuid": account_id,
+                        "sourceID": "None",
+                        "sourceName": source_name,
+                        "sourceType": "None",
+                        "sourceChannel": "None",
+                        "numOfPay": num_of_payday,
+                        "numOfPayMonthly": int(monthly_num_pay),
+                        "frequency": freq,
+                        "perPayCheck": round(per_paycheck, 2),
+                        "monthlyIncome": round(monthly_income, 2),
+                        "stableMonthlyIncome": round(stable_monthly_income, 2),
+                        "regularPayDay": regular_payday,
+                        "historicalPayDay": historicalPayDay,
+                        "missingPayDay": [],
+                        "sameDayFreq": same_day_freq,
+                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                        "incomeType": income_type,
+                        "depositMethod": "Direct Deposit",
+                        "activeScore": active_score,
+                        "recurringScore": recurring_score,
+                        "stabilityScore": stability_score,
+                        "errorCode": 301,
+                        "errorMessage": "Per_paycheck lower than $" + str(config.PS_LOW_AMOUNT_CHECK),
+                        "nextPayDay": "Not Applicable",
+                        "paymentNearHoliday": "None",
+                        "nextPayDayOnHoliday": "Not Applicable",
+                    }
+                    continue
+
+                # Same day/single trans check
+                if num_of_payday == 1:
+                    sourceID += 1
+                    income_source_dict[cluster] = {
+                        "accountGuid": account_id,
+                        "sourceID": "I" + str(sourceID) + "_err_201",
+                        "sourceName": source_name,
+                        "sourceType": "None",
+                        "sourceChannel": "None",
+                        "numOfPay": 1,
+                        "numOfPayMonthly": 0,
+                        "frequency": "None",
+                        "perPayCheck": round(per_paycheck, 2),
+                        "monthlyIncome": round(monthly_income, 2),
+                        "stableMonthlyIncome": round(stable_monthly_income, 2),
+                        "regularPayDay": "None",
+                        "historicalPayDay": historicalPayDay,
+                        "missingPayDay": [],
+                        "sameDayFreq": 0,
+                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                        "incomeType": income_type,
+                        "depositMethod": "Direct Deposit",
+                        "activeScore": active_score,
+                        "recurringScore": recurring_score,
+                        "stabilityScore": stability_score,
+                        "errorCode": 201,
+                        "errorMessage": "Payroll only occurred once/on the same day",
+                        "nextPayDay": "Not Applicable",
+                        "paymentNearHoliday": "None",
+                        "nextPayDayOnHoliday": "Not Applicable",
+                    }
+                    source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_201"
+                    continue
+
+                # Missing paydays are found for all the sources at once after the loop
+                missing_payday = []
+                missing_payday_sources[cluster] = (historicalPayDay, freq)
+
+                # Skip if the income not seen within a certain peirod of time
+                if freq == "W":
+                    if recency > config.PS_RECENCY_CHECK_W:
+                        sourceID += 1
                         income_source_dict[cluster] = {
                             "accountGuid": account_id,
-                            "sourceID": "None",
+                            "sourceID": "I" + str(sourceID) + "_err_401",
                             "sourceName": source_name,
                             "sourceType": "None",
                             "sourceChannel": "None",
@@ -170,7 +231,7 @@ class IncomeSource:
                             "stableMonthlyIncome": round(stable_monthly_income, 2),
                             "regularPayDay": regular_payday,
                             "historicalPayDay": historicalPayDay,
-                            "missingPayDay": [],
+                            "missingPayDay": missing_payday,
                             "sameDayFreq": same_day_freq,
                             "lastPayDay": last_payday.strftime("%Y-%m-%d"),
                             "incomeType": income_type,
@@ -178,241 +239,158 @@ class IncomeSource:
                             "activeScore": active_score,
                             "recurringScore": recurring_score,
                             "stabilityScore": stability_score,
-                            "errorCode": 301,
-                            "errorMessage": "Per_paycheck lower than $" + str(config.PS_LOW_AMOUNT_CHECK),
+                            "errorCode": 401,
+                            "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_W) + " days",
                             "nextPayDay": "Not Applicable",
                             "paymentNearHoliday": "None",
                             "nextPayDayOnHoliday": "Not Applicable",
                         }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_401"
                         continue
 
-                    # Same day/single trans check
-                    if num_of_payday == 1:
+                elif freq == "B":
+                    if recency > config.PS_RECENCY_CHECK_B:
                         sourceID += 1
                         income_source_dict[cluster] = {
                             "accountGuid": account_id,
-                            "sourceID": "I" + str(sourceID) + "_err_201",
+                            "sourceID": "I" + str(sourceID) + "_err_401",
                             "sourceName": source_name,
                             "sourceType": "None",
                             "sourceChannel": "None",
-                            "numOfPay": 1,
-                            "numOfPayMonthly": 0,
-                            "frequency": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
                             "perPayCheck": round(per_paycheck, 2),
                             "monthlyIncome": round(monthly_income, 2),
                             "stableMonthlyIncome": round(stable_monthly_income, 2),
-                            "regularPayDay": "None",
+                            "regularPayDay": regular_payday,
                             "historicalPayDay": historicalPayDay,
-                            "missingPayDay": [],
-                            "sameDayFreq": 0,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
                             "lastPayDay": last_payday.strftime("%Y-%m-%d"),
                             "incomeType": income_type,
                             "depositMethod": "Direct Deposit",
                             "activeScore": active_score,
                             "recurringScore": recurring_score,
                             "stabilityScore": stability_score,
-                            "errorCode": 201,
-                            "errorMessage": "Payroll only occurred once/on the same day",
+                            "errorCode": 401,
+                            "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_B) + " days",
                             "nextPayDay": "Not Applicable",
                             "paymentNearHoliday": "None",
                             "nextPayDayOnHoliday": "Not Applicable",
                         }
-                        income_source_trans.loc[
-                            (income_source_trans.cluster_label == i) & (income_source_trans.accountGuid == account_id),
-                            "sourceID",
-                        ] = "I" + str(sourceID) + "_err_201"
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_401"
                         continue
 
-                    missing_payday = find_missing_payment(historicalPayDay, freq)
-
-                    # Skip if the income not seen within a certain peirod of time
-                    if freq == "W":
-                        if recency > config.PS_RECENCY_CHECK_W:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_401",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 401,
-                                "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_W) + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_401"
-                            continue
-
-                    elif freq == "B":
-                        if recency > config.PS_RECENCY_CHECK_B:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_401",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 401,
-                                "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_B) + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_401"
-                            continue
-
-                    elif freq == "S":
-                        if recency > config.PS_RECENCY_CHECK_S:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_401",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 401,
-                                "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_S) + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_401"
-                            continue
-
-                    elif freq == "M":
-                        if recency > config.PS_RECENCY_CHECK_M:
-                            sourceID += 1
-                            income_source_dict[cluster] = {
-                                "accountGuid": account_id,
-                                "sourceID": "I" + str(sourceID) + "_err_401",
-                                "sourceName": source_name,
-                                "sourceType": "None",
-                                "sourceChannel": "None",
-                                "numOfPay": num_of_payday,
-                                "numOfPayMonthly": int(monthly_num_pay),
-                                "frequency": freq,
-                                "perPayCheck": round(per_paycheck, 2),
-                                "monthlyIncome": round(monthly_income, 2),
-                                "stableMonthlyIncome": round(stable_monthly_income, 2),
-                                "regularPayDay": regular_payday,
-                                "historicalPayDay": historicalPayDay,
-                                "missingPayDay": missing_payday,
-                                "sameDayFreq": same_day_freq,
-                                "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                                "incomeType": income_type,
-                                "depositMethod": "Direct Deposit",
-                                "activeScore": active_score,
-                                "recurringScore": recurring_score,
-                                "stabilityScore": stability_score,
-                                "errorCode": 401,
-                                "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_M) + " days",
-                                "nextPayDay": "Not Applicable",
-                                "paymentNearHoliday": "None",
-                                "nextPayDayOnHoliday": "Not Applicable",
-                            }
-                            income_source_trans.loc[
-                                (income_source_trans.cluster_label == i)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_401"
-                            continue
+                elif freq == "S":
+                    if recency > config.PS_RECENCY_CHECK_S:
+                        sourceID += 1
+                        income_source_dict[cluster] = {
+                            "accountGuid": account_id,
+                            "sourceID": "I" + str(sourceID) + "_err_401",
+                            "sourceName": source_name,
+                            "sourceType": "None",
+                            "sourceChannel": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
+                            "perPayCheck": round(per_paycheck, 2),
+                            "monthlyIncome": round(monthly_income, 2),
+                            "stableMonthlyIncome": round(stable_monthly_income, 2),
+                            "regularPayDay": regular_payday,
+                            "historicalPayDay": historicalPayDay,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
+                            "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                            "incomeType": income_type,
+                            "depositMethod": "Direct Deposit",
+                            "activeScore": active_score,
+                            "recurringScore": recurring_score,
+                            "stabilityScore": stability_score,
+                            "errorCode": 401,
+                            "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_S) + " days",
+                            "nextPayDay": "Not Applicable",
+                            "paymentNearHoliday": "None",
+                            "nextPayDayOnHoliday": "Not Applicable",
+                        }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_401"
+                        continue
 
-                    sourceID += 1
-                    income_source_dict[cluster] = {
-                        "accountGuid": account_id,
-                        "sourceID": "I" + str(sourceID) + "_err_000",
-                        "sourceName": source_name,
-                        "sourceType": "None",
-                        "sourceChannel": "None",
-                        "numOfPay": num_of_payday,
-                        "numOfPayMonthly": int(monthly_num_pay),
-                        "frequency": freq,
-                        "perPayCheck": round(per_paycheck, 2),
-                        "monthlyIncome": round(monthly_income, 2),
-                        "stableMonthlyIncome": round(stable_monthly_income, 2),
-                        "regularPayDay": regular_payday,
-                        "historicalPayDay": historicalPayDay,
-                        "missingPayDay": missing_payday,
-                        "sameDayFreq": same_day_freq,
-                        "lastPayDay": last_payday.strftime("%Y-%m-%d"),
-                        "incomeType": income_type,
-                        "depositMethod": "Direct Deposit",
-                        "activeScore": active_score,
-                        "recurringScore": recurring_score,
-                        "stabilityScore": stability_score,
-                        "errorCode": 000,
-                        "errorMessage": "NA",
-                        "nextPayDay": next_pay_day,
-                        "paymentNearHoliday": payment_near_holiday,
-                        "nextPayDayOnHoliday": "True" if next_pay_day_on_holiday else "False",
-                    }
+                elif freq == "M":
+                    if recency > config.PS_RECENCY_CHECK_M:
+                        sourceID += 1
+                        income_source_dict[cluster] = {
+                            "accountGuid": account_id,
+                            "sourceID": "I" + str(sourceID) + "_err_401",
+                            "sourceName": source_name,
+                            "sourceType": "None",
+                            "sourceChannel": "None",
+                            "numOfPay": num_of_payday,
+                            "numOfPayMonthly": int(monthly_num_pay),
+                            "frequency": freq,
+                            "perPayCheck": round(per_paycheck, 2),
+                            "monthlyIncome": round(monthly_income, 2),
+                            "stableMonthlyIncome": round(stable_monthly_income, 2),
+                            "regularPayDay": regular_payday,
+                            "historicalPayDay": historicalPayDay,
+                            "missingPayDay": missing_payday,
+                            "sameDayFreq": same_day_freq,
+                            "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                            "incomeType": income_type,
+                            "depositMethod": "Direct Deposit",
+                            "activeScore": active_score,
+                            "recurringScore": recurring_score,
+                            "stabilityScore": stability_score,
+                            "errorCode": 401,
+                            "errorMessage": "Income not seen within " + str(config.PS_RECENCY_CHECK_M) + " days",
+                            "nextPayDay": "Not Applicable",
+                            "paymentNearHoliday": "None",
+                            "nextPayDayOnHoliday": "Not Applicable",
+                        }
+                        source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_401"
+                        continue
 
-                    # Add sourceID to income_trans
-                    income_source_trans.loc[
-                        (income_source_trans.cluster_label == i) & (income_source_trans.accountGuid == account_id),
-                        "sourceID",
-                    ] = "I" + str(sourceID) + "_err_000"
+                sourceID += 1
+                income_source_dict[cluster] = {
+                    "accountGuid": account_id,
+                    "sourceID": "I" + str(sourceID) + "_err_000",
+                    "sourceName": source_name,
+                    "sourceType": "None",
+                    "sourceChannel": "None",
+                    "numOfPay": num_of_payday,
+                    "numOfPayMonthly": int(monthly_num_pay),
+                    "frequency": freq,
+                    "perPayCheck": round(per_paycheck, 2),
+                    "monthlyIncome": round(monthly_income, 2),
+                    "stableMonthlyIncome": round(stable_monthly_income, 2),
+                    "regularPayDay": regular_payday,
+                    "historicalPayDay": historicalPayDay,
+                    "missingPayDay": missing_payday,
+                    "sameDayFreq": same_day_freq,
+                    "lastPayDay": last_payday.strftime("%Y-%m-%d"),
+                    "incomeType": income_type,
+                    "depositMethod": "Direct Deposit",
+                    "activeScore": active_score,
+                    "recurringScore": recurring_score,
+                    "stabilityScore": stability_score,
+                    "errorCode": 000,
+                    "errorMessage": "NA",
+                    "nextPayDay": next_pay_day,
+                    "paymentNearHoliday": payment_near_holiday,
+                    "nextPayDayOnHoliday": "True" if next_pay_day_on_holiday else "False",
+                }
+
+                # Add sourceID to income_trans
+                source_ids[(account_id, i)] = "I" + str(sourceID) + "_err_000"
+
+            missing_paydays = find_missing_payments(
+                [historical_paydays for historical_paydays, _ in missing_payday_sources.values()],
+                [freq for _, freq in missing_payday_sources.values()],
+            )
+            for cluster, missing_payday in zip(missing_payday_sources, missing_paydays):
+                income_source_dict[cluster]["missingPayDay"] = missing_payday
+
+        assign_source_ids(income_source_trans, source_ids, [config.IA_ACCOUNT_ID, config.CLUSTER_LABEL])
 
         return income_source_dict, income_source_trans, sourceID
 
@@ -421,63 +399,25 @@ class IncomeSource:
     def income_by_month(
         income_df_sorted: pd.DataFrame,
         balance_df: pd.DataFrame,
+        windows: AccountWindows | None = None,
     ) -> pd.DataFrame:
         """Income source of all time / 3 months / 6 months."""
 
+        if windows is None:
+            windows = AccountWindows(balance_df)
+
         # Analytics on how many income sources within all/3 months/6 months
-        all_account_ids = balance_df[[config.IA_ACCOUNT_ID]].rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
+        all_account_ids = windows.all_account_ids.rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
         income_df_sorted = income_df_sorted[
             income_df_sorted.errorCode.isin([000, 201, 202, 203, 205, 401, 402, 403, 405])
         ]
-        end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
-        income_df_sorted = income_df_sorted.merge(end_date, how="left", on="accountGuid")
-        income_df_sorted["interval"] = (
-            pd.to_datetime(income_df_sorted["end_date"]) - pd.to_datetime(income_df_sorted["lastPayDay"])
-        ).dt.days
-        income_df_sorted["in_three_month"] = income_df_sorted.interval <= 90
-        income_df_sorted["in_six_month"] = income_df_sorted.interval <= 180
-
-        income_all = income_df_sorted.groupby("accountGuid").agg(all_time=("sourceID", "count")).reset_index()
-        income_three_month = (
-            income_df_sorted[income_df_sorted.in_three_month]
-            .groupby("accountGuid")
-            .agg(three_month=("sourceID", "count"))
-            .reset_index()
-        )
-        income_six_month = (
-            income_df_sorted[income_df_sorted.in_six_month]
-            .groupby("accountGuid")
-            .agg(six_month=("sourceID", "count"))
-            .reset_index()
-        )
-        income_source_cnt = (
-            all_account_ids.merge(income_all, on="accountGuid", how="left")
-            .merge(income_three_month, how="left", on="accountGuid")
-            .merge(income_six_month, how="left", on="accountGuid")
-        )
-        income_source_cnt = income_source_cnt.fillna(0)
-        income_source_cnt[["all_time", "three_month", "six_month"]] = income_source_cnt[
-            ["all_time", "three_month", "six_month"]
-        ].astype(int)
+        income_by_window = windows.aggregate(income_df_sorted, "lastPayDay", sources=("sourceID", "count"))
 
-        income_all = income_df_sorted.groupby("accountGuid").agg(all_time=("sourceID", "count")).reset_index()
-        income_three_month = (
-            income_df_sorted[income_df_sorted.in_three_month]
-            .groupby("accountGuid")
-            .agg(three_month=("sourceID", "count"))
-            .reset_index()
-        )
-        income_six_month = (
-            income_df_sorted[income_df_sorted.in_six_month]
-            .groupby("accountGuid")
-            .agg(six_month=("sourceID", "count"))
-            .reset_index()
-        )
-        income_source_cnt = (
-            all_account_ids.merge(income_all, on="accountGuid", how="left")
-            .merge(income_three_month, how="left", on="accountGuid")
-            .merge(income_six_month, how="left", on="accountGuid")
-        )
+        income_source_cnt = all_account_ids
+        for window in WINDOWS:
+            income_source_cnt = income_source_cnt.merge(
+                income_by_window[window].rename(columns={"sources": window}), how="left", on="accountGuid"
+            )
         income_source_cnt = income_source_cnt.fillna(0)
         income_source_cnt[["all_time", "three_month", "six_month"]] = income_source_cnt[
             ["all_time", "three_month", "six_month"]
@@ -487,48 +427,28 @@ class IncomeSource:
 
     @staticmethod
     @timer
-    def income_history(income_source_trans: pd.DataFrame, balance_df: pd.DataFrame) -> pd.DataFrame:
+    def income_history(
+        income_source_trans: pd.DataFrame, balance_df: pd.DataFrame, windows: AccountWindows | None = None
+    ) -> pd.DataFrame:
         """incomeHistory of all time / 3 months / 6 months."""
 
+        if windows is None:
+            windows = AccountWindows(balance_df)
+
         # Analytics on how many income sources within all/3 months/6 months
-        all_account_ids = balance_df[[config.IA_ACCOUNT_ID]].rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
+        all_account_ids = windows.all_account_ids.rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
         income_source_trans = income_source_trans[income_source_trans.sourceID.str.contains("I")]
-        end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
-        income_source_trans = income_source_trans.merge(end_date, how="left", on="accountGuid")
-        income_source_trans["interval"] = (
-            pd.to_datetime(income_source_trans["end_date"]) - pd.to_datetime(income_source_trans["date"])
-        ).dt.days
-        income_source_trans["in_three_month"] = income_source_trans.interval <= 90
-        income_source_trans["in_six_month"] = income_source_trans.interval <= 180
-
-        first_end_date_all = (
-            income_source_trans.groupby("accountGuid").agg(first_date_all=("date", "min")).reset_index()
-        )
-        first_end_date_three_month = (
-            income_source_trans[income_source_trans.in_three_month]
-            .groupby("accountGuid")
-            .agg(first_date_three_month=("date", "min"))
-            .reset_index()
-        )
-        first_end_date_six_month = (
-            income_source_trans[income_source_trans.in_six_month]
-            .groupby("accountGuid")
-            .agg(first_date_six_month=("date", "min"))
-            .reset_index()
-        )
-
-        end_date = end_date.merge(first_end_date_all, how="left", on="accountGuid")
-        end_date = end_date.merge(first_end_date_three_month, how="left", on="accountGuid")
-        end_date = end_date.merge(first_end_date_six_month, how="left", on="accountGuid")
-        end_date["incomeHistoryAllTime"] = (
-            pd.to_datetime(end_date["end_date"]) - pd.to_datetime(end_date["first_date_all"])
-        ).dt.days
-        end_date["incomeHistoryThreeMonth"] = (
-            pd.to_datetime(end_date["end_date"]) - pd.to_datetime(end_date["first_date_three_month"])
-        ).dt.days
-        end_date["incomeHistorySixMonth"] = (
-            pd.to_datetime(end_date["end_date"]) - pd.to_datetime(end_date["first_date_six_month"])
-        ).dt.days
+        first_dates = windows.aggregate(income_source_trans, first_date=("date", "min"))
+
+        end_date = windows.end_date
+        for window, history in [
+            ("all_time", "incomeHistoryAllTime"),
+            ("three_month", "incomeHistoryThreeMonth"),
+            ("six_month", "incomeHistorySixMonth"),
+        ]:
+            end_date = end_date.merge(first_dates[window], how="left", on="accountGuid")
+            end_date[history] = (pd.to_datetime(end_date["end_date"]) - pd.to_datetime(end_date["first_date"])).dt.days
+            end_date = end_date.drop(columns="first_date")
 
         income_history_output = all_account_ids.merge(
             end_date[
@@ -561,93 +481,41 @@ class IncomeSource:
 
     @staticmethod
     @timer
-    def averageMonthlyIncome_by_month(income_source_trans: pd.DataFrame, balance_df: pd.DataFrame) -> pd.DataFrame:
+    def averageMonthlyIncome_by_month(
+        income_source_trans: pd.DataFrame, balance_df: pd.DataFrame, windows: AccountWindows | None = None
+    ) -> pd.DataFrame:
         """Average monthly income for all time / 3 months / 6 months."""
 
-        all_account_ids = balance_df[[config.IA_ACCOUNT_ID]].rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
-        income_source_trans = income_source_trans[income_source_trans.sourceID.str.contains("I")]
-        end_date = balance_df.groupby("accountGuid").agg(end_date=("as_of_date", "max")).reset_index()
-        income_source_trans = income_source_trans.merge(end_date, how="left", on="accountGuid")
-        income_source_trans["start_date"] = income_source_trans.groupby("accountGuid").date.transform("min")
-        income_source_trans["time_period"] = (
-            pd.to_datetime(income_source_trans["end_date"]) - pd.to_datetime(income_source_trans["start_date"])
-        ).dt.days
-        income_source_trans["interval"] = (
-            pd.to_datetime(income_source_trans["end_date"]) - pd.to_datetime(income_source_trans["date"])
-        ).dt.days
-        income_source_trans["in_three_month"] = income_source_trans.interval <= 90
-        income_source_trans["in_six_month"] = income_source_trans.interval <= 180
-
-        income_all = (
-            income_source_trans.groupby("accountGuid")
-            .agg(
-                all_time_income=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        income_all["allTimeMonthlyIncome"] = income_all.all_time_income
-        income_all.loc[income_all.time_period >= 30, "allTimeMonthlyIncome"] = (
-            income_all[income_all.time_period >= 30].all_time_income
-            / income_all[income_all.time_period >= 30].time_period
-            * 30
-        )
-
-        income_three_month = (
-            income_source_trans[income_source_trans.in_three_month]
-            .groupby("accountGuid")
-            .agg(
-                all_time_income=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        income_three_month["threeMonthMonthlyIncome"] = income_three_month.all_time_income
-        income_three_month.loc[income_three_month.time_period >= 30, "threeMonthMonthlyIncome"] = (
-            income_three_month[income_three_month.time_period >= 30].all_time_income
-            / np.minimum(
-                income_three_month[income_three_month.time_period >= 30].time_period,
-                90,
-            )
-            * 30
-        )
+        if windows is None:
+            windows = AccountWindows(balance_df)
 
-        income_six_month = (
-            income_source_trans[income_source_trans.in_six_month]
-            .groupby("accountGuid")
-            .agg(
-                all_time_income=("amount", "sum"),
-                time_period=("time_period", "first"),
-            )
-            .reset_index()
-        )
-        income_six_month["sixMonthMonthlyIncome"] = income_six_month.all_time_income
-        income_six_month.loc[income_six_month.time_period >= 30, "sixMonthMonthlyIncome"] = (
-            income_six_month[income_six_month.time_period >= 30].all_time_income
-            / np.minimum(
-                income_six_month[income_six_month.time_period >= 30].time_period,
-                180,
-            )
-            * 30
+        all_account_ids = windows.all_account_ids.rename(columns={config.IA_ACCOUNT_ID: "accountGuid"})
+        income_source_trans = income_source_trans[income_source_trans.sourceID.str.contains("I")].copy()
+        income_source_trans["time_period"] = windows.time_period(income_source_trans)
+        income_by_window = windows.aggregate(
+            income_source_trans,
+            all_time_income=("amount", "sum"),
+            time_period=("time_period", "first"),
         )
 
-        avg_monthly_income = (
-            all_account_ids.merge(
-                income_all[["accountGuid", "allTimeMonthlyIncome"]],
-                on=config.IA_ACCOUNT_ID,
-                how="left",
+        avg_monthly_income = all_account_ids
+        for window, monthly_income, max_period in [
+            ("all_time", "allTimeMonthlyIncome", None),
+            ("three_month", "threeMonthMonthlyIncome", 90),
+            ("six_month", "sixMonthMonthlyIncome", 180),
+        ]:
+            income = income_by_window[window]
+            income[monthly_income] = income.all_time_income
+            # Income of at least a month is averaged per 30 days, over no more days than the window has
+            period = income[income.time_period >= 30].time_period
+            if max_period is not None:
+                period = np.minimum(period, max_period)
+            income.loc[income.time_period >= 30, monthly_income] = (
+                income[income.time_period >= 30].all_time_income / period * 30
             )
-            .merge(
-                income_three_month[["accountGuid", "threeMonthMonthlyIncome"]],
-                how="left",
-                on=config.IA_ACCOUNT_ID,
+            avg_monthly_income = avg_monthly_income.merge(
+                income[["accountGuid", monthly_income]], how="left", on="accountGuid"
             )
-            .merge(
-                income_six_month[["accountGuid", "sixMonthMonthlyIncome"]],
-                how="left",
-                on="accountGuid",
-            )
-        )
         avg_monthly_income = avg_monthly_income.fillna(0)
 
         return avg_monthly_income
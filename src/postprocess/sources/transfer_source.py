@@ -6,9 +6,9 @@ from utils.decorators import timer
 from postprocess.sources.helpers.calculate_frequency_amount import (
     active_income_check,
     amount_stability_check,
-    calculate_frequency_amount,
     recurring_income_check,
 )
+from postprocess.sources.helpers.source_partition import SourcePartition, assign_source_ids, same_day_summary
 
 
 class TransferSource:
@@ -21,91 +21,23 @@ class TransferSource:
         income_source_trans: pd.DataFrame,
         as_of_date: pd.Timestamp,
         sourceID=0,
+        partition: SourcePartition | None = None,
     ) -> tuple[dict, pd.DataFrame, int]:
         """Returns the transfer source categories given the transactions."""
 
-        # Load holidays for payday prediction
-        holidays = config.HOLIDAYS
-
         income_source_dict = {}
+        # Last sourceID written per (account, subcategory), single payday IDs only reach transCategory 3/4 rows
+        source_ids = {}
+        any_category_source_ids = {}
 
-        # Only consider credit for now
-        result = result[result.type == "CREDIT"].copy()
-
-        # Add subcategories for transfer and deposit
-        result.loc[result.transCategory == 3, "subcategory"] = "Other Transfer"
-        result.loc[result.transCategory == 4, "subcategory"] = "Other Deposit"
-
-        # Balance transfer
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(
-                "|".join(
-                    [
-                        r"\bto\b.*\bchecking\b",
-                        r"\bfrom.*\bchecking\b",
-                        r"\bfrom.*\bchk\b",
-                        r"\bshare\b",
-                        r"\bround up\b",
-                        r"\bsave as you go\b",
-                        r"\bfrom.*\bsav",
-                        r"\bbank",
-                        r"\bcredit.*line.*transfer\b",
-                        r"\breverse.*monthly.*service.*charge\b",
-                    ]
-                ),
-                case=False,
-            ),
-            "subcategory",
-        ] = "Balance Transfer"
-
-        # Transfer
-        result.loc[
-            (result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\bcash app\b", case=False))
-            & (result.transCategory == 3),
-            "subcategory",
-        ] = "Cash App"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\bvenmo\b", case=False) & (result.transCategory == 3),
-            "subcategory",
-        ] = "Venmo"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\bpaypal\b", case=False)
-            & (result.transCategory == 3),
-            "subcategory",
-        ] = "Paypal"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\bapple pay\b", case=False)
-            & (result.transCategory == 3),
-            "subcategory",
-        ] = "Apple Pay"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(
-                r"\b" + r"|".join([r"\bzelle\b", r"\bzel\b"]) + r"\b",
-                case=False,
-            )
-            & (result.transCategory == 3),
-            "subcategory",
-        ] = "Zelle"
-
-        # Deposit
-        result.loc[
-            (result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\b(?:cash|atm)\b", case=False))
-            & (result.transCategory == 4),
-            "subcategory",
-        ] = "Cash Deposit"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\b(?:mobile|edeposit|online|remote)\b", case=False)
-            & (result.transCategory == 4),
-            "subcategory",
-        ] = "Mobile Deposit"
-        result.loc[
-            result[config.IA_ORIGINAL_DESCRIPTION].str.contains(r"\bcheck\b", case=False) & (result.transCategory == 4),
-            "subcategory",
-        ] = "Check Deposit"
+        # Only consider credit for now, subcategories for transfer and deposit are assigned by the partition
+        if partition is None:
+            partition = SourcePartition(result)
+        result = partition.credits
 
         # Add information to income source
         income_source_trans["subcategory"] = result.subcategory
-        customer_df = result[(result["transCategory"] == 3) | (result["transCategory"] == 4)]
+        customer_df = partition.category(3, 4)
 
         if len(customer_df) == 0:
             for account_id in result[config.PS_ACCOUNT_ID].unique():
@@ -141,30 +73,29 @@ class TransferSource:
 
         if len(customer_df) > 0:
             # process separately for each account_guid
-            for account_id in customer_df[config.PS_ACCOUNT_ID].unique():
-                account_df = customer_df[customer_df[config.IA_ACCOUNT_ID] == account_id]
-                for i in account_df["transCategory"].unique():
-                    target = account_df[account_df.transCategory == i].sort_values(config.PS_TXN_DATE)
+            # Other transfers and deposits are all clustered together, their frequency is not analyzed
+            frequencies = partition.frequencies()
+            for account_id, account_positions in customer_df.groupby(config.PS_ACCOUNT_ID, sort=False).indices.items():
+                account_df = customer_df.iloc[account_positions]
+                for i, category_positions in account_df.groupby("transCategory", sort=False).indices.items():
+                    target = account_df.iloc[category_positions].sort_values(config.PS_TXN_DATE)
                     if i == 3:  # Transfer
                         income_type = "Transfer"
                     else:
                         income_type = "Deposit"
-                    for j in target["subcategory"].unique():
-                        transfer_subcategory = target[target.subcategory == j].sort_values("date")
+                    for j, positions in target.groupby("subcategory", sort=False).indices.items():
+                        transfer_subcategory = target.iloc[positions].sort_values("date")
                         source_name = j
                         cluster = str(account_id) + "_" + str(j)
 
                         # Group sameday transactions into one, this is for getting the historical payday
-                        same_day_amount = (
-                            transfer_subcategory[[config.PS_TXN_DATE, config.PS_TXN_AMOUNT]]
-                            .groupby(config.PS_TXN_DATE)
-                            .sum()
-                            .reset_index()
-                        )
-                        num_of_payday = len(same_day_amount)
-                        per_paycheck = same_day_amount[config.PS_TXN_AMOUNT].mean()
-                        last_payday = pd.to_datetime(transfer_subcategory[config.PS_TXN_DATE]).max()
-                        historicalPayDay = list(same_day_amount[config.PS_TXN_DATE])
+                        (
+                            same_day_amount,
+                            num_of_payday,
+                            per_paycheck,
+                            last_payday,
+                            historicalPayDay,
+                        ) = same_day_summary(transfer_subcategory)
                         total_days = (
                             pd.to_datetime(transfer_subcategory[config.PS_TXN_DATE]).max()
                             - pd.to_datetime(transfer_subcategory[config.PS_TXN_DATE]).min()
@@ -200,7 +131,11 @@ class TransferSource:
                                 next_pay_day,
                                 payment_near_holiday,
                                 next_pay_day_on_holiday,
-                            ) = calculate_frequency_amount(same_day_amount, holidays)
+                            ) = frequencies[(i, account_id, j)]
+                            # The income checks expect parsed dates
+                            same_day_amount[config.PS_TXN_DATE] = pd.to_datetime(
+                                same_day_amount[config.PS_TXN_DATE], errors="coerce"
+                            )
                             active_score = active_income_check(same_day_amount, as_of_date, freq, "Transfer")
                             recurring_score = recurring_income_check(
                                 same_day_amount,
@@ -249,12 +184,7 @@ class TransferSource:
                                 "paymentNearHoliday": "None",
                                 "nextPayDayOnHoliday": "Not Applicable",
                             }
-                            income_source_trans.loc[
-                                (income_source_trans.subcategory == j)
-                                & (income_source_trans.accountGuid == account_id)
-                                & (income_source_trans.transCategory.isin([3, 4])),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_205"
+                            source_ids[(account_id, j)] = "I" + str(sourceID) + "_err_205"
                             continue
 
                         recency = (as_of_date - last_payday) / np.timedelta64(1, "D")
@@ -320,11 +250,8 @@ class TransferSource:
                                 "paymentNearHoliday": "None",
                                 "nextPayDayOnHoliday": "Not Applicable",
                             }
-                            income_source_trans.loc[
-                                (income_source_trans.subcategory == j)
-                                & (income_source_trans.accountGuid == account_id),
-                                "sourceID",
-                            ] = "I" + str(sourceID) + "_err_405"
+                            source_ids[(account_id, j)] = "I" + str(sourceID) + "_err_405"
+                            any_category_source_ids[(account_id, j)] = source_ids[(account_id, j)]
                             continue
                         sourceID += 1
                         income_source_dict[cluster] = {
@@ -357,9 +284,17 @@ class TransferSource:
                         }
 
                         # Add sourceID to income_trans
-                        income_source_trans.loc[
-                            (income_source_trans.subcategory == j) & (income_source_trans.accountGuid == account_id),
-                            "sourceID",
-                        ] = "I" + str(sourceID) + "_err_000"
+                        source_ids[(account_id, j)] = "I" + str(sourceID) + "_err_000"
+                        any_category_source_ids[(account_id, j)] = source_ids[(account_id, j)]
+
+        keys = [config.IA_ACCOUNT_ID, "subcategory"]
+        # Same result as writing the IDs in loop order: rows outside 3/4 keep the last ID that was not single payday
+        assign_source_ids(income_source_trans, any_category_source_ids, keys)
+        assign_source_ids(
+            income_source_trans,
+            source_ids,
+            keys,
+            restrict=income_source_trans.transCategory.isin([3, 4]),
+        )
 
         return income_source_dict, income_source_trans, sourceID
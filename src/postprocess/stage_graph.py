@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+from config import config
+
+
+class Stage(NamedTuple):
+    """A postprocessing stage, called with the values named in inputs.
+
+    Its return value is stored under the stage's name, or unpacked into the names in outputs when it returns a tuple.
+    """
+
+    function: Callable
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] | None = None
+
+
+def stage_order(stages: dict[str, Stage], inputs: set[str]) -> dict[str, set[str]]:
+    """The stages every stage waits for, in an order running each stage after the ones it waits for.
+
+    Stages keep their declaration order wherever their dependencies allow it.
+    """
+
+    producers = {}
+    for name, stage in stages.items():
+        for output in stage.outputs or (name,):
+            if output in producers or output in inputs:
+                raise ValueError(f"'{output}' is produced more than once")
+            producers[output] = name
+
+    waits_for = {}
+    for name, stage in stages.items():
+        missing = [value for value in stage.inputs if value not in producers and value not in inputs]
+        if missing:
+            raise ValueError(f"Stage '{name}' reads {missing}, which neither an input nor a stage provides")
+        waits_for[name] = {producers[value] for value in stage.inputs if value in producers}
+
+    order = {}
+    while len(order) < len(stages):
+        ready = [name for name in stages if name not in order and waits_for[name] <= order.keys()]
+        if not ready:
+            raise ValueError(f"Stages {[name for name in stages if name not in order]} wait for each other")
+        for name in ready:
+            order[name] = waits_for[name]
+    return order
+
+
+def run_stages(stages: dict[str, Stage], values: dict, max_workers: int = 1) -> tuple[dict, dict[str, float]]:
+    """Runs every stage as soon as the stages it reads from have run, up to max_workers stages at a time.
+
+    Stages only read their inputs and return new values, so the values are the same whatever the degree of
+    parallelism, max_workers of 1 runs the stages one after the other in the calling thread.
+
+    Args:
+        - stages (dict): the stages by name
+        - values (dict): the values the stages read that no stage produces, by name
+        - max_workers (int): the number of stages running at the same time
+
+    Returns:
+        - values (dict): the given values with the outputs of every stage
+        - timings (dict): milliseconds each stage took, by stage name
+    """
+    order = stage_order(stages, set(values))
+    values = dict(values)
+    timings = {}
+
+    def run(name: str):
+        start = time.perf_counter()
+        stage = stages[name]
+        output = stage.function(*(values[value] for value in stage.inputs))
+        timings[name] = (time.perf_counter() - start) * 1000
+        return output
+
+    def store(name: str, output):
+        outputs = stages[name].outputs
+        if outputs is None:
+            values[name] = output
+        else:
+            values.update(zip(outputs, output, strict=True))
+
+    if max_workers <= 1:
+        for name in order:
+            store(name, run(name))
+    else:
+        done = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while len(done) < len(order):
+                for name, waits_for in order.items():
+                    if name not in done and name not in running.values() and waits_for <= done:
+                        running[executor.submit(run, name)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    store(name, future.result())
+                    done.add(name)
+
+    if config.PRINT_TIMESTAMPS:
+        for name in order:
+            print(f"stage '{name}' took {timings[name]:.2f} ms to execute")
+    return values, timings
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from config import config
+
+# Trailing windows in days before the account end date, None for all time
+WINDOWS = {"all_time": None, "three_month": 90, "six_month": 180}
+
+# Aggregations returning one of the values of an integer column, or their integer sum
+_INTEGER_AGGREGATIONS = ["sum", "first", "last", "min", "max"]
+
+_ROWS = "rows"
+
+
+class AccountWindows:
+    """End date of every account of a request with the all time / 3 months / 6 months windows before it.
+
+    Built once from balance_df and shared by all the by month metrics, each of them aggregates its rows for the three
+    windows in a single grouped pass.
+    """
+
+    def __init__(self, balance_df: pd.DataFrame):
+        self.all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
+        self.end_date = balance_df.groupby(config.IA_ACCOUNT_ID).agg(end_date=("as_of_date", "max")).reset_index()
+        self._end_dates = pd.Series(
+            pd.to_datetime(self.end_date["end_date"]).to_numpy(), index=self.end_date[config.IA_ACCOUNT_ID]
+        )
+
+    def end_dates(self, frame: pd.DataFrame) -> pd.Series:
+        """End date of the account of each row."""
+
+        return pd.Series(frame[config.IA_ACCOUNT_ID].map(self._end_dates).to_numpy(), index=frame.index)
+
+    def days_to_end(self, frame: pd.DataFrame, date_column: str = config.IA_DATE) -> pd.Series:
+        """Days from the date of each row to the end date of its account."""
+
+        return (self.end_dates(frame) - pd.to_datetime(frame[date_column])).dt.days
+
+    def time_period(self, frame: pd.DataFrame, date_column: str = config.IA_DATE) -> pd.Series:
+        """Days from the first date of each row's account in the frame to the account end date."""
+
+        start_date = frame.groupby(config.IA_ACCOUNT_ID)[date_column].transform("min")
+        return (self.end_dates(frame) - pd.to_datetime(start_date)).dt.days
+
+    def aggregate(self, frame: pd.DataFrame, date_column: str = config.IA_DATE, **aggregations) -> dict:
+        """Aggregates the rows of every window at once.
+
+        Args:
+            frame: Rows with an account and a date column.
+            date_column: Date placing each row in the windows.
+            **aggregations: Named (column, function) aggregations like DataFrame.groupby().agg takes.
+
+        Returns:
+            dict: For each window, the frame frame[in window].groupby(account).agg(**aggregations).reset_index()
+                would give.
+        """
+
+        days = self.days_to_end(frame, date_column).to_numpy()
+        columns = {}
+        for window, limit in WINDOWS.items():
+            in_window = np.ones(len(frame), dtype=bool) if limit is None else days <= limit
+            columns[(window, _ROWS)] = (in_window.astype(np.int64), "sum")
+            for name, (column, func) in aggregations.items():
+                values = frame[column]
+                # Rows out of the window are skipped like the missing values the aggregations ignore
+                columns[(window, name)] = (values if in_window.all() else values.where(in_window), func)
+
+        masked = pd.DataFrame({key: values for key, (values, _) in columns.items()}, index=frame.index)
+        masked.columns = range(len(columns))
+        aggregated = masked.groupby(frame[config.IA_ACCOUNT_ID]).agg(
+            **{str(k): (k, func) for k, (_, func) in enumerate(columns.values())}
+        )
+        aggregated.columns = pd.MultiIndex.from_tuples(list(columns))
+
+        results = {}
+        for window in WINDOWS:
+            window_result = aggregated[window]
+            window_result = window_result[window_result[_ROWS] > 0].drop(columns=_ROWS)
+            for name, (column, func) in aggregations.items():
+                # Masking turns integer columns into floats, a window with rows has the values of the integers back
+                dtype = frame[column].dtype
+                if func in _INTEGER_AGGREGATIONS and dtype.kind in "iu" and window_result[name].notna().all():
+                    window_result[name] = window_result[name].astype(dtype)
+            window_result.index.name = config.IA_ACCOUNT_ID
+            results[window] = window_result.reset_index()
+        return results
@@ -1,39 +1,26 @@
-from datetime import date, timedelta
-from typing import Union
+from datetime import date
 
 import pandas as pd
 from config import config
 from utils.decorators import timer
 
+from postprocess.cashflow.daily_balances import DailyBalances
 
-class AverageBalances:
-    @staticmethod
-    @timer
-    def assign_month(given_date: date, cur_date: date) -> Union[int, None]:
-        for i in range(6):
-            if given_date > cur_date - timedelta(days=(i + 1) * 30) and given_date <= cur_date - timedelta(days=i * 30):
-                return i + 1
 
+class AverageBalances:
     @timer
-    def avg_balances(self, trans_df: pd.DataFrame, cur_bal: str, cur_date: date, account: str) -> pd.DataFrame:
+    def avg_balances(
+        self,
+        trans_df: pd.DataFrame,
+        cur_bal: str,
+        cur_date: date,
+        account: str,
+        daily_balances: DailyBalances | None = None,
+    ) -> pd.DataFrame:
         # If the transaction history is short, we only use those valid data
-        trans_df = trans_df.copy()
-        start_date = min(min(trans_df["date"]), cur_date)
-        date_df = pd.DataFrame({"date": pd.date_range(start=start_date, end=cur_date)})
-        date_df["date"] = pd.to_datetime(date_df["date"]).dt.date
-        trans_df.loc[:, "transactions"] = trans_df.apply(
-            lambda x: -x["amount"] if x["type"] == "DEBIT" else x["amount"],
-            axis=1,
-        )
-        trans_daily = trans_df[["transactions", "date"]].groupby(["date"], as_index=False).sum()  # daily net cashflow
-        trans_everyday = pd.merge(trans_daily, date_df, on="date", how="right")
-        # Assumption: if there is no transaction record, the daily cashflow is 0.
-        trans_everyday = trans_everyday.fillna(0)
-        trans_everyday = trans_everyday.sort_values(by="date", ascending=False)
-        trans_everyday["balance"] = -trans_everyday["transactions"].cumsum() + float(cur_bal)
-        trans_everyday["month"] = trans_everyday["date"].apply(
-            lambda given_date: self.assign_month(given_date, cur_date)
-        )
+        if daily_balances is None:
+            daily_balances = DailyBalances(trans_df.assign(**{config.IA_ACCOUNT_ID: account}))
+        trans_everyday = daily_balances.balances(account, cur_bal, cur_date)
         avg_monthlybal_3m = (
             trans_everyday[trans_everyday["month"] <= 3][["balance", "month"]].groupby("month").mean()
         ).mean()
@@ -60,15 +47,17 @@ class AverageBalances:
         return balance_df
 
     @timer
-    def avg_balances_all_accounts(self, balance_df: pd.DataFrame, transactions_df: pd.DataFrame) -> pd.DataFrame:
+    def avg_balances_all_accounts(
+        self, balance_df: pd.DataFrame, transactions_df: pd.DataFrame, daily_balances: DailyBalances | None = None
+    ) -> pd.DataFrame:
+        if daily_balances is None:
+            daily_balances = DailyBalances(transactions_df)
         avg_balance_account = []
         all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
-        for i, account_id in enumerate(balance_df[config.IA_ACCOUNT_ID]):
-            trans_df = transactions_df[transactions_df[config.IA_ACCOUNT_ID] == account_id]
-            cur_bal, cur_date = balance_df[["currentBalance", "currentBalanceDate"]].iloc[i]
-            all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
-            if len(trans_df) > 0:
-                avg_balance = self.avg_balances(trans_df, cur_bal, cur_date, account_id)
+        current_balances = zip(balance_df["currentBalance"], balance_df["currentBalanceDate"])
+        for account_id, (cur_bal, cur_date) in zip(balance_df[config.IA_ACCOUNT_ID], current_balances):
+            if account_id in daily_balances:
+                avg_balance = self.avg_balances(None, cur_bal, cur_date, account_id, daily_balances)
                 avg_balance_account.append(avg_balance)
 
         # Handle empty dataframe concatenation
@@ -10,56 +10,69 @@ PAT_NONALNUM = re.compile(r"[^a-zA-Z0-9\s]")
 PAT_CARD_TAIL4 = re.compile(r"(?:card|crd) x*?\d{4}\b")
 
 
+def clean(descriptions: pd.Series) -> pd.Series:
+    """Lowercased descriptions with digit groups spaced out and anything but letters, digits and single spaces removed."""
+
+    return (
+        descriptions.str.replace(PAT_DIGITS_GROUP, r" \1 ", regex=True)
+        .str.replace(" / ", " ", regex=False)
+        .str.replace(" *", " ", regex=False)
+        .str.replace("*", " ", regex=False)
+        .str.replace(PAT_NONALNUM, " ", regex=True)
+        .str.split()
+        .str.join(" ")
+        .str.lower()
+    )
+
+
+def card_digits(s: str, matches: list[str]) -> set[str]:
+    """Last 4 digits of the card matches of a cleaned description, skipping the ones paying or coming from outside."""
+
+    res = []
+    for i in matches:
+        external_card_key = [
+            "wire transfer deposit card",
+            "banking advance from",
+            f"wire transfer fee {i}",
+            f"dbt {i}",
+            f"pmt {i}",
+            "payment to",
+            "pymt to",
+            " from ",
+            "eb to",
+            f"check{i}",
+        ]
+        if not any(key in s for key in external_card_key):
+            res.append(i[-4:])
+    return set(res)
+
+
 class BankCard:
     @staticmethod
-    @timer
     def extract_digits_after_card(description: str) -> set[str]:
-        def clean(description_str: str) -> str:
-            t = PAT_DIGITS_GROUP.sub(r" \1 ", description_str)
-            t = " ".join(t.split(" / "))
-            t = " ".join(t.split(" *"))
-            t = " ".join(t.split("*"))
-            res1 = PAT_NONALNUM.sub(" ", t)
-            words = res1.split()
-            result_string = " ".join(words)
-            return result_string
-
-        if isinstance(description, str):
-            s = clean(description).lower()
-            matches = PAT_CARD_TAIL4.findall(s)
-            res = []
-            for i in matches:
-                external_card_key = [
-                    "wire transfer deposit card",
-                    "banking advance from",
-                    f"wire transfer fee {i}",
-                    f"dbt {i}",
-                    f"pmt {i}",
-                    "payment to",
-                    "pymt to",
-                    " from ",
-                    "eb to",
-                    f"check{i}",
-                ]
-                flag = 0
-                for key in external_card_key:
-                    if key in s:
-                        flag = 1
-                        break
-                if flag:
-                    continue
-                else:
-                    res.append(i[-4:])
-            res = set(res)
-        else:
-            res = set()
-        return res
+        return BankCard.extract_cards(pd.Series([description], dtype=object))[0]
+
+    @staticmethod
+    @timer
+    def extract_cards(descriptions: pd.Series) -> list[set[str]]:
+        """Card digits of every description, cleaning and searching each unique description once."""
+
+        codes, uniques = pd.factorize(descriptions)
+        # Anything but a string has no card, so it is cleaned as missing
+        uniques = pd.Series(uniques, dtype=object)
+        cleaned = clean(uniques.where(uniques.map(lambda description: isinstance(description, str))))
+        matches = cleaned.str.findall(PAT_CARD_TAIL4)
+
+        cards = [set() for _ in range(len(uniques))]
+        for k in (matches.str.len() > 0).to_numpy().nonzero()[0]:
+            cards[k] = card_digits(cleaned.iloc[k], matches.iloc[k])
+        return [cards[code] if code != -1 else set() for code in codes]
 
     @timer
     def match_card(self, df: pd.DataFrame, balance_df: pd.DataFrame) -> pd.DataFrame:
         all_account_ids = balance_df[[config.IA_ACCOUNT_ID]]
         df_card = df[[config.IA_ACCOUNT_ID, config.IA_ORIGINAL_DESCRIPTION]].copy()
-        df_card["card"] = df_card[config.IA_ORIGINAL_DESCRIPTION].apply(self.extract_digits_after_card)
+        df_card["card"] = self.extract_cards(df_card[config.IA_ORIGINAL_DESCRIPTION])
         output = (
             df_card[[config.IA_ACCOUNT_ID, "card"]]
             .groupby(config.IA_ACCOUNT_ID)
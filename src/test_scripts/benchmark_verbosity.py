@@ -0,0 +1,52 @@
+"""Measures the latency of the model pipeline for every verbosity level of /model/v1/analyze.
+
+Each level runs the pipeline with the output fields it returns, after one untimed run that loads the models:
+
+    python src/test_scripts/benchmark_verbosity.py [request_json] [repeats]
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.common.handle_verbosity import requested_fields  # noqa: E402
+from config import config  # noqa: E402
+from model.run_model import run_model  # noqa: E402
+
+DEFAULT_REQUEST_PATH = os.path.join(
+    config.ROOT_DIR, "..", "tests", "data", "NCL_b11eee28-3739-455c-a491-104b1e42b7b3_Request.json"
+)
+
+VERBOSITY_LEVELS = {
+    "true": "true",
+    "summary": "summary",
+    "false": "false",
+    "[scores]": ["scores"],
+    "[creditTrans, debitTrans]": ["creditTrans", "debitTrans"],
+}
+
+
+def measure(input_data: str, verbosity, repeats: int) -> list[float]:
+    output_fields = requested_fields(verbosity)
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_model(input_data, output_fields=output_fields)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+if __name__ == "__main__":
+    request_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_REQUEST_PATH
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with open(request_path, encoding="utf-8-sig") as f:
+        input_data = json.dumps(json.load(f))
+
+    run_model(input_data)
+    for name, verbosity in VERBOSITY_LEVELS.items():
+        seconds = measure(input_data, verbosity, repeats)
+        print(f"verbosity={name:<28} median {statistics.median(seconds):>6.3f} s  min {min(seconds):>6.3f} s")
@@ -0,0 +1,58 @@
+"""Compares the startup time and memory of scoring the redZone V2 model through AutoGluon and natively.
+
+Each way runs in its own process, which imports the scoring module, loads the model and scores one row:
+
+    python src/test_scripts/compare_auto_gluon_native_model.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
+
+LOADERS = {
+    "scoring module only": "model = None",
+    "AutoGluon": (
+        "from autogluon.tabular import TabularPredictor\n"
+        "model = TabularPredictor.load(config.REDZONE_MODEL_FILE_PATH_V2, require_py_version_match=False)"
+    ),
+    "native": (
+        "model = auto_gluon_scoring.NativeCatBoostPredictor(\n"
+        "    os.path.join(config.REDZONE_MODEL_FILE_PATH_V2, config.AUTO_GLUON_NATIVE_MODEL_DIR)\n"
+        ")"
+    ),
+}
+
+SCRIPT = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import pandas as pd
+from config import config
+from postprocess.scores import auto_gluon_scoring
+{loader}
+if model is not None:
+    model.predict_proba(pd.DataFrame(0, index=[0], columns=model.features()), model="CatBoost_r137_BAG_L1_FULL")
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "autogluon_imported": "autogluon.tabular" in sys.modules,
+}}))
+"""
+
+
+def measure(loader: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(loader=loader)], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    for name, loader in LOADERS.items():
+        result = measure(loader)
+        print(
+            f"{name:<20} {result['seconds']:>7.2f} s  {result['max_rss_mb']:>8.1f} MB max RSS  "
+            f"AutoGluon imported: {result['autogluon_imported']}"
+        )
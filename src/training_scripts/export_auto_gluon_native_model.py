@@ -0,0 +1,85 @@
+"""Exports the deployed CatBoost model of an AutoGluon predictor to be scored without AutoGluon.
+
+Writes the CatBoost model and the features it is passed into the AUTO_GLUON_NATIVE_MODEL_DIR of the predictor, where
+load_auto_gluon_model picks them up. Run it with AutoGluon installed whenever the predictor is retrained:
+
+    python src/training_scripts/export_auto_gluon_native_model.py [model_path] [model_name]
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from autogluon.features.generators import AsTypeFeatureGenerator  # noqa: E402
+from autogluon.tabular import TabularPredictor  # noqa: E402
+
+from config import config  # noqa: E402
+
+
+def as_type_generator(feature_generator):
+    # The AsTypeFeatureGenerator of the predictor, which turns the raw features into the dtypes the models saw
+    if isinstance(feature_generator, AsTypeFeatureGenerator):
+        return feature_generator
+    for stage in getattr(feature_generator, "generators", None) or []:
+        for generator in stage:
+            found = as_type_generator(generator)
+            if found is not None:
+                return found
+    return None
+
+
+def python_value(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def export_native_model(model_path: str, model_name: str) -> str:
+    predictor = TabularPredictor.load(model_path, require_py_version_match=False)
+    bagged_model = predictor._trainer.load_model(model_name)
+    if len(bagged_model.models) != 1:
+        raise ValueError(f"{model_name} has {len(bagged_model.models)} fold models, only refit (_FULL) models export")
+    catboost_model = bagged_model.load_child(bagged_model.models[0])
+
+    input_features = list(predictor.features())
+    model_features = list(catboost_model.features)
+    generated_features = [feature for feature in model_features if feature not in input_features]
+    if generated_features:
+        raise ValueError(f"{model_name} uses features generated by AutoGluon: {generated_features}")
+    as_type = as_type_generator(predictor._learner.feature_generator)
+    if as_type is None:
+        raise ValueError(f"{model_path} has no AsTypeFeatureGenerator to take the feature dtypes from")
+
+    export_path = os.path.join(model_path, config.AUTO_GLUON_NATIVE_MODEL_DIR)
+    os.makedirs(export_path, exist_ok=True)
+    catboost_model.model.save_model(os.path.join(export_path, "model.cbm"))
+    with open(os.path.join(export_path, "features.json"), "w") as f:
+        json.dump(
+            {
+                "model_name": model_name,
+                "features": input_features,
+                "model_features": model_features,
+                "bool_true_values": {
+                    feature: python_value(value)
+                    for feature, value in (as_type._bool_features or {}).items()
+                    if feature in model_features
+                },
+                "int_features": [feature for feature in as_type._int_features if feature in model_features],
+                "dtypes": {
+                    feature: np.dtype(dtype).name
+                    for feature, dtype in as_type._type_map_real_opt.items()
+                    if feature in model_features
+                },
+            },
+            f,
+            indent=2,
+        )
+    return export_path
+
+
+if __name__ == "__main__":
+    model_path = sys.argv[1] if len(sys.argv) > 1 else config.REDZONE_MODEL_FILE_PATH_V2
+    model_name = sys.argv[2] if len(sys.argv) > 2 else "CatBoost_r137_BAG_L1_FULL"
+    print(f"Exported {model_name} to {export_native_model(model_path, model_name)}")
@@ -0,0 +1,111 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+NSF_KEYWORDS = [
+    r"\bnsf",
+    r"\binsufficient funds\b",
+    r"\binsufficient\b",
+    r"\bnonsufficient\b",
+    r"\bnon-sufficient\b",
+    r"\bnon sufficient\b",
+    r"\breturned item\b",
+    r"\bunpaid item\b",
+    r"\breturned check\b",
+    r"\bret(?:urned)? ?chk\b",
+    r"\bchargeback\b",
+    r"\bdebit return\b",
+    r"\bach return\b",
+    r"\bpos return\b",
+]
+
+OVERDRAFT_KEYWORDS = [
+    r"\boverdraft\b",
+    r"\boverdraft fee\b",
+    r"\bod fee\b",
+    r"\bpaid overdraft item\b",
+    r"\bfee withdrawal overdrawn\b",
+]
+
+REFUND_KEYWORDS = [r"\bfee\b", r"\breturn\b", r"\brefund\b", r"\breversal\b", r"\brebate\b"]
+
+BALANCE_TRANSFER_KEYWORDS = [
+    r"\bto\b.*\bchecking\b",
+    r"\bfrom.*\bchecking\b",
+    r"\bfrom.*\bchk\b",
+    r"\bshare\b",
+    r"\bround up\b",
+    r"\bsave as you go\b",
+    r"\bfrom.*\bsav",
+    r"\bbank",
+    r"\bcredit.*line.*transfer\b",
+    r"\breverse.*monthly.*service.*charge\b",
+]
+
+# Transfer/deposit subcategory of the credits matching each pattern
+TRANSFER_SUBCATEGORY_PATTERNS = {
+    "Balance Transfer": "|".join(BALANCE_TRANSFER_KEYWORDS),
+    # Transfer
+    "Cash App": r"\bcash app\b",
+    "Venmo": r"\bvenmo\b",
+    "Paypal": r"\bpaypal\b",
+    "Apple Pay": r"\bapple pay\b",
+    "Zelle": r"\b" + r"|".join([r"\bzelle\b", r"\bzel\b"]) + r"\b",
+    # Deposit
+    "Cash Deposit": r"\b(?:cash|atm)\b",
+    "Mobile Deposit": r"\b(?:mobile|edeposit|online|remote)\b",
+    "Check Deposit": r"\bcheck\b",
+}
+
+# Keyword families of the transaction descriptions: (pattern, lowercase). Lowercase families are searched in the
+# lowercased descriptions like .str.lower().str.contains(pattern), the others ignore case.
+SIGNAL_FAMILIES = {
+    "nsf": (re.compile("|".join(NSF_KEYWORDS), re.IGNORECASE), False),
+    "overdraft": (re.compile("|".join(OVERDRAFT_KEYWORDS), re.IGNORECASE), False),
+    "refund": (re.compile("|".join(REFUND_KEYWORDS)), True),
+    "balance_transfer": (re.compile("|".join(BALANCE_TRANSFER_KEYWORDS)), True),
+    **{
+        subcategory: (re.compile(pattern, re.IGNORECASE), False)
+        for subcategory, pattern in TRANSFER_SUBCATEGORY_PATTERNS.items()
+    },
+}
+
+
+def match_signal(descriptions: pd.Series, pattern: re.Pattern, lowercase: bool = False) -> np.ndarray:
+    """Whether each description contains the pattern, False for missing descriptions."""
+
+    descriptions = pd.Series(descriptions, dtype=object)
+    if lowercase:
+        descriptions = descriptions.str.lower()
+    return descriptions.str.contains(pattern, na=False).to_numpy(dtype=bool)
+
+
+class DescriptionSignals:
+    """Keyword family flags of the unique descriptions of a request, shared by every consumer of the same families.
+
+    Each family is searched once over the unique descriptions, the first time it is asked for, and looked up for every
+    row after that. Descriptions the index was not built from are searched on the fly.
+    """
+
+    def __init__(self, *descriptions: pd.Series, families: dict = SIGNAL_FAMILIES):
+        uniques = pd.unique(pd.concat([pd.Series(d, dtype=object) for d in descriptions], ignore_index=True))
+        self._descriptions = pd.Index(uniques, dtype=object)
+        self._families = families
+        self._flags = {}
+
+    def flags(self, descriptions: pd.Series, family: str) -> np.ndarray:
+        """Whether each description contains a keyword of the family."""
+
+        pattern, lowercase = self._families[family]
+        if family not in self._flags:
+            self._flags[family] = match_signal(self._descriptions.to_series(), pattern, lowercase)
+
+        descriptions = pd.Series(descriptions, dtype=object)
+        positions = self._descriptions.get_indexer(descriptions)
+        known = positions != -1
+        flags = np.zeros(len(descriptions), dtype=bool)
+        flags[known] = self._flags[family][positions[known]]
+        if not known.all():
+            flags[~known] = match_signal(descriptions[~known], pattern, lowercase)
+        return flags
@@ -97,8 +97,18 @@ def standardize_date_format(date_series: pd.Series) -> pd.Series:
 
 
 def df_to_json(df: pd.DataFrame) -> list[dict]:
-    dict = df.to_dict(orient="index")
-    return [i for i in dict.values()]
+    # The rows of df.to_dict(orient="index"), zipped from whole columns converted to Python values at once instead
+    # of boxing every value on its own
+    columns = list(df.columns)
+    if not columns:
+        return [{} for _ in range(len(df))]
+    values = [df.iloc[:, i].tolist() for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def output_requested(output_fields: set[str] | None, *fields: str) -> bool:
+    """Whether any of the fields is part of the response, output_fields of None requests every field"""
+    return output_fields is None or any(field in output_fields for field in fields)
 
 
 def truncate_transactions(df: pd.DataFrame, timeframe: TimeFrame, as_of_date: datetime.date) -> pd.DataFrame:
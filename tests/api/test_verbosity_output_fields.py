@@ -0,0 +1,102 @@
+import collections
+import json
+import sys
+
+import pytest
+from api.common.handle_model_request import get_model_results
+from api.common.handle_verbosity import requested_fields
+from api.transformations.transform_v2_output import V2_OUTPUT_FIELDS, transform_v2_output
+from model_analyze_payload import payload
+from utils.utils import TimeFrame
+
+
+@pytest.mark.parametrize(
+    "verbosity, expected_fields",
+    [
+        ("true", None),
+        ("TRUE", None),
+        ("false", set()),
+        ("summary", {"summaryInfo"}),
+        (["summaryInfo", "scores"], {"summaryInfo", "scores"}),
+        (["summaryInfo", "notAField"], None),
+        (1, None),
+    ],
+)
+def test_requested_fields(verbosity, expected_fields):
+    assert requested_fields(verbosity) == expected_fields
+
+
+@pytest.fixture(scope="module")
+def full_output():
+    return get_model_results(payload["input"], TimeFrame.ALL)
+
+
+@pytest.mark.parametrize("verbosity", ["false", "summary", ["creditTrans"], ["scores", "lendingGuide"]])
+def test_trimmed_output_matches_full_output(full_output, verbosity):
+    output_fields = requested_fields(verbosity)
+    output = get_model_results(payload["input"], TimeFrame.ALL, output_fields)
+
+    # The risk score is always there, every requested field is identical to the full output
+    risk_score = output["additionalInfo"]["redZoneBehaviorCustomer"]
+    assert risk_score == full_output["additionalInfo"]["redZoneBehaviorCustomer"]
+    for field in output_fields:
+        assert output[field] == full_output[field]
+    assert ("creditTrans" in output) == ("creditTrans" in output_fields)
+    assert ("lendingGuide" in output) == ("lendingGuide" in output_fields)
+
+
+def count_explanations(monkeypatch) -> collections.Counter:
+    """Counts the SHAP explanations and the lending guide stages the model runs."""
+    calls = collections.Counter()
+
+    def counted(module, name, key):
+        function = getattr(module, name)
+
+        def count_call(*args, **kwargs):
+            calls[key] += 1
+            return function(*args, **kwargs)
+
+        monkeypatch.setattr(module, name, count_call)
+
+    alerts_and_insights = sys.modules["postprocess.scores.alerts_and_insights"]
+    analyze_transactions = sys.modules["postprocess.analyze_transactions"]
+    counted(alerts_and_insights, "binary_shap_explain", "binary_shap_explain")
+    counted(analyze_transactions, "append_customer_level_lending_guide", "lending_guide")
+    counted(analyze_transactions, "append_account_level_lending_guides", "lending_guide")
+    return calls
+
+
+def single_account_input() -> str:
+    """The payload input keeping only its first account."""
+    data = json.loads(payload["input"])
+    account_guid = data["accounts"][0]["accountGuid"]
+    data["accounts"] = data["accounts"][:1]
+    data["transactions"] = [txn for txn in data["transactions"] if txn["accountGuid"] == account_guid]
+    return json.dumps(data)
+
+
+@pytest.mark.parametrize(
+    "input_data, expected_explanations",
+    # The scores of 4 models are explained at the customer level, of the account level ones v2 only keeps the red
+    # zone explanation in the assessment reasons. With a single account the customer level scores are the account
+    # level ones.
+    [(payload["input"], 5), (single_account_input(), 4)],
+)
+def test_v2_output_fields_give_the_same_v2_output(monkeypatch, input_data, expected_explanations):
+    full_v2_output = transform_v2_output(get_model_results(input_data, TimeFrame.ALL))
+
+    calls = count_explanations(monkeypatch)
+    v2_output = transform_v2_output(get_model_results(input_data, TimeFrame.ALL, V2_OUTPUT_FIELDS))
+
+    assert v2_output == full_v2_output
+    assert calls == {"binary_shap_explain": expected_explanations, "lending_guide": 2}
+
+
+def test_v1_analyze_returns_the_v2_output(client, monkeypatch):
+    calls = count_explanations(monkeypatch)
+
+    response = client.post("/model/v1/analyze", json=payload)
+    assert response.status_code == 200
+    assert "customerInfo" in response.json
+    assert "summaryInfo" not in response.json
+    assert calls == {"binary_shap_explain": 5, "lending_guide": 2}
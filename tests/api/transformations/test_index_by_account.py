@@ -0,0 +1,15 @@
+from api.transformations.transform_v2_output import index_by_account
+
+
+def test_index_by_account_keeps_the_first_dict_of_each_account():
+    summary_info = [
+        {"accountGuid": "a", "riskScore": 1},
+        {"accountGuid": "b", "riskScore": 2},
+        {"accountGuid": "a", "riskScore": 3},
+    ]
+
+    index = index_by_account(summary_info)
+
+    assert index == {"a": summary_info[0], "b": summary_info[1]}
+    assert index["a"] is summary_info[0]
+    assert index.get("c") is None
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from labeling.agent_label_utils import apply_agent_labeling
+from labeling.predict_transaction import copy_labels_from_labeled_transactions
+
+
+def test_copy_labels_uses_majority_label_per_cluster():
+    df = pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "a", "a", "b", "b"],
+            "cluster_label": ["who_x", "who_x", "who_x", "who_x", "who_x", "who_x"],
+            "new_transaction": [True, False, False, False, True, True],
+            "StackingPrediction": [None, "loan", "payroll", "payroll", None, None],
+            "fromModel": [None, "x", "x", "x", None, None],
+        }
+    )
+    result = copy_labels_from_labeled_transactions(df, ["accountGuid", "cluster_label"])
+    assert result.index.names == ["accountGuid", "cluster_label", None]
+    assert result.StackingPrediction.tolist() == ["payroll", "loan", "payroll", "payroll", None, None]
+    assert result.fromModel.tolist() == ["copiedFromHistory", "x", "x", "x", None, None]
+
+
+def test_copy_labels_breaks_ties_like_mode():
+    df = pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "a"],
+            "cluster_label": ["who_x", "who_x", "who_x"],
+            "new_transaction": [False, False, True],
+            "StackingPrediction": ["transfer", "loan", None],
+            "fromModel": [None, None, None],
+        }
+    )
+    result = copy_labels_from_labeled_transactions(df, ["accountGuid", "cluster_label"])
+    assert result.StackingPrediction.tolist() == ["transfer", "loan", "loan"]
+
+
+def test_apply_agent_labeling_later_edits_take_precedence():
+    labeled = pd.DataFrame(
+        {
+            "originalDescription": ["uber", "lyft", "uber eats", "acme payroll"],
+            "cluster_label": ["who_uber", "who_uber", "who_uber", "who_acme"],
+            "category": ["Other"] * 4,
+            "StackingPrediction": ["other", "other", "other", "payroll"],
+            "fromModel": ["xgb"] * 4,
+        }
+    )
+    edits = pd.DataFrame(
+        {
+            "originalDescription": ["uber", "lyft"],
+            "agentCategory": ["gig", "transfer"],
+            "isEntireCluster": ["true", "false"],
+        }
+    )
+    result = apply_agent_labeling(labeled, edits)
+    assert result.StackingPrediction.tolist() == ["gig", "transfer", "gig", "payroll"]
+    assert result.fromModel.tolist() == ["LiveAgentEdit", "LiveAgentEdit", "LiveAgentEdit", "xgb"]
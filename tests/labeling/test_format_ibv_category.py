@@ -2,7 +2,7 @@ import numpy as np
 import pandas as pd
 
 from config import config
-from labeling.predict_transaction import format_ibv_category
+from labeling.predict_transaction import format_ibv_categories, format_ibv_category
 
 
 def test_standard_string_category():
@@ -114,3 +114,46 @@ def test_malformed_stringified_list():
     assert format_ibv_category("not a list string") == "not a list string"
     assert format_ibv_category("{'key': 'value'}") == "{'key': 'value'}"  # JSON object, not list
     assert format_ibv_category("123 Main St") == "123 Main St"  # Not a number or a list
+
+
+def test_format_ibv_categories_matches_per_value_formatting():
+    """Tests that the column-wide formatter gives the same values as formatting each value on its own."""
+    values = [
+        "Groceries",
+        '["Shops", "Digital"]',
+        ["Food", "Dining"],
+        ["Food", "Dining"],
+        "123",
+        None,
+        np.nan,
+        '["Shops", "Digital"]',
+        [["nested"], "Inner"],
+        42,
+    ]
+    categories = pd.Series(values, index=range(10, 20), dtype=object)
+    result = format_ibv_categories(categories)
+    expected = categories.apply(format_ibv_category)
+    pd.testing.assert_series_equal(result, expected)
+    assert result.iloc[5] is None
+    assert np.isnan(result.iloc[6])
+
+
+def test_format_ibv_categories_empty_column():
+    """Tests that an empty column is returned unchanged."""
+    assert format_ibv_categories(pd.Series([], dtype=object)).empty
+
+
+def test_format_ibv_categories_all_list_column():
+    """Tests a column made only of lists, the usual shape of list-valued IBV categories."""
+    categories = pd.Series([["Food", "Dining"], ["Shops"], ["Food", "Dining"], ["Transfer", "Loan"]], dtype=object)
+    result = format_ibv_categories(categories)
+    pd.testing.assert_series_equal(result, categories.apply(format_ibv_category))
+    assert result.tolist() == ["Food/Dining", "Shops", "Food/Dining", "Transfer/Loan"]
+
+
+def test_format_ibv_categories_all_stringified_list_column():
+    """Tests a column made only of stringified lists."""
+    categories = pd.Series(['["Food", "Dining"]', '["Shops"]', '["Food", "Dining"]'], dtype=object)
+    result = format_ibv_categories(categories)
+    pd.testing.assert_series_equal(result, categories.apply(format_ibv_category))
+    assert result.tolist() == ["Food/Dining", "Shops", "Food/Dining"]
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import config
+from model.run_model import run_model
+from postprocess.scores.auto_gluon_scoring import NativeCatBoostPredictor, auto_gluon_prediction
+
+TabularPredictor = pytest.importorskip("autogluon.tabular").TabularPredictor
+
+native_model_path = os.path.join(config.REDZONE_MODEL_FILE_PATH_V2, config.AUTO_GLUON_NATIVE_MODEL_DIR)
+pytestmark = pytest.mark.skipif(not os.path.isdir(native_model_path), reason="the redZone V2 model is not exported")
+
+
+@pytest.fixture(scope="module")
+def native_model():
+    return NativeCatBoostPredictor(native_model_path)
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return TabularPredictor.load(config.REDZONE_MODEL_FILE_PATH_V2, require_py_version_match=False)
+
+
+@pytest.mark.parametrize("file", ["1000.json", "2000.json", "accountGuid575.json"])
+def test_native_model_matches_the_auto_gluon_predictor(file, native_model, predictor, monkeypatch):
+    """The exported CatBoost model scores the bundled payloads like the AutoGluon predictor does."""
+    model_inputs = []
+
+    def capture_model_input(model_input, *args, **kwargs):
+        model_inputs.append(model_input.copy())
+        return auto_gluon_prediction(model_input, *args, **kwargs)
+
+    alerts_and_insights = sys.modules["postprocess.scores.alerts_and_insights"]
+    monkeypatch.setattr(alerts_and_insights, "auto_gluon_prediction", capture_model_input)
+    with open(os.path.join(config.ROOT_DIR, "..", "tests", "data", file), "r") as fp:
+        run_model(fp.read())
+
+    features = model_inputs[0][native_model.features()]
+
+    expected = predictor.predict_proba(features, model=native_model.model_name).to_numpy()
+    np.testing.assert_allclose(native_model.predict_proba(features).to_numpy(), expected, rtol=0, atol=1e-9)
+
+
+def test_native_model_matches_the_auto_gluon_predictor_on_random_features(native_model, predictor):
+    """Integers passed as floats, missing values and values other than the true one of the bool features."""
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(0, 50, (500, len(native_model.features()))), columns=native_model.features())
+    for feature in native_model.int_features:
+        features[feature] = rng.integers(-3, 40, len(features)).astype(float)
+    for feature in native_model.bool_true_values:
+        features[feature] = rng.integers(0, 3, len(features))
+    features = features.mask(rng.random(features.shape) < 0.1)
+
+    expected = predictor.predict_proba(features, model=native_model.model_name).to_numpy()
+    np.testing.assert_allclose(native_model.predict_proba(features).to_numpy(), expected, rtol=0, atol=1e-9)
@@ -2,6 +2,7 @@ import json
 import os
 
 import pandas as pd
+import pytest
 from config import config
 from errors import error_1_json
 from list_equals_check import check_lists_equal
@@ -10,6 +11,7 @@ from model.run_model import run_model
 sample_data_path = os.path.realpath(os.path.join(config.ROOT_DIR, "..", "tests", "data", "2000.json"))
 data_path_1000 = os.path.realpath(os.path.join(config.ROOT_DIR, "..", "tests", "data", "1000.json"))
 data_path_single_account = os.path.realpath(os.path.join(config.ROOT_DIR, "..", "tests", "data", "accountGuid575.json"))
+data_path_100 = os.path.realpath(os.path.join(config.ROOT_DIR, "..", "tests", "data", "100.json"))
 
 
 def test_run_model_2000():
@@ -154,6 +156,24 @@ def test_run_model_single_account():
         assert "customerLevel" in value.keys()
 
 
+@pytest.mark.parametrize(
+    "suffix",
+    [
+        " \U0001f355 caf\u00e9",
+        # A description cut in the middle of an emoji, orjson refuses to encode the lone surrogate
+        " \ud83d",
+    ],
+)
+def test_run_model_unicode_descriptions(suffix):
+    with open(data_path_100, "r") as fp:
+        data = json.load(fp)
+    data["transactions"][2]["description"] += suffix
+    output_json = json.loads(run_model(json.dumps(data)))
+    source_names = [transaction["sourceName"] for transaction in output_json["creditTrans"] + output_json["debitTrans"]]
+    assert any(source_name.endswith(suffix) for source_name in source_names)
+    assert "scores" in output_json
+
+
 def test_run_model_ignores_transactions_after_asOfDate():
     output = run_model(error_1_json)
     output_dict = json.loads(output)
@@ -1 +1,30 @@
-# TODO
+import numpy as np
+import pandas as pd
+import pytest
+
+from postprocess.cashflow.atp import get_all_peak_features, get_peak_features
+
+
+@pytest.fixture
+def time_series():
+    steps = np.random.default_rng(0).normal(0, 300, 200)
+    net = np.r_[0.0, np.cumsum(steps)]
+    return pd.DataFrame({"net": net}, index=pd.date_range("2023-01-01", periods=len(net), name="date"))
+
+
+def test_all_peak_features_match_each_level(time_series):
+    result = get_all_peak_features(None, time_series)
+
+    expected = pd.concat(
+        [
+            get_peak_features(time_series, peak=True, minimum_prominence=500, due_amount=200, cashflow_info=True),
+            get_peak_features(time_series, peak=True, minimum_prominence=250, due_amount=100, cashflow_info=False),
+            get_peak_features(time_series, peak=True, minimum_prominence=100, due_amount=40, cashflow_info=False),
+            get_peak_features(time_series, peak=False, minimum_prominence=500, due_amount=200, cashflow_info=False),
+            get_peak_features(time_series, peak=False, minimum_prominence=250, due_amount=100, cashflow_info=False),
+            get_peak_features(time_series, peak=False, minimum_prominence=100, due_amount=40, cashflow_info=False),
+        ],
+        axis=1,
+    )
+    pd.testing.assert_frame_equal(result, expected)
+    assert result["n_peak_100"].iloc[0] >= result["n_peak_250"].iloc[0] >= result["n_peak_500"].iloc[0] > 0
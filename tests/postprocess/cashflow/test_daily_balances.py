@@ -0,0 +1,35 @@
+from datetime import date
+
+import pandas as pd
+
+from postprocess.cashflow.daily_balances import DailyBalances
+
+
+def sample_transactions():
+    return pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "a", "b", "a"],
+            "date": [date(2021, 1, 1), date(2021, 1, 1), date(2021, 1, 3), date(2021, 1, 2), date(2021, 1, 3)],
+            "amount": [100, 30, 50, 20, 10],
+            "type": ["CREDIT", "DEBIT", "DEBIT", "CREDIT", "CREDIT"],
+        }
+    )
+
+
+def test_time_series_pads_the_running_net():
+    daily_balances = DailyBalances(sample_transactions())
+    result = daily_balances.time_series("a")
+
+    assert list(result.index) == list(pd.date_range("2020-12-31", "2021-01-04"))
+    assert result["net"].tolist() == [0, 70, 70, 30, 70]
+    assert "b" in daily_balances and "c" not in daily_balances
+
+
+def test_balances_run_back_from_the_current_balance():
+    result = DailyBalances(sample_transactions()).balances("a", 100, date(2021, 2, 1))
+
+    assert len(result) == 32
+    assert result["balance"].iloc[0] == 100
+    # Back past the net -40 of Jan 3 and the net 70 of Jan 1
+    assert result["balance"].iloc[-3:].tolist() == [140, 140, 70]
+    assert result["month"].iloc[[0, 29, 30, 31]].tolist() == [1, 1, 2, 2]
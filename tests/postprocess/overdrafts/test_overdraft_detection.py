@@ -1,3 +1,6 @@
+from datetime import date
+
+import pandas as pd
 import pytest
 from data import PostProcessTestData
 
@@ -23,3 +26,22 @@ def test_overdraft_detection(balance_df):
         "amount",
         "description"
     ]
+
+
+def test_overdraft_detection_counts_each_window():
+    balance_df = pd.DataFrame({"accountGuid": ["a", "b"], "as_of_date": pd.to_datetime(["2023-09-15", "2023-09-15"])})
+    transactions_df = pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "a", "a"],
+            "date": [date(2023, 9, 1), date(2023, 5, 1), date(2023, 1, 2), date(2023, 9, 2)],
+            "amount": [35, 35, 20, 35],
+            "type": ["DEBIT", "DEBIT", "DEBIT", "CREDIT"],
+            "description": ["NSF FEE", "Overdraft Fee", "returned item", "NSF fee refund"],
+        }
+    )
+    on_cnt, incidents, odf_incidents, nsf_incidents = overdraft_detection(transactions_df, balance_df)
+
+    assert on_cnt.iloc[0, 1:].tolist() == [3, 1, 2, 2, 1, 1, 1, 0, 1]
+    assert on_cnt.iloc[1, 1:].tolist() == [0] * 9
+    assert incidents.amount.tolist() == [35, 35, 20]
+    assert (len(odf_incidents), len(nsf_incidents)) == (1, 2)
@@ -0,0 +1,55 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeModelServer:
+    """
+    A local stand-in of the custom model endpoint, answering /predict with fixed probabilities.
+    It counts the connections and requests it gets, and fails the first `failures` requests with a 503.
+    """
+
+    def __init__(self, probabilities: list[list[float]], failures: int = 0):
+        self.probabilities = probabilities
+        self.failures = failures
+        self.connections = 0
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append((self.path, payload))
+                if server.failures > 0:
+                    server.failures -= 1
+                    self.respond(503, {"detail": "unavailable"})
+                else:
+                    self.respond(200, {"probabilities": server.probabilities})
+
+            def respond(self, status: int, body: dict):
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,45 @@
+import pickle
+
+import numpy as np
+from scipy import stats
+
+from config import config
+from postprocess.scores.auto_gluon_scoring import Calibrator, load_calibrator
+
+
+def test_calibrate_scores_matches_the_percentile_mapping(tmp_path):
+    load_path = tmp_path / "calibrator.pkl"
+    new_scores = [480, 500, 500, 650]
+    with open(load_path, "wb") as f:
+        pickle.dump({"reference_scores": np.array([310, 455, 520, 600, 720, 805]), "new_scores": new_scores}, f)
+    calibrator = Calibrator(load_path)
+    scores = np.array([100, 480, 490, 500, 500.5, 650, 700])
+
+    calibrated = calibrator.calibrate_scores(scores)
+
+    expected = [np.percentile(calibrator.old_scores, stats.percentileofscore(new_scores, x)) for x in scores]
+    assert calibrated.tolist() == expected
+    assert calibrator.calibrate_score(500) == expected[3]
+
+
+def test_calibrate_scores_keeps_nan(tmp_path):
+    load_path = tmp_path / "calibrator.pkl"
+    with open(load_path, "wb") as f:
+        pickle.dump({"reference_scores": np.array([310, 455, 520, 600]), "new_scores": [480, 500, 650]}, f)
+    calibrator = Calibrator(load_path)
+
+    calibrated = calibrator.calibrate_scores(np.array([np.nan, 500, np.nan]))
+
+    assert np.isnan(calibrated[[0, 2]]).all()
+    assert calibrated[1] == calibrator.calibrate_score(500)
+    assert np.isnan(calibrator.calibrate_score(np.nan))
+
+
+def test_load_calibrator_loads_each_calibrator_once():
+    calibrator = load_calibrator(config.CALIBRATOR_DATA_PATH)
+
+    assert load_calibrator(config.CALIBRATOR_DATA_PATH) is calibrator
+    assert (
+        calibrator.calibrate_scores(np.array([500])).tolist()
+        == Calibrator(config.CALIBRATOR_DATA_PATH).calibrate_scores(np.array([500])).tolist()
+    )
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from fake_model_server import FakeModelServer
+
+from postprocess.scores.xgboost_scoring import custom_model_client, use_custom_model
+
+
+@pytest.fixture
+def model_server():
+    """Starts a FakeModelServer, then closes its cached client and clears the client cache once the test is done"""
+    servers = []
+
+    def start(probabilities: list[list[float]], failures: int = 0) -> FakeModelServer:
+        server = FakeModelServer(probabilities, failures=failures).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        custom_model_client(server.base_url).close()
+    custom_model_client.cache_clear()
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def test_custom_model_reuses_one_connection_across_requests(model_server):
+    features = pd.DataFrame({"odAll": [1.0, 0.0]})
+    server = model_server([[0.2, 0.8], [0.6, 0.4]])
+    first = use_custom_model(server.base_url, features)
+    second = use_custom_model(server.base_url, features)
+
+    assert first.values.tolist() == [[0.2, 0.8], [0.6, 0.4]]
+    assert second.equals(first)
+    assert server.requests == [("/predict", {"odAll": {"0": 1.0, "1": 0.0}})] * 2
+    assert server.connections == 1
+
+
+def test_custom_model_retries_server_errors(model_server):
+    features = pd.DataFrame({"odAll": [1.0]})
+    server = model_server([[0.3, 0.7]], failures=1)
+    prediction = use_custom_model(server.base_url, features)
+
+    assert prediction.values.tolist() == [[0.3, 0.7]]
+    assert len(server.requests) == 2
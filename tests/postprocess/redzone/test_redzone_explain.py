@@ -1,4 +1,15 @@
-from postprocess.scores.redzone_explain import red_zone_feature_explain
+import numpy as np
+import pandas as pd
+import shap
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBClassifier
+
+from postprocess.scores.redzone_explain import (
+    get_topn_features,
+    red_zone_feature_explain,
+    select_topn_features,
+    shap_contributions,
+)
 
 def test_extreme_feature_value():
     """
@@ -10,4 +21,40 @@ def test_extreme_feature_value():
     # Run the red zone feature explanation function
     explanation = red_zone_feature_explain(features, impacts, feature_values)
 
-    assert explanation == ['None','None','None']
\ No newline at end of file
+    assert explanation == ['None','None','None']
+
+def test_select_topn_features_matches_get_topn_features():
+    """
+    The vectorized selection picks the same top features as the per account one, and leaves padding and ties to it
+    """
+    shap_values = np.array(
+        [
+            [0.5, -0.2, 0.1, -0.7, 0.3, 0.0, 0.2, -0.1, 0.4, -0.3, 0.6, -0.5],
+            [0.5, 0.5, 0.1, -0.7, 0.3, 0.2, 0.2, -0.1, 0.4, -0.3, 0.6, -0.5],
+            [0.5, -0.2, 0.1, -0.7, 0.3, 0.0, 0.2, 0.1, 0.4, 0.3, 0.6, 0.5],
+        ]
+    )
+    feature_names = np.array([f"feature_{i}" for i in range(shap_values.shape[1])])
+
+    pos_columns, neg_columns, resolved = select_topn_features(shap_values, n=5)
+
+    assert list(resolved) == [True, False, False]
+    topn_pos_features, _, topn_neg_features, _ = get_topn_features(shap_values[0], feature_names, n=5)
+    assert list(feature_names[pos_columns[0]]) == list(topn_pos_features)
+    assert list(feature_names[neg_columns[0]]) == list(topn_neg_features)
+
+
+def test_shap_contributions_match_the_tree_explainer():
+    """
+    XGBoost models are explained natively, other tree models through the explainer, both like TreeExplainer
+    """
+    rng = np.random.default_rng(0)
+    model_input = pd.DataFrame(rng.normal(size=(200, 4)), columns=["a", "b", "c", "d"])
+    target = (model_input.a + model_input.b * model_input.c > 0).astype(int)
+
+    for model in [
+        XGBClassifier(n_estimators=10, max_depth=3).fit(model_input, target),
+        DecisionTreeRegressor(max_depth=3).fit(model_input, target),
+    ]:
+        expected = shap.TreeExplainer(model).shap_values(model_input)
+        np.testing.assert_allclose(shap_contributions(model, model_input), expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+
+from postprocess.scores import xgboost_scoring
+from postprocess.scores.xgboost_scoring import feature_matrix, parse_model_reasons, payroll_spending_days
+
+
+def test_feature_matrix_adds_the_missing_features_of_all_models_once():
+    model_input = pd.DataFrame(
+        {"accountGuid": ["a", "b"], "odAll": [1.5, 0.0], "n_peak_500": [2, 3], "isGig": [True, False]}
+    )
+
+    matrix = feature_matrix(
+        model_input, [["odAll", "loanPmtAllTime", "isGig"], ["loanPmtAllTime", "n_peak_500", "nsfAll"]]
+    )
+
+    assert matrix.columns.tolist() == ["odAll", "loanPmtAllTime", "isGig", "n_peak_500", "nsfAll"]
+    assert matrix.dtypes.tolist() == ["float64", "int64", "int64", "int64", "int64"]
+    assert (matrix[["loanPmtAllTime", "nsfAll"]] == 0).all().all()
+    assert matrix.isGig.tolist() == [1, 0]
+    assert "loanPmtAllTime" not in model_input
+
+
+@pytest.mark.parametrize(
+    "model_input",
+    [
+        pd.DataFrame({"odAll": ["1.5", "0"]}),
+        pd.DataFrame([[1.5, 2.0]], columns=["odAll", "odAll"]),
+    ],
+)
+def test_feature_matrix_rejects_invalid_features(model_input):
+    with pytest.raises(ValueError):
+        feature_matrix(model_input, [["odAll"]])
+
+
+def test_payroll_spending_days_averages_the_days_to_spend_each_paycheck():
+    income_df_sorted = pd.DataFrame(
+        {
+            "accountGuid": ["a", "b", "c"],
+            "errorCode": [0, 0, 0],
+            "historicalPayDay": [["2024-01-01", "2024-01-11"], ["2024-01-01"], ["2024-01-01"]],
+            "perPayCheck": [500.0, 0.0, 500.0],
+        }
+    )
+    transactions_df = pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "a", "a", "a", "b"],
+            "date": ["2023-12-30", "2024-01-04", "2024-01-02", "2024-01-12", "2024-01-21", "2024-01-02"],
+            "amount": [900.0, 350.0, 200.0, 100.0, 600.0, 700.0],
+            "type": ["debit", "debit", "debit", "debit", "debit", "debit"],
+        }
+    )
+
+    spending_days = payroll_spending_days(income_df_sorted, transactions_df, pd.Timestamp("2024-01-21"))
+
+    # The first paycheck is spent on its fourth day, the second one lasts until as_of_date
+    assert spending_days.to_dict() == {"a": 6.5}
+
+
+def test_parse_model_reasons_combines_model_rule_based_and_universal_reasons(monkeypatch):
+    # deduplicate_list returns its reasons in set order, keep them as assembled to check the order
+    monkeypatch.setattr(xgboost_scoring, "deduplicate_list", list)
+    explanation = pd.DataFrame(
+        {
+            "accountGuid": ["a", "a", "b", "b"],
+            "impact": ["positive", "negative", "positive", "negative"],
+            "explanation": [
+                "Low Average Balance",
+                "Considerable Loan Payback History",
+                "High Borrowing Activity",
+                "Considerable Total Inflow",
+            ],
+        }
+    )
+    df_pred = pd.DataFrame({"accountGuid": ["a", "b", "c"], "riskScore": [0, 1000, 1000]})
+    behaviorial_data = pd.DataFrame(
+        {"accountGuid": ["a", "b", "c"], "alerts": [["Increased Default Risk: No Active Income Detected"], [], []]}
+    )
+    redzone_features = pd.DataFrame(
+        {"accountGuid": ["a", "b", "c"], "recurringMonthlyIncome": [2500, 0, 0], "odAll": [0, 3, 0]}
+    )
+    income_df_sorted = pd.DataFrame({"accountGuid": ["a", "c"], "errorCode": [401, 401]})
+    transactions_df = pd.DataFrame(
+        {
+            "accountGuid": ["a", "b", "c"],
+            "date": ["2024-01-20"] * 3,
+            "amount": [50.0, 80.0, 100.0],
+            "type": ["debit", "credit", "credit"],
+            "transCategory": [6, 6, 6],
+            "description": ["loan payment", "loan deposit", "loan deposit"],
+        }
+    )
+
+    reasons = parse_model_reasons(
+        explanation,
+        df_pred,
+        behaviorial_data,
+        redzone_features,
+        income_df_sorted=income_df_sorted,
+        transactions_df=transactions_df,
+        as_of_date=pd.Timestamp("2024-01-21"),
+    )
+
+    # The SHAP reasons, then the alerts, the rule-based and the universal reasons, as the per-account implementation
+    assert reasons.accountGuid.tolist() == ["a", "b", "c"]
+    assert reasons.assessmentReasonsBad.tolist() == [
+        [
+            "Low Average Balance",
+            "Increased Default Risk: No Active Income Detected",
+            "Recent Payroll Absent - Job Loss Risk",
+        ],
+        [
+            "Multiple loan Credit Found, Possible Loan Stacker",
+            "Overdrafts/NSF Found in Transactions",
+            "1 Loan(s) Funded within the week",
+        ],
+        ["Recent Payroll Absent - Job Loss Risk", "1 Loan(s) Funded within the week"],
+    ]
+    assert reasons.assessmentReasonsGood.tolist() == [
+        ["Considerable Loan Payback History", "Considerable Recurring Income", "1 Loan Payment(s) made this week"],
+        ["Considerable Total Inflow"],
+        [],
+    ]
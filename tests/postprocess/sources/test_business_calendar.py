@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from config import config
+
+from postprocess.sources.helpers.business_calendar import BUSINESS_CALENDAR, BusinessDayCalendar
+from postprocess.sources.helpers.source_debit_date import debit_date_analysis
+
+HOLIDAYS = {date(2023, 7, 4), date(2023, 12, 25), date(2023, 12, 26)}
+
+
+def _is_business_day(day):
+    return day.weekday() < 5 and day not in HOLIDAYS
+
+
+def _step(day, direction):
+    day = day + timedelta(days=direction)
+    while not _is_business_day(day):
+        day = day + timedelta(days=direction)
+    return day
+
+
+def test_calendar_matches_day_stepping():
+    calendar = BusinessDayCalendar(sorted(HOLIDAYS))
+    days = [date(2023, 6, 1) + timedelta(days=i) for i in range(240)]
+
+    assert [calendar.is_business(day) for day in days] == [_is_business_day(day) for day in days]
+    assert [day + timedelta(days=calendar.days_to_next(day)) for day in days] == [_step(day, 1) for day in days]
+    assert [day - timedelta(days=calendar.days_to_previous(day)) for day in days] == [_step(day, -1) for day in days]
+
+    assert calendar.is_business_day(days).tolist() == [_is_business_day(day) for day in days]
+    assert calendar.next_business_day(days).astype(date).tolist() == [_step(day, 1) for day in days]
+    assert calendar.previous_business_day(days).astype(date).tolist() == [_step(day, -1) for day in days]
+    assert calendar.offset([date(2023, 12, 22), date(2023, 12, 23)], 1).astype(date).tolist() == [
+        date(2023, 12, 27),
+        date(2023, 12, 28),
+    ]
+
+
+def test_calendar_outside_precomputed_range():
+    calendar = BusinessDayCalendar([])
+    day = date(2200, 1, 6)  # Monday
+    assert calendar.is_business(day)
+    assert calendar.days_to_next(day) == 1
+    assert calendar.days_to_previous(day) == 3
+    assert calendar.next_business_day([day, date(2023, 7, 4)]).astype(date).tolist() == [
+        date(2200, 1, 7),
+        date(2023, 7, 5),
+    ]
+
+
+def test_holidays_within_keeps_holiday_order():
+    calendar = BusinessDayCalendar([date(2023, 12, 26), date(2023, 7, 4), date(2023, 12, 25)])
+    positions, counts = calendar.holidays_within(date(2023, 12, 22), 3)
+    assert positions.tolist() == [0, 2]
+    assert counts.tolist() == [2, 1]
+    assert counts.tolist() == [np.busday_count(date(2023, 12, 22), h) for h in [date(2023, 12, 26), date(2023, 12, 25)]]
+
+
+def test_debit_date_analysis_leaves_holidays_untouched():
+    holidays_before = config.HOLIDAYS.copy()
+    income_sources = pd.DataFrame(
+        {
+            "frequency": ["W"],
+            "lastPayDay": [pd.Timestamp("2023-12-29")],
+            "regularPayDay": ["Friday"],
+            "historicalPayDay": [[pd.Timestamp("2023-12-22"), pd.Timestamp("2023-12-29")]],
+            "numOfPay": [2],
+            "sameDayFreq": [1.0],
+            "incomeType": ["Payroll"],
+        }
+    )
+    debit_date_analysis(income_sources, "2023-12-31")
+    pd.testing.assert_frame_equal(config.HOLIDAYS, holidays_before)
+    assert date(2023, 12, 25) in BUSINESS_CALENDAR.holidays
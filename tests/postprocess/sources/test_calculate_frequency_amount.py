@@ -2,8 +2,11 @@ import numpy as np
 import pandas as pd
 
 from postprocess.sources.helpers.calculate_frequency_amount import (
+    NO_FREQUENCY_AMOUNT,
     active_income_check,
     amount_stability_check,
+    calculate_frequency_amount,
+    calculate_frequency_amount_batch,
     recurring_income_check,
 )
 
@@ -13,6 +16,37 @@ def test_calculate_frequency_amount():
     assert True
 
 
+def test_calculate_frequency_amount_batch_matches_per_cluster():
+    weekly = pd.DataFrame(
+        {"date": pd.date_range(start="1/6/2023", periods=10, freq="7D"), "amount": [500.0] * 10, "cluster": "weekly"}
+    )
+    monthly = pd.DataFrame(
+        {"date": pd.date_range(start="1/15/2023", periods=8, freq="MS") + pd.Timedelta(days=14), "cluster": "monthly"}
+    )
+    monthly["amount"] = np.linspace(900, 1000, 8)
+    small = pd.DataFrame(
+        {"date": pd.date_range(start="1/1/2023", periods=3, freq="7D"), "amount": 20.0, "cluster": "small"}
+    )
+    transactions = pd.concat([weekly, monthly, small], ignore_index=True).sample(frac=1, random_state=0)
+
+    for ignore_small_amounts in (False, True):
+        results = calculate_frequency_amount_batch(transactions, ["cluster"], ignore_small_amounts=ignore_small_amounts)
+        for cluster, target in transactions.groupby("cluster"):
+            expected = calculate_frequency_amount(target.copy(), ignore_small_amounts=ignore_small_amounts)
+            assert results[(cluster,)] == expected
+
+    assert results[("small",)] == NO_FREQUENCY_AMOUNT
+    assert results[("weekly",)][0] == "W"
+    assert results[("monthly",)][0] == "M"
+
+    # Small amounts can be ignored for some of the clusters only
+    ignored = transactions["cluster"].isin(["small", "monthly"]).to_numpy()
+    results = calculate_frequency_amount_batch(transactions, ["cluster"], ignore_small_amounts=ignored)
+    for cluster, target in transactions.groupby("cluster"):
+        expected = calculate_frequency_amount(target.copy(), ignore_small_amounts=cluster in ("small", "monthly"))
+        assert results[(cluster,)] == expected
+
+
 def test_active_income_check():
     # Create a DataFrame with test data
     data = {
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+from config import config
+from data import PostProcessTestData
+
+from postprocess.sources.categorize_sources import categorize_sources
+from postprocess.sources.helpers.source_partition import transfer_subcategories
+
+
+EXPECTED_PATH = os.path.join(config.ROOT_DIR, "..", "tests", "data", "categorize_sources_expected.json")
+
+EXTRA_ACCOUNT = "balanceTransferAccount"
+
+
+def categorize_sources_input() -> pd.DataFrame:
+    """Sample transactions plus an account with benefit, gig and Zelle credits and Balance Transfers under
+    both transCategory 3 and 4."""
+
+    df = PostProcessTestData().arg_for_categorize_income
+    df["date"] = pd.to_datetime(df["date"], unit="ms")
+    template = df.iloc[0].to_dict()
+    rows = [
+        ("2023-08-01", 500.0, "transfer from savings", 3, "bt_3"),
+        ("2023-08-20", 300.0, "transfer from savings", 4, "bt_4"),
+        ("2023-08-25", 200.0, "transfer from savings", 1, "bt_1"),
+    ]
+    rows += [(f"2023-{month:02d}-03", 900.0, "SSA TREAS 310 XXSOC SEC", 2, "ssa") for month in range(3, 10)]
+    rows += [(f"2023-{month:02d}-10", 150.0, "ZELLE from john", 3, "zelle") for month in range(4, 10)]
+    rows += [
+        (day.strftime("%Y-%m-%d"), 80.0, "UBER DRIVER PAY", 5, "uber")
+        for day in pd.date_range("2023-07-07", "2023-09-08", freq="7D")
+    ]
+    extra = pd.DataFrame(
+        [
+            {
+                **template,
+                "accountGuid": EXTRA_ACCOUNT,
+                "guid": f"{EXTRA_ACCOUNT}_{k}",
+                "date": pd.Timestamp(date),
+                "amount": amount,
+                "originalDescription": description,
+                "description": description,
+                "type": "CREDIT",
+                "cluster_label": cluster,
+                "transCategory": category,
+            }
+            for k, (date, amount, description, category, cluster) in enumerate(rows)
+        ]
+    )
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def to_json_values(value):
+    """Round trips a categorize_sources output through JSON so it compares with the stored expectation."""
+
+    if isinstance(value, pd.DataFrame):
+        # missing values compare as null, the baseline's subcategory held the string "nan" for them, an artifact of
+        # partial .loc assignment under pandas 2.1.4, and the column is dropped before any output
+        value = value.astype(object).where(value.notna(), None).to_dict(orient="records")
+    return json.loads(json.dumps(value, default=str))
+
+
+def canonical_output(result: tuple) -> list:
+    """Returns the JSON values of a categorize_sources output with each sourceID named after its cluster.
+
+    Payroll, benefit and loan clusters were numbered in set order, which varies with string hashing between runs.
+    """
+
+    values = [to_json_values(value) for value in result]
+    source_id_names = {}
+    for n in (0, 1, 2, 3, 5):
+        for cluster, source in values[n].items():
+            source_id_names[source["sourceID"]] = re.sub(r"^([IL])\d+", rf"\1[{n}:{cluster}]", source["sourceID"])
+    for n in (0, 1, 2, 3, 5):
+        for source in values[n].values():
+            source["sourceID"] = source_id_names[source["sourceID"]]
+    for n in (4, 6):
+        for transaction in values[n]:
+            transaction["sourceID"] = source_id_names.get(transaction["sourceID"], transaction["sourceID"])
+    return values
+
+
+def test_categorize_sources_matches_baseline_output():
+    """Compares categorize_sources with the output of the per-source categorizers before the shared partition."""
+
+    df = categorize_sources_input()
+    as_of_date = pd.to_datetime(datetime(2023, 9, 15))
+
+    result = categorize_sources(df, as_of_date)
+
+    with open(EXPECTED_PATH, "r") as fp:
+        expected = json.load(fp)
+    assert canonical_output(result) == expected
+
+
+def test_categorize_sources_later_balance_transfer_source_id_wins():
+    """Tests that Balance Transfers under both transCategory 3 and 4 keep the sourceID assigned last."""
+
+    df = categorize_sources_input()
+    result = categorize_sources(df, pd.to_datetime(datetime(2023, 9, 15)))
+
+    payroll_source_dict, transfer_source_dict, income_source_trans = result[0], result[1], result[4]
+    balance_transfers = income_source_trans[
+        (income_source_trans.accountGuid == EXTRA_ACCOUNT) & (income_source_trans.subcategory == "Balance Transfer")
+    ]
+    last_id = transfer_source_dict[EXTRA_ACCOUNT + "_Balance Transfer"]["sourceID"]
+    assert last_id.endswith("_err_205")
+    assert balance_transfers[balance_transfers.transCategory.isin([3, 4])].sourceID.tolist() == [last_id, last_id]
+    # a payroll credit matching the Balance Transfer pattern keeps its payroll sourceID
+    payroll_id = payroll_source_dict[EXTRA_ACCOUNT + "_bt_1"]["sourceID"]
+    assert balance_transfers[balance_transfers.transCategory == 1].sourceID.tolist() == [payroll_id]
+
+
+def test_transfer_subcategories_later_rules_override():
+    credits = pd.DataFrame(
+        {
+            "originalDescription": [
+                "Cash App transfer from savings",
+                "ZELLE from john",
+                "ATM cash deposit",
+                "mobile check deposit",
+                "transfer from savings",
+                "acme payroll",
+            ],
+            "transCategory": [3, 3, 4, 4, 1, 1],
+        }
+    )
+    result = transfer_subcategories(credits)
+    assert result.iloc[:5].tolist() == [
+        "Cash App",
+        "Zelle",
+        "Cash Deposit",
+        "Check Deposit",
+        "Balance Transfer",
+    ]
+    assert pd.isna(result.iloc[5])
@@ -0,0 +1,46 @@
+from datetime import date
+
+from postprocess.sources.helpers.enhanced_payday_prediction import (
+    _generate_candidate_day_pairs,
+    analyze_day_of_month_pattern_hybrid,
+    analyze_semi_monthly_two_days_pattern,
+    determine_biweekly_or_semimonthly,
+    predict_monthly_regular_payday_enhanced,
+)
+
+
+def test_semi_monthly_pattern_counts_holiday_adjustments():
+    # 2023-07-01 is a Saturday paid on Monday 07-03, 2023-07-15 is a Saturday paid on Friday 07-14
+    paydays = [date(2023, 6, 1), date(2023, 6, 15), date(2023, 7, 3), date(2023, 7, 14), date(2023, 8, 1)]
+    result = analyze_semi_monthly_two_days_pattern(paydays)
+    assert (result["day1"], result["day2"]) == (1, 15)
+    assert result["adjusted_matches"] == 5
+    assert (result["adjustment_count_A"], result["adjustment_count_B"]) == (1, 1)
+    assert result["adjustment_direction"] == "A"
+
+    result = determine_biweekly_or_semimonthly(paydays)
+    assert result["pattern_type"] == "S"
+    assert result["pattern_details"]["pattern_type"] == "semi_monthly_two_days"
+
+
+def test_day_of_month_pattern_counts_cross_month_adjustments():
+    # 2023-04-30 is a Sunday, paid on Monday 05-01 instead
+    paydays = [date(2023, 1, 30), date(2023, 2, 28), date(2023, 3, 30), date(2023, 5, 1), date(2023, 5, 30)]
+    result = analyze_day_of_month_pattern_hybrid(paydays)
+    assert result["description"] == "Monthly payday on day 30 of month"
+    assert result["adjusted_matches"] == 4
+    assert result["adjustment_direction"] == "A"
+
+
+def test_candidate_day_pairs_are_ordered_and_apart():
+    paydays = [date(2023, 6, 1), date(2023, 6, 5), date(2023, 6, 15), date(2023, 6, 20)]
+    assert _generate_candidate_day_pairs(paydays) == [(1, 15), (1, 20), (5, 15), (5, 20)]
+
+
+def test_memoized_results_are_independent_copies():
+    paydays = [date(2023, 1, 15), date(2023, 2, 15), date(2023, 3, 15)]
+    first = predict_monthly_regular_payday_enhanced(paydays)
+    first["pattern_details"]["adjustment_direction"] = "changed"
+    second = predict_monthly_regular_payday_enhanced(list(paydays))
+    assert second["pattern_details"]["adjustment_direction"] == "None"
+    assert second["predicted_pattern"] == "day_of_month"
@@ -1 +1,17 @@
-# TODO
+import pandas as pd
+
+from postprocess.sources.helpers.find_missing_payment import find_missing_payment, find_missing_payments
+
+
+def test_find_missing_payments_of_many_sources():
+    weekly = pd.to_datetime(["2023-01-06", "2023-01-13", "2023-02-03", "2023-02-10"]).tolist()
+    monthly = pd.to_datetime(["2023-01-31", "2023-05-31"]).tolist()
+    single = pd.to_datetime(["2023-01-06"]).tolist()
+
+    missing = find_missing_payments([weekly, monthly, single, weekly], ["W", "M", "W", "S"])
+
+    assert missing[0] == pd.to_datetime(["2023-01-20", "2023-01-27"]).tolist()
+    # Month offsets step from the previous missing payday, a day clipped in February stays clipped
+    assert missing[1] == pd.to_datetime(["2023-02-28", "2023-03-28", "2023-04-28"]).tolist()
+    assert missing[2:] == [[], []]
+    assert [find_missing_payment(weekly, "W"), find_missing_payment(monthly, "M")] == missing[:2]
@@ -3,7 +3,11 @@ import os
 import pandas as pd
 from config import config
 from postprocess.lending_guide.debit_date import payment_near_holiday
-from postprocess.sources.helpers.source_debit_date import debit_date_analysis
+from postprocess.sources.helpers.source_debit_date import (
+    debit_date_analysis,
+    predict_next_payday,
+    predict_next_paydays,
+)
 
 sample_data_path = os.path.realpath(
     os.path.join(config.ROOT_DIR, "..", "tests", "data", "sample_income_sources_1day_before.csv")
@@ -52,3 +56,24 @@ def test_lending_guide_holidays():
 
 
 # test_find_debit_near_holidays_modified()
+
+
+def test_predict_next_paydays_matches_single_predictions():
+    sources = [
+        (pd.Timestamp("2023-12-29"), "W", "Friday", "None"),
+        (pd.Timestamp("2023-11-15"), "M", "15", "None"),
+        (pd.Timestamp("2023-12-15"), "S", "15,lastday", "B"),
+        (pd.Timestamp("2023-09-01"), "M", "Friday in Week last", "None"),
+        ("None", "W", "Friday", "None"),
+    ]
+    next_paydays, next_payday_on_holiday = predict_next_paydays(*map(list, zip(*sources)))
+
+    assert next_paydays == [
+        pd.Timestamp("2024-01-05"),
+        pd.Timestamp("2023-12-15"),
+        pd.Timestamp("2023-12-29"),
+        pd.Timestamp("2023-10-27"),
+        "Not Applicable",
+    ]
+    assert next_payday_on_holiday == [0, 0, 1, 0, 0]
+    assert [predict_next_payday(*source) for source in sources] == list(zip(next_paydays, next_payday_on_holiday))
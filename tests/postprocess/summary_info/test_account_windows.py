@@ -0,0 +1,29 @@
+import pandas as pd
+
+from postprocess.summary_info.account_windows import AccountWindows
+
+
+def test_aggregate_matches_per_window_groupby():
+    balance_df = pd.DataFrame({"accountGuid": ["A", "B"], "as_of_date": ["2023-06-30", "2023-06-01"]})
+    frame = pd.DataFrame(
+        {
+            "accountGuid": ["A", "A", "A", "B", "B"],
+            "date": pd.to_datetime(["2022-01-01", "2023-02-01", "2023-06-15", "2022-12-01", "2023-05-30"]),
+            "amount": [10.5, 20.25, 30.0, 5.0, 7.5],
+            "days": [1, 2, 3, 4, 5],
+        }
+    )
+    windows = AccountWindows(balance_df)
+    aggregated = windows.aggregate(frame, total=("amount", "sum"), first_day=("days", "first"))
+
+    days_to_end = windows.days_to_end(frame)
+    assert days_to_end.tolist() == [545, 149, 15, 182, 2]
+    for window, limit in [("all_time", 10_000), ("three_month", 90), ("six_month", 180)]:
+        expected = (
+            frame[days_to_end <= limit]
+            .groupby("accountGuid")
+            .agg(total=("amount", "sum"), first_day=("days", "first"))
+            .reset_index()
+        )
+        pd.testing.assert_frame_equal(aggregated[window], expected)
+    assert windows.time_period(frame).tolist() == [545, 545, 545, 182, 182]
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 import pytest
 from data import PostProcessTestData
 
@@ -22,3 +24,52 @@ def test_match_card(result, balance_df):
     assert bank_card_info.iloc[1]["card"] == []
     assert bank_card_info.iloc[2]["card"] == []
     assert bank_card_info.iloc[3]["card"] == []
+
+
+def test_extract_cards_matches_each_description():
+    descriptions = pd.Series(
+        [
+            "PURCHASE*CARD 5678 /store",
+            "card 1234 payment to x",
+            None,
+            "PURCHASE*CARD 5678 /store",
+            "crd 4321",
+            "POS CARD XX9876 dbt 9876",
+            "Card 1111 and crd 2222",
+            "wire transfer fee card 3333",
+            "check card 4444",
+            "",
+            1234,
+            np.nan,
+        ]
+    )
+    # Digits the per-description extraction found before descriptions were deduplicated
+    expected = [
+        {"5678"},
+        set(),
+        set(),
+        {"5678"},
+        {"4321"},
+        set(),
+        {"1111", "2222"},
+        set(),
+        {"4444"},
+        set(),
+        set(),
+        set(),
+    ]
+
+    assert BankCard.extract_cards(descriptions) == expected
+    assert [BankCard.extract_digits_after_card(d) for d in descriptions] == expected
+
+
+@pytest.mark.parametrize(
+    "descriptions", [pd.Series([1234, 5678]), pd.Series([1.5, np.nan]), pd.Series([], dtype=object)]
+)
+def test_extract_cards_without_strings(descriptions):
+    assert BankCard.extract_cards(descriptions) == [set()] * len(descriptions)
+
+
+def test_extract_digits_after_card_non_string():
+    assert BankCard.extract_digits_after_card(1234) == set()
+    assert BankCard.extract_digits_after_card(None) == set()
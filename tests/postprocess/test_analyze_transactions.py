@@ -0,0 +1,41 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import simplejson
+
+from postprocess.analyze_transactions import dump_output, numpy_converter
+
+
+def sample_output(description: str) -> dict:
+    return {
+        "creditTrans": [
+            {
+                "description": description,
+                "amount": np.float32(0.1),
+                "count": np.int64(3),
+                "missing": np.nan,
+                "ratio": np.inf,
+                "date": datetime.date(2024, 1, 2),
+                "time": datetime.datetime(2024, 1, 2, 3, 4, 5),
+                "zoned": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+                "day": np.datetime64("2024-01-02"),
+                "timestamp": pd.Timestamp("2024-01-02 03:04:05"),
+                "history": np.array([1, 2]),
+            }
+        ]
+    }
+
+
+def test_dump_output_matches_simplejson_values():
+    """Tests that every value is encoded as the simplejson encoding with numpy_converter did."""
+    output = sample_output("café \U0001f600")
+    expected = simplejson.dumps(output, ignore_nan=True, default=numpy_converter)
+    assert simplejson.loads(dump_output(output)) == simplejson.loads(expected)
+
+
+def test_dump_output_lone_surrogate_falls_back_to_simplejson():
+    """Tests that an output orjson cannot encode is written byte for byte as the simplejson encoding did."""
+    output = sample_output("café \ud83d")
+    assert dump_output(output) == simplejson.dumps(output, ignore_nan=True, default=numpy_converter)
+    assert '"description": "caf\\u00e9 \\ud83d"' in dump_output(output)
@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+
+import pytest
+from config import config
+from model.run_model import run_model
+from postprocess.stage_graph import Stage, run_stages
+
+sample_data_path = os.path.realpath(os.path.join(config.ROOT_DIR, "..", "tests", "data", "2000.json"))
+
+STAGES = {
+    "total": Stage(lambda low, high: low + high, ("low", "high")),
+    "bounds": Stage(lambda x: (x - 1, x + 1), ("x",), ("low", "high")),
+    "double": Stage(lambda x: 2 * x, ("x",)),
+    "summary": Stage(lambda total, double: f"{total}/{double}", ("total", "double")),
+}
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_run_stages(max_workers):
+    values, timings = run_stages(STAGES, {"x": 5}, max_workers=max_workers)
+    assert values == {"x": 5, "low": 4, "high": 6, "total": 10, "double": 10, "summary": "10/10"}
+    assert timings.keys() == STAGES.keys()
+
+
+def test_run_stages_runs_independent_stages_concurrently():
+    # Each stage only passes the barrier once the other one reached it too
+    barrier = threading.Barrier(2, timeout=5)
+    stages = {
+        "first": Stage(lambda: barrier.wait() >= 0),
+        "second": Stage(lambda: barrier.wait() >= 0),
+    }
+    values, _ = run_stages(stages, {}, max_workers=2)
+    assert values == {"first": True, "second": True}
+
+
+@pytest.mark.parametrize(
+    "stages",
+    [
+        {"a": Stage(lambda b: b, ("b",)), "b": Stage(lambda a: a, ("a",))},
+        {"a": Stage(lambda missing: missing, ("missing",))},
+        {"a": Stage(lambda x: x, ("x",)), "b": Stage(lambda x: (x, x), ("x",), ("a", "c"))},
+    ],
+)
+def test_run_stages_rejects_invalid_graphs(stages):
+    with pytest.raises(ValueError):
+        run_stages(stages, {"x": 1})
+
+
+@pytest.mark.parametrize("max_workers", [2, 8])
+def test_run_model_parallel_stages_match_sequential(monkeypatch, max_workers):
+    with open(sample_data_path, "r") as fp:
+        data = json.dumps(json.load(fp))
+    monkeypatch.setattr(config, "POSTPROCESS_MAX_WORKERS", 1)
+    sequential = run_model(data)
+    monkeypatch.setattr(config, "POSTPROCESS_MAX_WORKERS", max_workers)
+    assert run_model(data) == sequential
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from utils.description_signals import SIGNAL_FAMILIES, DescriptionSignals, match_signal
+
+
+def test_flags_match_a_direct_search():
+    descriptions = pd.Series(["NSF Fee", "Overdraft item", np.nan, "Refund from Bank", "ret chk", "Payroll"] * 2)
+    signals = DescriptionSignals(descriptions)
+
+    for family, (pattern, lowercase) in SIGNAL_FAMILIES.items():
+        expected = match_signal(descriptions, pattern, lowercase)
+        assert signals.flags(descriptions, family).tolist() == expected.tolist()
+
+    assert signals.flags(descriptions, "nsf").tolist()[:6] == [True, False, False, False, True, False]
+    assert signals.flags(descriptions, "refund").tolist()[:6] == [True, False, False, True, False, False]
+
+
+def test_descriptions_outside_the_index_are_searched():
+    signals = DescriptionSignals(pd.Series(["zelle from sam"]))
+
+    flags = signals.flags(pd.Series(["Zelle from sam", "zelle from sam", "venmo"]), "Zelle")
+
+    assert flags.tolist() == [True, True, False]
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 import pandas as pd
 import pytest
 
-from utils.utils import standardize_date_format
+from utils.utils import df_to_json, standardize_date_format
 
 
 @pytest.mark.parametrize(
@@ -57,3 +57,22 @@ def test_standardize_date_format(input_series, expected_series):
             expected = expected.astimezone(timezone.utc)
         assert result == expected, f"Elements differ: {result} != {expected}"
     assert all(result_series.index == expected_series.index), "Series indices differ"
+
+
+def test_df_to_json_matches_the_rows_of_to_dict():
+    df = pd.DataFrame(
+        {
+            "transGuid": ["a", "b", None],
+            "amount": [10.5, 2.25, 3.0],
+            "transCategory": [1, 0, 6],
+            "is_loan": [False, False, True],
+            "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+        },
+        index=[5, 3, 9],
+    )
+
+    rows = df_to_json(df)
+
+    assert [list(row.items()) for row in rows] == [list(row.items()) for row in df.to_dict(orient="index").values()]
+    assert [type(value) for value in rows[0].values()] == [str, float, int, bool, pd.Timestamp]
+    assert df_to_json(df[[]]) == [{}, {}, {}]